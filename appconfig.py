@@ -0,0 +1,88 @@
+"""
+Yapılandırma - Capture Numbers uygulaması için
+Etkin yapılandırma, yapılandırma dosyası yükleme ve loglama.
+
+Modüller ayarları config.AD olarak okur. load_config ile yüklenen yeni
+yapılandırma config.use() ile etkinleştirilince tüm modüller aynı anda
+yeni ayarları görür (--config, sıcak yeniden yükleme, toplu işlem işçileri).
+"""
+
+import logging
+import importlib
+
+# Varsayılan yapılandırma dosyası
+import config as default_config
+
+
+class ConfigHolder:
+    """Etkin yapılandırma modülünü tutan vekil
+    
+    Öznitelik okuma/yazma etkin modüle yönlendirilir; use() ile modül
+    değiştirildiğinde 'from appconfig import config' yapan tüm modüller
+    yeni yapılandırmayı görür.
+    """
+    
+    def __init__(self, module):
+        object.__setattr__(self, 'module', module)
+    
+    def use(self, module):
+        """Etkin yapılandırmayı değiştir"""
+        object.__setattr__(self, 'module', module)
+    
+    def __getattr__(self, name):
+        return getattr(self.module, name)
+    
+    def __setattr__(self, name, value):
+        setattr(self.module, name, value)
+    
+    def __delattr__(self, name):
+        delattr(self.module, name)
+    
+    def __dir__(self):
+        return dir(self.module)
+
+
+# Uygulama genelindeki etkin yapılandırma
+config = ConfigHolder(default_config)
+
+
+def load_config(path):
+    """Özel yapılandırma dosyasını yükle
+    
+    Dosyada bulunmayan ayarlar için config.py'deki varsayılanlar kullanılır.
+    """
+    import importlib.util
+    defaults = importlib.import_module('config')
+    spec = importlib.util.spec_from_file_location("config", path)
+    config_module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(config_module)
+    for name in dir(defaults):
+        if name.isupper() and not hasattr(config_module, name):
+            setattr(config_module, name, getattr(defaults, name))
+    return config_module
+
+
+def setup_logging():
+    """Loglama yapılandırması"""
+    log_format = '%(asctime)s - %(levelname)s - %(message)s'
+    log_level = getattr(logging, config.LOG_LEVEL.upper(), logging.INFO)
+    
+    handlers = []
+    
+    # Dosya handler
+    if config.LOG_FILE:
+        file_handler = logging.FileHandler(config.LOG_FILE, encoding='utf-8')
+        file_handler.setFormatter(logging.Formatter(log_format))
+        handlers.append(file_handler)
+    
+    # Konsol handler
+    if config.LOG_TO_CONSOLE:
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(logging.Formatter(log_format))
+        handlers.append(console_handler)
+    
+    logging.basicConfig(
+        level=log_level,
+        format=log_format,
+        handlers=handlers
+    )
@@ -0,0 +1,496 @@
+"""
+Görüntü arşivi - Capture Numbers uygulaması için
+Görüntü dosyaları, parça arşivi, arka plan arşivleyici ve arşiv klasörünü okuma
+"""
+
+import os
+import re
+import json
+import queue
+import logging
+import threading
+from datetime import datetime
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from appconfig import config
+from runtime import metrics
+from processing import RoiLocator
+
+
+def image_encode_params():
+    """IMAGE_FORMAT ayarına göre dosya uzantısı ve cv2.imwrite parametreleri"""
+    image_format = str(config.IMAGE_FORMAT).lower().lstrip('.')
+    if image_format == 'png':
+        return 'png', [cv2.IMWRITE_PNG_COMPRESSION, int(config.PNG_COMPRESSION)]
+    if image_format not in ('jpg', 'jpeg'):
+        logging.warning(f"Bilinmeyen görüntü biçimi '{config.IMAGE_FORMAT}', jpg kullanılıyor")
+    return 'jpg', [cv2.IMWRITE_JPEG_QUALITY, int(config.JPEG_QUALITY)]
+
+
+def unique_image_path(output_dir, prefix, timestamp, extension, reserved=()):
+    """Çakışmayan, mikrosaniye çözünürlüklü görüntü dosya adı üret
+    
+    Aynı ad diskte ya da reserved içinde (henüz yazılmamış) varsa sonuna
+    _1, _2, ... eklenir.
+    """
+    stem = f"{prefix}_{timestamp.strftime('%Y%m%d_%H%M%S')}_{timestamp.microsecond:06d}"
+    filename = output_dir / f"{stem}.{extension}"
+    counter = 0
+    while filename.exists() or str(filename) in reserved:
+        counter += 1
+        filename = output_dir / f"{stem}_{counter}.{extension}"
+    return filename
+
+
+def save_image(image, prefix="capture", timestamp=None):
+    """Görüntüyü diske kaydet (eşzamanlı)"""
+    if not config.SAVE_IMAGES:
+        return None
+    
+    try:
+        # Çıktı klasörünü oluştur
+        output_dir = Path(config.IMAGE_OUTPUT_DIR)
+        output_dir.mkdir(exist_ok=True)
+        
+        # Dosya adı oluştur
+        if timestamp is None:
+            timestamp = datetime.now()
+        extension, params = image_encode_params()
+        filename = unique_image_path(output_dir, prefix, timestamp, extension)
+        
+        # Görüntüyü kaydet
+        with metrics.timer('save_image'):
+            if not cv2.imwrite(str(filename), image, params):
+                raise IOError(f"{filename} yazılamadı")
+        logging.info(f"Görüntü kaydedildi: {filename}")
+        
+        return str(filename)
+    
+    except Exception as e:
+        metrics.increment('errors', stage='save_image')
+        logging.error(f"Görüntü kaydetme hatası: {e}")
+        return None
+
+
+class FrameArchive:
+    """Kareleri tek tek dosyalar yerine dönen parça dosyalarına ekleyen arşiv
+    
+    Her önek (original, processed) için ayrı bir parça yazılır. Parça,
+    IMAGE_FORMAT ile kodlanmış (JPEG/PNG) karelerin art arda eklendiği bir
+    '.frames' dosyası ile her kare için zaman damgası, konum ve uzunluğun
+    tutulduğu JSON satırlı bir '.index' dosyasından oluşur; böylece tek tek
+    dosyalarla aynı boyutta kalır ama SD kartta binlerce küçük dosya
+    oluşmaz. ARCHIVE_CHUNK_FRAMES kareden sonra yeni parçaya geçilir.
+    """
+    
+    DATA_SUFFIX = '.frames'
+    INDEX_SUFFIX = '.index'
+    
+    def __init__(self, directory, chunk_frames=None):
+        self.directory = Path(directory)
+        self.directory.mkdir(exist_ok=True)
+        self.chunk_frames = max(1, chunk_frames or config.ARCHIVE_CHUNK_FRAMES)
+        self.extension, self.params = image_encode_params()
+        # önek -> [veri dosyası, indeks dosyası, parça adı, kare sayısı, konum]
+        self.chunks = {}
+    
+    def _open_chunk(self, prefix, timestamp):
+        """Önek için yeni bir parça başlat"""
+        stem = f"{prefix}_{timestamp.strftime('%Y%m%d_%H%M%S')}_{timestamp.microsecond:06d}"
+        path = self.directory / stem
+        counter = 0
+        while path.with_suffix(self.DATA_SUFFIX).exists():
+            counter += 1
+            path = self.directory / f"{stem}_{counter}"
+        
+        data_file = open(path.with_suffix(self.DATA_SUFFIX), 'wb')
+        index_file = open(path.with_suffix(self.INDEX_SUFFIX), 'w', encoding='utf-8')
+        logging.info(f"Yeni arşiv parçası: {path.with_suffix(self.DATA_SUFFIX)}")
+        return [data_file, index_file, path.name, 0, 0]
+    
+    def append(self, image, prefix="capture", timestamp=None, roi=None):
+        """Kareyi önekin güncel parçasına ekle
+        
+        roi verilirse kare o bölgeye kırpılmış kabul edilir ve bölge indekse
+        yazılır.
+        
+        Returns:
+            str: Karenin arşivdeki adı ('<parça>#<sıra>')
+        """
+        if timestamp is None:
+            timestamp = datetime.now()
+        chunk = self.chunks.get(prefix)
+        if chunk is None or chunk[3] >= self.chunk_frames:
+            if chunk is not None:
+                self._close_chunk(chunk)
+            chunk = self.chunks[prefix] = self._open_chunk(prefix, timestamp)
+        data_file, index_file, name, count, offset = chunk
+        
+        ok, encoded = cv2.imencode(f".{self.extension}", image, self.params)
+        if not ok:
+            raise Exception("Görüntü kodlanamadı")
+        data_file.write(encoded.data)
+        data_file.flush()
+        # İndeks satırı veriden sonra yazılır; yarım kalan kare okunmaz
+        entry = {
+            't': timestamp.isoformat(),
+            'o': offset,
+            'n': encoded.nbytes,
+            'f': self.extension
+        }
+        if roi is not None:
+            entry['r'] = [int(value) for value in roi]
+        index_file.write(json.dumps(entry) + '\n')
+        index_file.flush()
+        
+        chunk[3] = count + 1
+        chunk[4] = offset + encoded.nbytes
+        return f"{name}#{count}"
+    
+    @staticmethod
+    def _close_chunk(chunk):
+        chunk[0].close()
+        chunk[1].close()
+    
+    def close(self):
+        """Açık parçaları kapat"""
+        for chunk in self.chunks.values():
+            self._close_chunk(chunk)
+        self.chunks = {}
+
+
+class FrameArchiveReader:
+    """FrameArchive parçalarını açmadan okuyan sınıf
+    
+    Parçalar bellek eşlemeyle açılır; yalnızca erişilen kareler diskten
+    okunup çözülür. Yazılmakta olan bir parça da okunabilir. Eski sürümün ham
+    piksel parçaları da okunur.
+    
+    Örnek:
+        for timestamp, frame in FrameArchiveReader('captured_images'):
+            print(timestamp, frame.shape)
+    """
+    
+    def __init__(self, directory, prefix="original"):
+        self.directory = Path(directory)
+        self.prefix = prefix
+    
+    @staticmethod
+    def has_chunks(directory, prefix="original"):
+        """Klasörde bu önekle yazılmış arşiv parçası var mı"""
+        return bool(FrameArchiveReader(directory, prefix).chunks())
+    
+    @staticmethod
+    def sources(directory):
+        """Klasördeki orijinal kare parçalarının kamera adları (tek kamerada None)"""
+        names = {archive_source_name(path.stem)
+                 for path in Path(directory).glob(f"original_*{FrameArchive.DATA_SUFFIX}")}
+        names.discard(False)
+        return sorted(names, key=lambda name: name or '')
+    
+    def chunks(self):
+        """Parça veri dosyalarını zaman sırasıyla döndür"""
+        # Ad tam eşleşmeli: 'original' önekine 'original_<kamera>', 'original_cam'
+        # önekine 'original_cam_2' parçaları karışmaz
+        pattern = re.compile(rf'{re.escape(self.prefix)}_\d{{8}}_\d{{6}}_\d{{6}}')
+        return sorted(path for path in self.directory.glob(f"{self.prefix}_*{FrameArchive.DATA_SUFFIX}")
+                      if pattern.fullmatch(path.stem))
+    
+    def roi_cropped(self):
+        """Arşivdeki kareler ROI'ye kırpılarak mı kaydedilmiş"""
+        for chunk in self.chunks():
+            with open(chunk.with_suffix(FrameArchive.INDEX_SUFFIX), encoding='utf-8') as f:
+                line = f.readline()
+            if line:
+                return 'r' in json.loads(line)
+        return False
+    
+    @staticmethod
+    def read_index(chunk):
+        """Parçanın indeksini oku (yarım kalmış son satır atlanır)
+        
+        Returns:
+            list: (zaman damgası, konum, uzunluk, ham karede (boyut, tür) veya None)
+        """
+        entries = []
+        try:
+            with open(Path(chunk).with_suffix(FrameArchive.INDEX_SUFFIX), encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        break
+                    raw = None
+                    size = entry.get('n')
+                    if size is None:
+                        # Eski sürüm: sıkıştırılmamış pikseller
+                        raw = (tuple(entry['s']), np.dtype(entry['d']))
+                        size = int(np.prod(raw[0])) * raw[1].itemsize
+                    entries.append((datetime.fromisoformat(entry['t']), entry['o'], size, raw))
+        except OSError as e:
+            logging.warning(f"Arşiv indeksi okunamadı: {e}")
+        return entries
+    
+    def __len__(self):
+        return sum(len(self.read_index(chunk)) for chunk in self.chunks())
+    
+    def __iter__(self):
+        return self.frames()
+    
+    def frames(self, start=None, end=None):
+        """Kareleri (zaman damgası, kare) olarak döndür
+        
+        start/end verilirse yalnızca bu zaman aralığındaki kareler döner.
+        """
+        for chunk in self.chunks():
+            entries = self.read_index(chunk)
+            if not entries or os.path.getsize(chunk) == 0:
+                continue
+            data = np.memmap(chunk, dtype=np.uint8, mode='r')
+            for timestamp, offset, size, raw in entries:
+                if (start and timestamp < start) or (end and timestamp > end):
+                    continue
+                if offset + size > data.size:
+                    break
+                if raw is not None:
+                    yield timestamp, data[offset:offset + size].view(raw[1]).reshape(raw[0])
+                    continue
+                frame = cv2.imdecode(data[offset:offset + size], cv2.IMREAD_UNCHANGED)
+                if frame is None:
+                    logging.warning(f"Arşiv karesi çözülemedi: {chunk.name} ({timestamp})")
+                    continue
+                yield timestamp, frame
+
+
+class ImageArchiver:
+    """Görüntüleri arka planda diske yazan arşivleyici
+    
+    submit() hiçbir zaman beklemez: görüntü sınırlı bir kuyruğa eklenir ve
+    kodlama/yazma ayrı bir iş parçacığında yapılır. Kuyruk yarıdan fazla
+    dolduğunda her önek için yalnızca ARCHIVE_PRESSURE_SAMPLE görüntüden biri
+    kabul edilir, kuyruk tamamen doluysa görüntü atılır.
+    
+    ARCHIVE_FORMAT = 'chunks' ise görüntüler ayrı dosyalar yerine FrameArchive
+    parçalarına eklenir; ARCHIVE_ROI_ONLY açıksa orijinal karelerin yalnızca
+    ROI kırpıntısı saklanır.
+    """
+    
+    _STOP = object()
+    
+    def __init__(self, output_dir=None, queue_size=None, pressure_sample=None):
+        self.output_dir = Path(output_dir or config.IMAGE_OUTPUT_DIR)
+        self.output_dir.mkdir(exist_ok=True)
+        self.extension, self.params = image_encode_params()
+        self.frame_archive = None
+        if config.ARCHIVE_FORMAT == 'chunks':
+            self.frame_archive = FrameArchive(self.output_dir)
+        self.pressure_sample = max(1, pressure_sample or config.ARCHIVE_PRESSURE_SAMPLE)
+        
+        self.queue = queue.Queue(maxsize=max(1, queue_size or config.ARCHIVE_QUEUE_SIZE))
+        self.pending = set()
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.dropped = 0
+        
+        self.thread = threading.Thread(target=self._run, name='archiver', daemon=True)
+        self.thread.start()
+    
+    def _accept(self, prefix):
+        """Kuyruk baskı altındaysa görüntüyü örnekle"""
+        # submit() birden fazla iş parçacığından (kamera, OCR işçileri) çağrılır
+        with self.lock:
+            count = self.counters.get(prefix, 0)
+            self.counters[prefix] = count + 1
+        if self.queue.qsize() * 2 < self.queue.maxsize:
+            return True
+        return count % self.pressure_sample == 0
+    
+    def submit(self, image, prefix="capture", timestamp=None, roi=None):
+        """Görüntüyü kaydedilmek üzere kuyruğa ekle; dosya adını döndür
+        
+        Parça arşivinde dosya adı yerine önek, görüntü atıldıysa None döner. Görüntü dizisi yazılana kadar
+        değiştirilmemelidir.
+        """
+        if timestamp is None:
+            timestamp = datetime.now()
+        
+        if self.frame_archive is not None:
+            if roi is not None and config.ARCHIVE_ROI_ONLY:
+                image = RoiLocator.crop(image, roi)
+            else:
+                roi = None
+            if self._accept(prefix):
+                try:
+                    self.queue.put_nowait((prefix, timestamp, image, roi))
+                    return prefix
+                except queue.Full:
+                    pass
+        elif self._accept(prefix):
+            with self.lock:
+                filename = str(unique_image_path(self.output_dir, prefix, timestamp,
+                                                 self.extension, self.pending))
+                self.pending.add(filename)
+            try:
+                self.queue.put_nowait((filename, image))
+                return filename
+            except queue.Full:
+                with self.lock:
+                    self.pending.discard(filename)
+        
+        with self.lock:
+            self.dropped += 1
+        metrics.increment('archive_dropped', prefix=prefix)
+        logging.debug(f"Arşiv kuyruğu dolu, {prefix} görüntüsü atlandı")
+        return None
+    
+    def _run(self):
+        """Arka plan iş parçacığı: kuyruktaki görüntüleri kodla ve yaz"""
+        while True:
+            item = self.queue.get()
+            if item is self._STOP:
+                return
+            if self.frame_archive is not None:
+                self._append_frame(*item)
+                continue
+            filename, image = item
+            try:
+                with metrics.timer('save_image'):
+                    if not cv2.imwrite(filename, image, self.params):
+                        raise IOError(f"{filename} yazılamadı")
+                logging.info(f"Görüntü kaydedildi: {filename}")
+            except Exception as e:
+                metrics.increment('errors', stage='save_image')
+                logging.error(f"Görüntü kaydetme hatası: {e}")
+            finally:
+                with self.lock:
+                    self.pending.discard(filename)
+    
+    def _append_frame(self, prefix, timestamp, image, roi):
+        """Kareyi arşiv parçasına ekle"""
+        try:
+            with metrics.timer('save_image'):
+                name = self.frame_archive.append(image, prefix, timestamp, roi)
+            logging.debug(f"Kare arşivlendi: {name}")
+        except Exception as e:
+            metrics.increment('errors', stage='save_image')
+            logging.error(f"Görüntü kaydetme hatası: {e}")
+    
+    def close(self):
+        """Kuyrukta bekleyen görüntüleri yaz ve iş parçacığını durdur"""
+        if not self.thread.is_alive():
+            return
+        self.queue.put(self._STOP)
+        self.thread.join()
+        if self.frame_archive is not None:
+            self.frame_archive.close()
+        if self.dropped:
+            logging.warning(f"Arşivleyici baskı altında {self.dropped} görüntü atladı")
+
+
+def image_prefix(kind, name=None):
+    """Kaydedilen görüntü öneki: 'original' veya çoklu kamerada 'original_<kamera>'"""
+    return f"{kind}_{name}" if name else kind
+
+
+def archive_image(archiver, image, prefix, timestamp, roi=None):
+    """Arşivleyici varsa görüntüyü kuyruğa ekle, yoksa doğrudan kaydet"""
+    if archiver is not None:
+        return archiver.submit(image, prefix, timestamp, roi)
+    return save_image(image, prefix, timestamp)
+
+
+def archive_capture(archiver, image, result, timestamp, name=None):
+    """Orijinal görüntüyü (arşiv yalnızca ROI'yi saklayabilir) ve işlenmiş görüntüyü kaydet"""
+    if not config.SAVE_IMAGES:
+        return
+    archive_image(archiver, image, image_prefix("original", name), timestamp, result.get('roi'))
+    if config.SAVE_PROCESSED_IMAGES and not result.get('repeated'):
+        archive_image(archiver, result['processed_image'], image_prefix("processed", name),
+                      timestamp)
+
+
+# Kayıtlı görüntü adlarındaki zaman damgası: original_YYYYMMDD_HHMMSS[_ffffff].jpg
+IMAGE_TIMESTAMP_PATTERN = re.compile(r'(\d{8}_\d{6})(?:_(\d{1,6}))?')
+
+
+# Orijinal görüntü/parça adı: original[_<kamera>]_YYYYMMDD_HHMMSS_ffffff[_n]
+ARCHIVE_NAME_PATTERN = re.compile(r'original_(?:(.+?)_)?\d{8}_\d{6}_\d{6}(?:_\d+)?')
+
+
+BATCH_IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+
+def _image_timestamp(path):
+    """Görüntünün çekim zamanını dosya adından, yoksa değiştirilme zamanından al"""
+    match = IMAGE_TIMESTAMP_PATTERN.search(path.stem)
+    if match:
+        timestamp = datetime.strptime(match.group(1), '%Y%m%d_%H%M%S')
+        if match.group(2):
+            timestamp = timestamp.replace(microsecond=int(match.group(2).ljust(6, '0')))
+        return timestamp
+    return datetime.fromtimestamp(path.stat().st_mtime)
+
+
+def archive_source_name(stem):
+    """Orijinal görüntü/parça adındaki kamera adı
+    
+    Returns:
+        str | None | bool: Kamera adı, tek kamerada None, orijinal değilse False
+    """
+    match = ARCHIVE_NAME_PATTERN.fullmatch(stem)
+    return match.group(1) if match else False
+
+
+def _batch_images(directory):
+    """Klasördeki işlenecek görüntüler (işlenmiş 'processed_' görüntüler hariç)"""
+    return [
+        path for path in Path(directory).iterdir()
+        if path.suffix.lower() in BATCH_IMAGE_EXTENSIONS
+        and not path.name.startswith('processed_')
+    ]
+
+
+def image_sources(directory):
+    """Klasördeki orijinal görüntülerin kamera adları (tek kamerada None)"""
+    names = {archive_source_name(path.stem) for path in _batch_images(directory)}
+    names.discard(False)
+    return sorted(names, key=lambda name: name or '') or [None]
+
+
+def iter_image_dir(directory, skip=0, name=None):
+    """Klasördeki bir kameranın görüntülerini çekim zamanı sırasıyla döndür
+    
+    'processed_' önekli görüntüler atlanır. Orijinal görüntüler varsa yalnızca
+    'name' kamerasınınkiler (None: tek kamera, 'original_<zaman>'), yoksa
+    klasördeki tüm görüntüler kullanılır.
+    
+    Yields:
+        tuple: (sıra, zaman damgası, dosya yolu)
+    """
+    paths = _batch_images(directory)
+    names = {path: archive_source_name(path.stem) for path in paths}
+    if any(source is not False for source in names.values()):
+        paths = [path for path in paths if names[path] == name]
+    entries = sorted((_image_timestamp(path), path.name, path) for path in paths)
+    
+    for index, (timestamp, _, path) in enumerate(entries):
+        if index >= skip:
+            yield index, timestamp, str(path)
+
+
+def iter_frame_archive(directory, skip=0, name=None):
+    """FrameArchive parçalarındaki bir kameranın orijinal karelerini sırayla döndür
+    
+    Yields:
+        tuple: (sıra, zaman damgası, kare)
+    """
+    reader = FrameArchiveReader(directory, image_prefix("original", name))
+    for index, (timestamp, frame) in enumerate(reader):
+        if index >= skip:
+            # Eski ham parçaların kareleri işçi sürece gönderilmeden önce bellek eşlemeden kopyalanır
+            if isinstance(frame, np.memmap):
+                frame = np.array(frame)
+            yield index, timestamp, frame
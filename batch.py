@@ -0,0 +1,247 @@
+"""
+Toplu işlem - Capture Numbers uygulaması için
+Kayıtlı görüntü, video ve arşivleri süreç havuzunda yeniden OCR'dan geçirme
+"""
+
+import os
+import time
+import json
+import logging
+import multiprocessing
+from collections import deque
+from datetime import datetime, timedelta
+
+import cv2
+
+from appconfig import config, load_config
+from processing import FrameReader
+from storage import ExcelWriter
+from archives import (FrameArchiveReader, image_prefix, image_sources, iter_image_dir,
+                      iter_frame_archive)
+from sources import source_sheets
+
+
+# Toplu işlem işçi süreçlerindeki okuyucu (_init_batch_worker ile oluşturulur)
+_batch_reader = None
+
+
+def iter_video(path, interval, skip=0):
+    """Videodan her 'interval' saniyede bir kare döndür
+    
+    Zaman damgaları video dosyasının değiştirilme zamanı başlangıç kabul
+    edilerek kare konumuna göre hesaplanır.
+    
+    Yields:
+        tuple: (sıra, zaman damgası, kare)
+    """
+    video = cv2.VideoCapture(str(path))
+    if not video.isOpened():
+        raise Exception(f"Video açılamadı: {path}")
+    
+    fps = video.get(cv2.CAP_PROP_FPS) or 25.0
+    step = max(1, int(round(interval * fps)))
+    start = datetime.fromtimestamp(os.path.getmtime(path))
+    
+    try:
+        frame_number = 0
+        index = 0
+        while True:
+            ret = video.grab()
+            if not ret:
+                break
+            if frame_number % step == 0:
+                if index >= skip:
+                    _, frame = video.retrieve()
+                    timestamp = start + timedelta(seconds=frame_number / fps)
+                    yield index, timestamp, frame
+                index += 1
+            frame_number += 1
+    finally:
+        video.release()
+
+
+def _init_batch_worker(config_path, roi_cropped=False):
+    """Toplu işlem işçi sürecini hazırla"""
+    global _batch_reader
+    if config_path:
+        config.use(load_config(config_path))
+    if roi_cropped:
+        # Arşivdeki kareler zaten ROI'ye kırpılmış
+        config.ROI = None
+        config.ROI_AUTO_DETECT = False
+    # Kareler süreçlere dağıtıldığından ardışık kare karşılaştırması anlamsız
+    config.SKIP_UNCHANGED = False
+    _batch_reader = FrameReader()
+
+
+def _batch_worker(item):
+    """Tek bir görüntüyü/kareyi OCR'dan geçir (işçi süreçte çalışır)"""
+    index, timestamp, source = item
+    try:
+        image = cv2.imread(source) if isinstance(source, str) else source
+        if image is None:
+            raise Exception(f"Görüntü okunamadı: {source}")
+        result = _batch_reader.read(image)
+        # İşlenmiş görüntü ana sürece geri gönderilmez
+        return index, timestamp, result['text'], result['confidence'], None
+    except Exception as e:
+        return index, timestamp, '', 0, str(e)
+
+
+def run_batch(items, excel_writer, state_file, source, workers=0, config_path=None,
+              roi_cropped=False):
+    """Kayıtlı görüntüleri/kareleri süreç havuzunda paralel OCR'dan geçir
+    
+    Sonuçlar kaynak sırasıyla (çekim zamanı) yazılır. İlerleme, Excel dosyası
+    her diske yazıldığında state_file'a kaydedilir; işlem yarıda kalırsa
+    (Ctrl+C) yazılmış satırlar diske yazılıp ilerleme onlarla birlikte
+    kaydedilir ve aynı komut kaldığı yerden, satırları tekrarlamadan devam eder.
+    
+    Returns:
+        int: Bu çalıştırmada işlenen öğe sayısı
+    """
+    workers = workers or os.cpu_count() or 1
+    state = {'source': source, 'done': 0}
+    processed = 0
+    # Sonucu yazıcıya verilmiş son öğeden sonraki sıra
+    done = None
+    
+    def save_state(done):
+        state['done'] = done
+        temp_file = f"{state_file}.tmp"
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+        os.replace(temp_file, state_file)
+    
+    pool = multiprocessing.Pool(workers, initializer=_init_batch_worker,
+                                initargs=(config_path, roi_cropped))
+    try:
+        # En fazla workers * 2 öğe aynı anda işlenir (video kareleri belleği doldurmasın)
+        in_flight = deque()
+        items = iter(items)
+        exhausted = False
+        while in_flight or not exhausted:
+            while not exhausted and len(in_flight) < workers * 2:
+                try:
+                    in_flight.append(pool.apply_async(_batch_worker, (next(items),)))
+                except StopIteration:
+                    exhausted = True
+            if not in_flight:
+                break
+            
+            index, timestamp, text, confidence, error = in_flight.popleft().get()
+            if error:
+                logging.error(f"Toplu işlem hatası (#{index + 1}): {error}")
+            elif text:
+                excel_writer.write_data(text, confidence, timestamp)
+            else:
+                logging.warning(f"#{index + 1}: OCR sonucu boş")
+            processed += 1
+            done = index + 1
+            
+            # Satırlar diske yazıldıysa ilerlemeyi kaydet
+            if excel_writer.pending_rows == 0:
+                save_state(index + 1)
+            if processed % 100 == 0:
+                print(f"   {index + 1} öğe işlendi...")
+        
+        # Tamamlanan işlemin ilerleme kaydı gerekmez
+        excel_writer.flush()
+        if os.path.exists(state_file):
+            os.remove(state_file)
+    
+    except BaseException:
+        pool.terminate()
+        pool.join()
+        # Yazıcıdaki satırlar ve ilerleme birlikte kaydedilir; işlenmekte olan
+        # öğeler devam edildiğinde yeniden işlenir
+        if done is not None:
+            try:
+                excel_writer.flush()
+                save_state(done)
+            except Exception as e:
+                logging.error(f"Toplu işlem ilerlemesi kaydedilemedi: {e}")
+        raise
+    
+    pool.close()
+    pool.join()
+    return processed
+
+
+def load_batch_state(state_file, source):
+    """Yarıda kalmış toplu işlemin kaldığı yeri döndür (yoksa 0)"""
+    try:
+        with open(state_file, encoding='utf-8') as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return 0
+    return state.get('done', 0) if state.get('source') == source else 0
+
+
+def process_offline(args):
+    """--batch / --video modu: kayıtlı görüntüleri kamera olmadan işle
+    
+    Çoklu kamera arşivinde ('original_<kamera>_...') her kamera ayrı ayrı,
+    kendi dosyasına (<excel>_<kamera>.xlsx) işlenir; --source ile yalnızca
+    bir kamera seçilebilir.
+    """
+    source = os.path.abspath(args.batch or args.video)
+    chunks = False
+    if args.video:
+        names = [None]
+    else:
+        names = FrameArchiveReader.sources(source)
+        chunks = bool(names)
+        if not chunks:
+            names = image_sources(source)
+    
+    if args.source:
+        if args.source not in names:
+            available = ', '.join(name or '(tek kamera)' for name in names)
+            raise Exception(f"'{args.source}' kamerasının kaydı bulunamadı (bulunanlar: {available})")
+        names = [args.source]
+    
+    for name in names:
+        output = args.output or config.EXCEL_FILE
+        sheet_name = config.EXCEL_SHEET
+        if name:
+            if len(names) > 1 or not args.output:
+                # Kameralar aynı çalışma kitabına karışmasın (canlı moddaki adlandırma)
+                stem, extension = os.path.splitext(output)
+                output = f"{stem}_{name}{extension}"
+            sheet_name = source_sheets().get(name, sheet_name)
+        # İlerleme kaydı kamerayla birlikte tutulur
+        state_source = f"{source}#{name}" if name else source
+        state_file = f"{output}.batch.json"
+        
+        skip = load_batch_state(state_file, state_source)
+        if skip:
+            print(f"↻ Önceki çalışma kaldığı yerden devam ediyor: {skip} öğe atlanıyor")
+        
+        roi_cropped = False
+        if chunks:
+            items = iter_frame_archive(source, skip, name)
+            roi_cropped = FrameArchiveReader(source, image_prefix("original", name)).roi_cropped()
+        elif args.batch:
+            items = iter_image_dir(source, skip, name)
+        else:
+            items = iter_video(source, config.CAPTURE_INTERVAL, skip)
+        
+        excel_writer = None
+        try:
+            excel_writer = ExcelWriter(output, sheet_name)
+            print(f"✓ Excel dosyası: {output}")
+            label = f"{source} [{name}]" if name else source
+            print(f"\n📂 Toplu işlem: {label}\n")
+            
+            started = time.monotonic()
+            count = run_batch(items, excel_writer, state_file, state_source,
+                              args.workers or config.BATCH_WORKERS, args.config, roi_cropped)
+            elapsed = time.monotonic() - started
+            
+            print(f"\n✓ {count} öğe işlendi ({elapsed:.1f} saniye)")
+            logging.info(f"Toplu işlem tamamlandı ({label}): {count} öğe, {elapsed:.1f} saniye")
+        finally:
+            if excel_writer:
+                excel_writer.close()
+    return True
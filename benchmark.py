@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Performans ölçüm scripti - Capture Numbers uygulaması için
+Sentetik sayaç görüntüleri üretip her aşamanın süresini ayrı ayrı ölçer ve
+sonuçları sürümler/ayarlar arasında karşılaştırılabilir JSON olarak yazar.
+
+Kullanım:
+    python3 benchmark.py
+    python3 benchmark.py --config my_config.py --output bench.json
+    python3 benchmark.py --resolutions 640x480,1920x1080 --frames 50
+    python3 benchmark.py --skip-ocr --excel-rows 1000,10000,50000
+"""
+
+import os
+import sys
+import time
+import json
+import random
+import logging
+import argparse
+import platform
+import tempfile
+from datetime import datetime
+
+import cv2
+import numpy as np
+
+import capture_numbers
+
+
+def render_meter_image(text, resolution, rng):
+    """Verilen sayıyı içeren sentetik bir sayaç görüntüsü oluştur
+    
+    Gri bir zemin üzerinde açık renkli bir ekran ve koyu rakamlar çizilir;
+    ardından gerçek kameraya benzemesi için gürültü ve bulanıklık eklenir.
+    """
+    width, height = resolution
+    image = np.full((height, width, 3), rng.randint(60, 120), dtype=np.uint8)
+    
+    # Rakam yüksekliği kare yüksekliğinin ~%8'i
+    font = cv2.FONT_HERSHEY_SIMPLEX
+    scale = height * 0.08 / 22
+    thickness = max(1, int(scale * 2))
+    (text_w, text_h), baseline = cv2.getTextSize(text, font, scale, thickness)
+    
+    # Ekranı karenin rastgele bir yerine yerleştir
+    margin = int(text_h * 0.6)
+    x = rng.randint(margin, max(margin, width - text_w - 2 * margin))
+    y = rng.randint(text_h + 2 * margin, max(text_h + 2 * margin, height - 2 * margin))
+    cv2.rectangle(image, (x - margin, y - text_h - margin),
+                  (x + text_w + margin, y + baseline + margin), (200, 210, 200), -1)
+    cv2.putText(image, text, (x, y), font, scale, (30, 30, 30), thickness, cv2.LINE_AA)
+    
+    # Gürültü ve bulanıklık
+    noise = np.random.default_rng(rng.randint(0, 2**31)).normal(0, 8, image.shape)
+    image = np.clip(image + noise, 0, 255).astype(np.uint8)
+    return cv2.GaussianBlur(image, (3, 3), 0)
+
+
+def random_reading(rng):
+    """Sayaç okumasına benzeyen rastgele bir sayı üret"""
+    return f"{rng.randint(0, 99999):05d}.{rng.randint(0, 9)}"
+
+
+def summarize(durations):
+    """Süre listesinden istatistik çıkar (milisaniye)"""
+    if not durations:
+        return {'count': 0}
+    values = np.array(durations) * 1000.0
+    total = float(values.sum())
+    return {
+        'count': len(durations),
+        'mean_ms': round(float(values.mean()), 3),
+        'p50_ms': round(float(np.percentile(values, 50)), 3),
+        'p95_ms': round(float(np.percentile(values, 95)), 3),
+        'max_ms': round(float(values.max()), 3),
+        'throughput_per_s': round(len(durations) / (total / 1000.0), 2) if total else None
+    }
+
+
+def char_accuracy(expected, actual):
+    """Karakter doğruluğu: 1 - (düzenleme mesafesi / beklenen uzunluk)"""
+    previous = list(range(len(actual) + 1))
+    for i, expected_char in enumerate(expected, 1):
+        current = [i]
+        for j, actual_char in enumerate(actual, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1,
+                               previous[j - 1] + (expected_char != actual_char)))
+        previous = current
+    return max(0.0, 1.0 - previous[-1] / max(1, len(expected)))
+
+
+class SyntheticCamera:
+    """Önceden üretilmiş kareleri döndüren sahte kamera"""
+    
+    def __init__(self, frames):
+        self.frames = frames
+        self.index = 0
+    
+    def capture_image(self):
+        """Sıradaki karenin kopyasını döndür (gerçek kameradaki bellek kopyası gibi)"""
+        image = self.frames[self.index % len(self.frames)].copy()
+        self.index += 1
+        return image
+
+
+def benchmark_frames(resolution, frames, rng, skip_ocr=False):
+    """Bir çözünürlük için yakalama, ön işleme ve OCR aşamalarını ölç"""
+    readings = [random_reading(rng) for _ in range(frames)]
+    images = [render_meter_image(text, resolution, rng) for text in readings]
+    camera = SyntheticCamera(images)
+    reader = capture_numbers.FrameReader()
+    # Motorun zorunlu kıldığı ön işleme ayarları (örn. yedi parçalı tanıyıcıda Otsu)
+    overrides = None
+    if not skip_ocr:
+        overrides = getattr(capture_numbers.ImageProcessor.get_engine(), 'PREPROCESS', None)
+    
+    timings = {'capture': []}
+    # Adım adım ölçümdeki ara çıktı tamponları (adım adına göre)
+    buffers = {}
+    exact, char_scores, ocr_errors = 0, [], 0
+    
+    for expected in readings:
+        frame_started = time.perf_counter()
+        
+        started = time.perf_counter()
+        image = camera.capture_image()
+        timings['capture'].append(time.perf_counter() - started)
+        
+        # ROI (yapılandırmada açıksa)
+        started = time.perf_counter()
+        roi = reader.roi_locator.locate(image)
+        image = capture_numbers.RoiLocator.crop(image, roi)
+        if roi is not None or reader.roi_locator.auto_detect:
+            timings.setdefault('roi', []).append(time.perf_counter() - started)
+        
+        processed = image
+        if capture_numbers.config.IMAGE_PREPROCESSING:
+            # RESIZE_FACTOR = 'auto' ise ölçek okuyucunun önbelleğinden
+            step_overrides = reader.preprocess_overrides(image, roi, overrides)
+            pipeline = capture_numbers.ImageProcessor.get_preprocessor(step_overrides)
+            
+            # Uygulamadaki yol: tamponları yeniden kullanan tüm hat
+            started = time.perf_counter()
+            processed = pipeline.run(image)
+            timings.setdefault('preprocess.run', []).append(time.perf_counter() - started)
+            
+            # Adımlar tek tek, run() gibi ara adımlarda dst tamponuyla
+            step_image = image
+            last = len(pipeline.steps) - 1
+            for i, (name, step) in enumerate(pipeline.steps):
+                started = time.perf_counter()
+                if i == last:
+                    step_image = step(step_image)
+                else:
+                    step_image = buffers[name] = step(step_image, buffers.get(name))
+                timings.setdefault(f'preprocess.{name}', []).append(
+                    time.perf_counter() - started)
+        
+        if not skip_ocr:
+            started = time.perf_counter()
+            try:
+                text, _ = capture_numbers.ImageProcessor.get_engine().recognize(processed)
+            except Exception as e:
+                logging.error(f"OCR hatası: {e}")
+                ocr_errors += 1
+                text = ''
+            timings.setdefault('ocr', []).append(time.perf_counter() - started)
+            
+            text = ''.join(text.split())
+            exact += text == expected
+            char_scores.append(char_accuracy(expected, text))
+        
+        timings.setdefault('total', []).append(time.perf_counter() - frame_started)
+    
+    result = {
+        'resolution': list(resolution),
+        'stages': {name: summarize(values) for name, values in timings.items()}
+    }
+    if not skip_ocr:
+        result['accuracy'] = {
+            'exact_match': round(exact / frames, 4),
+            'char_accuracy': round(float(np.mean(char_scores)), 4),
+            'ocr_errors': ocr_errors
+        }
+    return result
+
+
+def benchmark_excel(row_counts, sample_rows):
+    """Farklı satır sayılarındaki dosyalarda ExcelWriter maliyetini ölç
+    
+    Her satır sayısı için önce o kadar satırlık bir dosya hazırlanır, ardından
+    dosyanın açılması, sample_rows kadar write_data çağrısı (yalnızca bellekte
+    ekleme), her EXCEL_FLUSH_ROWS satırlık grubun diske yazılması ve kapanış
+    süreleri ölçülür. Diske yazma dosyanın tamamını yeniden kaydettiği için
+    asıl maliyet flush satırındadır; row_ms satır başına düşen toplam süredir.
+    """
+    batch = max(1, capture_numbers.config.EXCEL_FLUSH_ROWS)
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for rows in row_counts:
+            filename = os.path.join(directory, f"bench_{rows}.xlsx")
+            
+            # Hazırlık: dosyayı istenen satır sayısına getir
+            writer = capture_numbers.ExcelWriter(filename)
+            writer.flush_rows = rows + 1
+            writer.flush_interval = float('inf')
+            for _ in range(rows):
+                writer.write_data("12345.6", 95.0)
+            writer.close()
+            
+            started = time.perf_counter()
+            writer = capture_numbers.ExcelWriter(filename)
+            open_time = time.perf_counter() - started
+            
+            # Diske yazma write_data içinde değil, grup dolunca ayrıca ölçülür
+            writer.flush_rows = float('inf')
+            writer.flush_interval = float('inf')
+            writes, flushes = [], []
+            for _ in range(sample_rows):
+                started = time.perf_counter()
+                writer.write_data("12345.6", 95.0)
+                writes.append(time.perf_counter() - started)
+                if writer.pending_rows >= batch:
+                    started = time.perf_counter()
+                    writer.flush()
+                    flushes.append(time.perf_counter() - started)
+            
+            started = time.perf_counter()
+            writer.close()
+            close_time = time.perf_counter() - started
+            
+            total = sum(writes) + sum(flushes) + close_time
+            results.append({
+                'rows': rows,
+                'open_ms': round(open_time * 1000, 3),
+                'flush_rows': batch,
+                'write_data': summarize(writes),
+                'flush': summarize(flushes),
+                'close_ms': round(close_time * 1000, 3),
+                'row_ms': round(total * 1000 / max(1, sample_rows), 3),
+                'file_bytes': os.path.getsize(filename)
+            })
+    return results
+
+
+def parse_resolutions(value):
+    """'640x480,1280x720' biçimini [(640, 480), (1280, 720)] listesine çevir"""
+    resolutions = []
+    for item in value.split(','):
+        width, height = item.lower().split('x')
+        resolutions.append((int(width), int(height)))
+    return resolutions
+
+
+def main():
+    """Ana ölçüm fonksiyonu"""
+    parser = argparse.ArgumentParser(
+        description='Raspberry Pi OCR to Excel - Aşama bazlı performans ölçümü'
+    )
+    parser.add_argument('--config', type=str, help='Ölçülecek yapılandırma dosyası')
+    parser.add_argument('--resolutions', type=parse_resolutions,
+                        default=parse_resolutions('640x480,1280x720,1920x1080'),
+                        help='Ölçülecek çözünürlükler (örn. 640x480,1280x720)')
+    parser.add_argument('--frames', type=int, default=20,
+                        help='Çözünürlük başına kare sayısı')
+    parser.add_argument('--excel-rows', type=str, default='100,1000,10000',
+                        help='Excel ölçümü için mevcut satır sayıları')
+    parser.add_argument('--excel-sample', type=int, default=50,
+                        help='Her dosyada ölçülecek write_data çağrısı sayısı')
+    parser.add_argument('--skip-ocr', action='store_true',
+                        help='OCR aşamasını ölçme (Tesseract kurulu değilse)')
+    parser.add_argument('--seed', type=int, default=42, help='Rastgele tohum')
+    parser.add_argument('--output', '-o', type=str,
+                        help='JSON çıktı dosyası (varsayılan: standart çıktı)')
+    args = parser.parse_args()
+    
+    if args.config:
+        capture_numbers.config.use(capture_numbers.load_config(args.config))
+    config = capture_numbers.config
+    # Ölçüm sırasında değişiklik algılama karşılaştırmayı bozmasın
+    config.SKIP_UNCHANGED = False
+    
+    logging.basicConfig(level=logging.WARNING, format='%(levelname)s - %(message)s')
+    rng = random.Random(args.seed)
+    
+    report = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'config': args.config or 'config.py',
+        'platform': {
+            'machine': platform.machine(),
+            'python': platform.python_version(),
+            'opencv': cv2.__version__,
+            'cpu_count': os.cpu_count()
+        },
+        'settings': {
+            name: getattr(config, name) for name in (
+                'OCR_ENGINE', 'IMAGE_PREPROCESSING', 'GRAYSCALE', 'RESIZE_FACTOR',
+                'DENOISE', 'THRESHOLD', 'THRESHOLD_METHOD', 'ROI', 'ROI_AUTO_DETECT'
+            )
+        },
+        'frames': [],
+        'excel': []
+    }
+    
+    for resolution in args.resolutions:
+        print(f"⏱ {resolution[0]}x{resolution[1]} ölçülüyor...", file=sys.stderr)
+        report['frames'].append(
+            benchmark_frames(resolution, args.frames, rng, args.skip_ocr)
+        )
+    
+    row_counts = [int(rows) for rows in args.excel_rows.split(',') if rows]
+    if row_counts:
+        print("⏱ Excel yazma ölçülüyor...", file=sys.stderr)
+        report['excel'] = benchmark_excel(row_counts, args.excel_sample)
+    
+    output = json.dumps(report, indent=2, ensure_ascii=False, default=str)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+        print(f"✓ Sonuçlar kaydedildi: {args.output}", file=sys.stderr)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,512 @@
+"""
+Kameralar - Capture Numbers uygulaması için
+PiCamera2/USB kamera, arka plan kare çekicisi ve kayıttan kare veren sahte kamera
+"""
+
+import os
+import time
+import random
+import logging
+import threading
+from datetime import datetime
+
+import cv2
+
+from appconfig import config
+from runtime import metrics, startup, retry_call, ReplayFinished
+from archives import image_sources, iter_image_dir
+
+
+class FrameGrabber:
+    """USB kameradan sürekli kare çeken arka plan iş parçacığı
+    
+    Sürücü tamponundaki kareler grab() ile sürekli boşaltılır; böylece uzun
+    bir bekleme sonrasında eski (tamponda kalmış) kare yerine her zaman en son
+    kare alınır. Kare çözümleme (retrieve) yalnızca kare istendiğinde yapılır,
+    bu yüzden sürekli okuma işlemciyi yormaz.
+    """
+    
+    def __init__(self, capture):
+        self.capture = capture
+        self.lock = threading.Lock()
+        self.condition = threading.Condition()
+        # Son çekilen karenin (zaman damgası, monoton zaman) çifti
+        self.grabbed = None
+        self.retrieved_monotonic = None
+        self.error = None
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="grabber", daemon=True)
+        self._thread.start()
+    
+    def _run(self):
+        """Kameradan kareleri sürekli çek (çözümlemeden)"""
+        while not self._stop_event.is_set():
+            # Kare ve zamanı aynı kilit altında değişir; retrieve ikisini birlikte görür
+            with self.lock:
+                ok = self.capture.grab()
+                with self.condition:
+                    if ok:
+                        self.grabbed = (datetime.now(), time.monotonic())
+                        self.error = None
+                    else:
+                        self.error = "Kameradan kare alınamadı"
+                    self.condition.notify_all()
+            if not ok:
+                # Kamera çıkarıldıysa veya akış durduysa işlemciyi meşgul etme
+                self._stop_event.wait(0.1)
+    
+    def retrieve(self, max_age=0.5, timeout=2.0, new_frame=False):
+        """En son çekilen kareyi çözümleyip (görüntü, zaman damgası) döndür
+        
+        Son kare max_age saniyeden eskiyse timeout saniyeye kadar yenisi
+        beklenir. new_frame ise bir önceki çağrıda döndürülen kare yeniden
+        döndürülmez (seri çekim).
+        """
+        deadline = time.monotonic() + timeout
+        with self.condition:
+            while (self.grabbed is None or
+                   time.monotonic() - self.grabbed[1] > max_age or
+                   (new_frame and self.grabbed[1] == self.retrieved_monotonic)):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise Exception(self.error or "Kameradan taze kare alınamadı")
+                self.condition.wait(remaining)
+        
+        # Beklerken daha yeni bir kare çekilmiş olabilir; zaman damgası
+        # çözümlenen kareyle aynı kilit altında alınır
+        with self.lock:
+            with self.condition:
+                grabbed_at, self.retrieved_monotonic = self.grabbed
+            ret, image = self.capture.retrieve()
+        if not ret:
+            raise Exception("Görüntü yakalanamadı")
+        return image, grabbed_at
+    
+    def stop(self):
+        """İş parçacığını durdur"""
+        self._stop_event.set()
+        self._thread.join(timeout=2)
+
+
+class ReplayFeed:
+    """Video dosyasından veya görüntü klasöründen kamera gibi kare veren kaynak
+    
+    cv2.VideoCapture arayüzünü (grab, retrieve, read, isOpened, release)
+    sunduğu için USB kamera yolu ve FrameGrabber değişmeden kullanılır;
+    böylece donanım olmadan sürekli mod yük ve uzun süre testine sokulabilir.
+    fps > 0 ise kareler bu hızda verilir (grab bir sonraki kare anına kadar
+    bekler), 0 ise beklemeden. jitter saniyeye kadar rastgele gecikme ve
+    drop_rate olasılıkla kare kaybı (grab/read False döner) eklenir.
+    loop kapalıysa kaynak bitince kamera çıkarılmış gibi davranır.
+    Çok kameralı arşiv klasöründe yalnızca source kamerasının görüntüleri
+    oynatılır.
+    """
+    
+    def __init__(self, path, fps=0, loop=True, jitter=0, drop_rate=0, seed=None, source=None):
+        self.path = path
+        self.fps = fps
+        self.loop = loop
+        self.jitter = jitter
+        self.drop_rate = drop_rate
+        self.random = random.Random(seed)
+        self.video = None
+        self.images = None
+        self.index = 0
+        self.frame = None
+        self.finished = False
+        self.next_frame = time.monotonic()
+        
+        if os.path.isdir(path):
+            name = self.archive_source(path, source)
+            self.images = [image_path for _, _, image_path in iter_image_dir(path, name=name)]
+            if not self.images:
+                raise Exception(f"Klasörde görüntü yok: {path}")
+        else:
+            self.video = cv2.VideoCapture(str(path))
+            if not self.video.isOpened():
+                raise Exception(f"Video açılamadı: {path}")
+    
+    @staticmethod
+    def archive_source(directory, source):
+        """Klasörde oynatılacak kameranın arşivdeki adı
+        
+        Arşivde kaynağın adıyla kayıt varsa o kamera, klasörde tek kamera
+        varsa (tek kameralı arşiv veya düz görüntü klasörü) o kullanılır.
+        """
+        names = image_sources(directory)
+        if source in names:
+            return source
+        if len(names) == 1:
+            return names[0]
+        available = ', '.join(name or '(tek kamera)' for name in names)
+        raise Exception(f"Klasörde '{source}' kamerasının görüntüsü yok: {directory} "
+                        f"(bulunanlar: {available})")
+    
+    def isOpened(self):
+        return True
+    
+    def _wait(self):
+        """Sıradaki karenin zamanına kadar bekle (fps ve gecikme)"""
+        if self.fps > 0:
+            now = time.monotonic()
+            # Geride kalındıysa kareler biriktirilmez, zaman çizelgesi kayar
+            self.next_frame = max(self.next_frame + 1.0 / self.fps, now)
+            if self.next_frame > now:
+                time.sleep(self.next_frame - now)
+        if self.jitter > 0:
+            time.sleep(self.random.uniform(0, self.jitter))
+    
+    def _advance(self):
+        """Sıradaki kareyi oku; kaynak bittiyse döngüde başa sar"""
+        for _ in range(2):
+            if self.images is not None:
+                if self.index < len(self.images):
+                    self.frame = self.images[self.index]
+                    self.index += 1
+                    return True
+                self.index = 0
+            else:
+                ok, frame = self.video.read()
+                if ok:
+                    self.frame = frame
+                    return True
+                self.video.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            if not self.loop:
+                break
+            logging.debug(f"Tekrar oynatma başa sarıldı: {self.path}")
+        if not self.finished:
+            logging.warning(f"Tekrar oynatma bitti: {self.path}")
+            self.finished = True
+        return False
+    
+    def grab(self):
+        """Sıradaki kareye geç (çözümleme retrieve'de)"""
+        if self.finished:
+            time.sleep(0.1)
+            return False
+        self._wait()
+        if not self._advance():
+            return False
+        if self.drop_rate > 0 and self.random.random() < self.drop_rate:
+            metrics.increment('replay_drops')
+            self.frame = None
+            return False
+        return True
+    
+    def retrieve(self):
+        """Son geçilen kareyi döndür (klasörde dosyadan okunur)"""
+        if self.frame is None:
+            return False, None
+        if self.images is not None:
+            image = cv2.imread(self.frame)
+            return image is not None, image
+        return True, self.frame.copy()
+    
+    def read(self):
+        if not self.grab():
+            return False, None
+        return self.retrieve()
+    
+    def release(self):
+        if self.video is not None:
+            self.video.release()
+            self.video = None
+
+
+class CameraCapture:
+    """Kamera görüntüsü yakalama sınıfı"""
+    
+    def __init__(self, camera_type="auto", camera_index=0, resolution=(1280, 720),
+                 replay_path=None, name=None):
+        self.camera_type = camera_type
+        self.camera_index = camera_index
+        self.resolution = resolution
+        self.replay_path = replay_path or config.REPLAY_PATH
+        self.name = name
+        self.label = name or 'kamera'
+        self.camera = None
+        self.use_picamera = False
+        self.use_lores = False
+        self.grabber = None
+        # Yakalamalar sıraya girer: işlem hattında seri çekim kareleri OCR
+        # aşamasında, sonraki çekimler yakalama aşamasında alınır
+        self.lock = threading.Lock()
+        # Kamera kaybedildiyse ilk hatanın ve son kesinti ölçümünün zamanı
+        self.down_since = None
+        self.down_checkpoint = None
+        
+        self._initialize_camera()
+    
+    def _initialize_camera(self):
+        """Kamera başlatma"""
+        if self.camera_type == "picamera":
+            self.use_picamera = self._try_picamera()
+        elif self.camera_type == "usb":
+            self.use_picamera = False
+            self._init_usb_camera()
+        elif self.camera_type == "replay":
+            self.use_picamera = False
+            self._init_replay_camera()
+        else:  # auto
+            # Önce PiCamera dene, olmazsa USB kamera
+            self.use_picamera = self._try_picamera()
+            if not self.use_picamera:
+                self._init_usb_camera()
+    
+    def _try_picamera(self):
+        """PiCamera2 başlatmayı dene"""
+        try:
+            from picamera2 import Picamera2
+            logging.info("PiCamera2 başlatılıyor...")
+            self.camera = Picamera2()
+            if config.PICAMERA_MODE == 'video':
+                # Sürekli akış: kareler beklemeden, son tampondan alınır
+                streams = {'main': {"size": self.resolution}}
+                if config.PICAMERA_LORES:
+                    streams['lores'] = {"size": tuple(config.PICAMERA_LORES), "format": "YUV420"}
+                camera_config = self.camera.create_video_configuration(**streams)
+                self.use_lores = bool(config.PICAMERA_LORES)
+            else:
+                camera_config = self.camera.create_still_configuration(
+                    main={"size": self.resolution}
+                )
+            self.camera.configure(camera_config)
+            self.camera.start()
+            # Otomatik pozlama ve kazanç oturana kadar bekle
+            self._wait_until_stable(self._picamera_exposure)
+            logging.info("PiCamera2 başarıyla başlatıldı")
+            return True
+        except ImportError:
+            logging.warning("picamera2 modülü bulunamadı, USB kamera kullanılacak")
+            return False
+        except Exception as e:
+            logging.warning(f"PiCamera başlatılamadı: {e}, USB kamera deneniyor...")
+            return False
+    
+    def _init_usb_camera(self):
+        """USB kamera başlat"""
+        try:
+            logging.info(f"USB kamera (index: {self.camera_index}) başlatılıyor...")
+            self.camera = cv2.VideoCapture(self.camera_index)
+            self.camera.set(cv2.CAP_PROP_FRAME_WIDTH, self.resolution[0])
+            self.camera.set(cv2.CAP_PROP_FRAME_HEIGHT, self.resolution[1])
+            
+            if not self.camera.isOpened():
+                raise Exception("USB kamera açılamadı")
+            
+            # Kamerayı ısıt: parlaklık oturana kadar kareleri at
+            self._wait_until_stable(self._usb_brightness)
+            
+            if config.CAMERA_GRABBER:
+                self.grabber = FrameGrabber(self.camera)
+            
+            logging.info("USB kamera başarıyla başlatıldı")
+        except Exception as e:
+            logging.error(f"USB kamera başlatılamadı: {e}")
+            raise
+    
+    def _init_replay_camera(self):
+        """Kayıttan kare veren sahte kamera başlat (donanımsız yük testi)"""
+        if not self.replay_path:
+            raise ValueError("CAMERA_TYPE = 'replay' için REPLAY_PATH gerekli")
+        logging.info(f"Tekrar oynatma kamerası başlatılıyor: {self.replay_path}")
+        self.camera = ReplayFeed(self.replay_path, config.REPLAY_FPS, config.REPLAY_LOOP,
+                                 config.REPLAY_JITTER, config.REPLAY_DROP_RATE,
+                                 config.REPLAY_SEED, source=self.name)
+        # Sabit hızda gerçek kamera gibi arka planda akar; hızlı modda her çekim
+        # sıradaki kareyi alır (aradaki kareler atlanmaz)
+        if config.CAMERA_GRABBER and config.REPLAY_FPS > 0:
+            self.grabber = FrameGrabber(self.camera)
+    
+    def _picamera_exposure(self):
+        """PiCamera2 pozlama süresi ve analog kazancı"""
+        metadata = self.camera.capture_metadata()
+        return (metadata.get('ExposureTime', 0), metadata.get('AnalogueGain', 0))
+    
+    def _usb_brightness(self):
+        """USB kameradan bir kare okuyup ortalama parlaklığını döndür"""
+        ret, image = self.camera.read()
+        if not ret:
+            return None
+        # Her 8. piksel yeterli; tam karenin ortalaması Pi'da gereksiz yavaş
+        return (float(image[::8, ::8].mean()),)
+    
+    def _wait_until_stable(self, measure):
+        """Kamera değerleri (parlaklık, pozlama) oturana kadar bekle
+        
+        Art arda CAMERA_WARMUP_STABLE_FRAMES ölçümde her değer bir öncekinden
+        en fazla CAMERA_WARMUP_TOLERANCE oranında değiştiyse kamera hazırdır.
+        CAMERA_WARMUP_TIME en uzun bekleme süresidir.
+        
+        Returns:
+            bool: Süre dolmadan oturduysa True
+        """
+        if config.CAMERA_WARMUP_TIME <= 0:
+            return True
+        started = time.monotonic()
+        deadline = started + config.CAMERA_WARMUP_TIME
+        previous = None
+        stable = 0
+        while stable < config.CAMERA_WARMUP_STABLE_FRAMES:
+            if time.monotonic() >= deadline:
+                logging.warning(
+                    f"Kamera {config.CAMERA_WARMUP_TIME} saniyede oturmadı, yine de devam ediliyor"
+                )
+                return False
+            values = measure()
+            if values is None:
+                # Kare gelmedi; kamera henüz akışa başlamamış olabilir
+                previous, stable = None, 0
+                time.sleep(0.05)
+                continue
+            if previous is not None and all(
+                    abs(value - last) <= config.CAMERA_WARMUP_TOLERANCE * max(abs(last), 1.0)
+                    for value, last in zip(values, previous)):
+                stable += 1
+            else:
+                stable = 0
+            previous = values
+        logging.info(f"Kamera {time.monotonic() - started:.2f} saniyede hazır")
+        return True
+    
+    def capture_image(self):
+        """Görüntü yakala"""
+        return self.capture_frame()[0]
+    
+    def capture_frame(self, new_frame=False):
+        """Görüntü yakala
+        
+        new_frame ise önceki çağrıdakinden farklı bir kare beklenir (seri çekim).
+        Başarısız yakalama üstel beklemeyle MAX_RETRIES kez yeniden denenir;
+        ilk yeniden deneme yalnızca kareyi tekrar okur, sonrakiler kamerayı
+        yeniden açar (USB kablosu çıkıp takıldıysa).
+        
+        Returns:
+            tuple: (görüntü, karenin kameradan alındığı zaman)
+        """
+        def capture():
+            try:
+                if self.camera is None:
+                    self.reconnect()
+                with metrics.timer('capture'):
+                    return self._read_frame(new_frame)
+            except Exception:
+                if self.replay_finished():
+                    # Kayıt bitti; yeniden açmak başa sarardı
+                    raise ReplayFinished(f"Tekrar oynatma bitti: {self.replay_path}") from None
+                metrics.increment('errors', stage='capture')
+                self._mark_down()
+                raise
+        
+        def before_retry(attempt):
+            # Tekrar oynatma kaynağı yeniden açılmaz (baştan başlardı); yalnızca tekrar okunur
+            if attempt > 0 and not isinstance(self.camera, ReplayFeed):
+                # Kamera bir sonraki denemede yeniden açılır
+                self.release()
+        
+        try:
+            with self.lock:
+                image, timestamp = retry_call(capture, f"{self.label}: görüntü yakalama",
+                                              before_retry)
+        except Exception as e:
+            logging.error(f"Görüntü yakalama hatası: {e}")
+            raise
+        self._mark_up()
+        startup.mark('ilk kare')
+        
+        logging.info("Görüntü başarıyla yakalandı")
+        return image, timestamp
+    
+    def replay_finished(self):
+        """Kamera döngüsüz bir tekrar oynatma ise ve kareleri bittiyse True"""
+        return isinstance(self.camera, ReplayFeed) and self.camera.finished
+    
+    def _mark_down(self):
+        """Kesintiyi başlat veya süresini kesinti metriğine ekle"""
+        now = time.monotonic()
+        if self.down_since is None:
+            self.down_since = now
+            logging.warning(f"{self.label}: kameradan görüntü alınamıyor")
+        else:
+            metrics.increment('camera_downtime_seconds', round(now - self.down_checkpoint, 3),
+                              source=self.label)
+        self.down_checkpoint = now
+    
+    def _mark_up(self):
+        """Kesinti bittiyse kalan süreyi metriğe ekleyip raporla"""
+        if self.down_since is None:
+            return
+        now = time.monotonic()
+        metrics.increment('camera_downtime_seconds', round(now - self.down_checkpoint, 3),
+                          source=self.label)
+        logging.info(f"{self.label}: kamera {now - self.down_since:.1f} saniyelik kesintiden "
+                     f"sonra yeniden çalışıyor")
+        print(f"✓ Kamera yeniden bağlandı ({now - self.down_since:.1f} sn kesinti)")
+        self.down_since = None
+        self.down_checkpoint = None
+    
+    def reconnect(self):
+        """Kamerayı kapatıp aynı ayarlarla yeniden aç
+        
+        Isınma sabit bir süre beklemez; kamera oturduğunda hemen devam edilir.
+        Bitmiş bir tekrar oynatma yeniden açılmaz (ReplayFinished).
+        """
+        if self.replay_finished():
+            raise ReplayFinished(f"Tekrar oynatma bitti: {self.replay_path}")
+        logging.warning(f"{self.label}: kamera yeniden açılıyor...")
+        metrics.increment('camera_reconnects', source=self.label)
+        self.release()
+        self.use_picamera = False
+        self.use_lores = False
+        try:
+            self._initialize_camera()
+            if self.camera_type == "picamera" and not self.use_picamera:
+                raise Exception("PiCamera açılamadı")
+        except Exception:
+            self.release()
+            raise
+    
+    def _read_frame(self, new_frame=False):
+        """Kameradan bir kare oku"""
+        if self.use_picamera:
+            # PiCamera2 ile yakala
+            if self.use_lores:
+                # Düşük çözünürlüklü akış YUV420 (I420) biçiminde gelir
+                image_array = self.camera.capture_array('lores')
+                return cv2.cvtColor(image_array, cv2.COLOR_YUV2BGR_I420), datetime.now()
+            image_array = self.camera.capture_array()
+            # RGB'den BGR'ye çevir (OpenCV için)
+            return cv2.cvtColor(image_array, cv2.COLOR_RGB2BGR), datetime.now()
+        
+        if self.grabber is not None:
+            # Arka planda çekilen en son kare
+            return self.grabber.retrieve(config.CAMERA_MAX_FRAME_AGE,
+                                         config.CAMERA_FRAME_TIMEOUT, new_frame)
+        
+        # USB kamera ile yakala
+        ret, image = self.camera.read()
+        if not ret:
+            raise Exception("Görüntü yakalanamadı")
+        return image, datetime.now()
+    
+    def release(self):
+        """Kamera kaynaklarını serbest bırak
+        
+        Sonraki capture_frame kamerayı yeniden açar (bkz. reconnect).
+        """
+        if self.grabber is not None:
+            self.grabber.stop()
+            self.grabber = None
+        if self.camera is None:
+            return
+        try:
+            if self.use_picamera:
+                self.camera.stop()
+                self.camera.close()
+            else:
+                self.camera.release()
+            logging.info("Kamera kaynakları serbest bırakıldı")
+        except Exception as e:
+            logging.error(f"Kamera kapatma hatası: {e}")
+        finally:
+            self.camera = None
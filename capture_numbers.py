@@ -7,352 +7,55 @@ Kullanım:
     python3 capture_numbers.py
     python3 capture_numbers.py --continuous
     python3 capture_numbers.py --config custom_config.py
+    python3 capture_numbers.py --batch captured_images
+    python3 capture_numbers.py --video kayit.mp4
+    python3 capture_numbers.py --daemon
+    python3 capture_numbers.py --profile-startup
+
+Kod modüllere bölünmüştür; bu dosya komut satırı giriş noktasıdır ve
+modüllerdeki sınıf/fonksiyonları geriye dönük uyumluluk için yeniden dışa aktarır:
+    appconfig   Etkin yapılandırma (config), load_config, setup_logging
+    runtime     Metrikler, başlangıç profili, kare kilidi, yeniden deneme
+    cameras     Kamera, kare çekicisi, kayıttan oynatma
+    engines     OCR motorları (pytesseract, tesserocr, yedi parçalı)
+    processing  Ön işleme, OCR, ROI, değişiklik algılama, kare okuyucu
+    storage     Excel yazıcısı, SQLite deposu, Excel'e aktarma
+    archives    Görüntü kaydı ve arşivi
+    pipeline    Tek çekim, zamanlayıcı, paralel işlem hattı
+    sources     Kaynak kurulumu, yapılandırmanın yeniden yüklenmesi
+    batch       Kayıtlı görüntü/videoları toplu işleme
+    daemon      Daemon servisi ve HTTP API
 """
 
 import os
 import sys
-import time
+import signal
 import logging
 import argparse
 from datetime import datetime
-from pathlib import Path
-
-import cv2
-import numpy as np
-import pytesseract
-from PIL import Image
-import pandas as pd
-from openpyxl import load_workbook, Workbook
-from openpyxl.utils.dataframe import dataframe_to_rows
-
-# Yapılandırma dosyasını içe aktar
-import config
 
-
-class CameraCapture:
-    """Kamera görüntüsü yakalama sınıfı"""
-    
-    def __init__(self, camera_type="auto", camera_index=0, resolution=(1280, 720)):
-        self.camera_type = camera_type
-        self.camera_index = camera_index
-        self.resolution = resolution
-        self.camera = None
-        self.use_picamera = False
-        
-        self._initialize_camera()
-    
-    def _initialize_camera(self):
-        """Kamera başlatma"""
-        if self.camera_type == "picamera":
-            self.use_picamera = self._try_picamera()
-        elif self.camera_type == "usb":
-            self.use_picamera = False
-            self._init_usb_camera()
-        else:  # auto
-            # Önce PiCamera dene, olmazsa USB kamera
-            self.use_picamera = self._try_picamera()
-            if not self.use_picamera:
-                self._init_usb_camera()
-    
-    def _try_picamera(self):
-        """PiCamera2 başlatmayı dene"""
-        try:
-            from picamera2 import Picamera2
-            logging.info("PiCamera2 başlatılıyor...")
-            self.camera = Picamera2()
-            camera_config = self.camera.create_still_configuration(
-                main={"size": self.resolution}
-            )
-            self.camera.configure(camera_config)
-            self.camera.start()
-            time.sleep(config.CAMERA_WARMUP_TIME)
-            logging.info("PiCamera2 başarıyla başlatıldı")
-            return True
-        except ImportError:
-            logging.warning("picamera2 modülü bulunamadı, USB kamera kullanılacak")
-            return False
-        except Exception as e:
-            logging.warning(f"PiCamera başlatılamadı: {e}, USB kamera deneniyor...")
-            return False
-    
-    def _init_usb_camera(self):
-        """USB kamera başlat"""
-        try:
-            logging.info(f"USB kamera (index: {self.camera_index}) başlatılıyor...")
-            self.camera = cv2.VideoCapture(self.camera_index)
-            self.camera.set(cv2.CAP_PROP_FRAME_WIDTH, self.resolution[0])
-            self.camera.set(cv2.CAP_PROP_FRAME_HEIGHT, self.resolution[1])
-            
-            if not self.camera.isOpened():
-                raise Exception("USB kamera açılamadı")
-            
-            # Kamerayı ısıt
-            time.sleep(config.CAMERA_WARMUP_TIME)
-            # İlk birkaç frame'i at (kamera stabilizasyonu için)
-            for _ in range(5):
-                self.camera.read()
-            
-            logging.info("USB kamera başarıyla başlatıldı")
-        except Exception as e:
-            logging.error(f"USB kamera başlatılamadı: {e}")
-            raise
-    
-    def capture_image(self):
-        """Görüntü yakala"""
-        try:
-            if self.use_picamera:
-                # PiCamera2 ile yakala
-                image_array = self.camera.capture_array()
-                # RGB'den BGR'ye çevir (OpenCV için)
-                image = cv2.cvtColor(image_array, cv2.COLOR_RGB2BGR)
-            else:
-                # USB kamera ile yakala
-                ret, image = self.camera.read()
-                if not ret:
-                    raise Exception("Görüntü yakalanamadı")
-            
-            logging.info("Görüntü başarıyla yakalandı")
-            return image
-        except Exception as e:
-            logging.error(f"Görüntü yakalama hatası: {e}")
-            raise
-    
-    def release(self):
-        """Kamera kaynaklarını serbest bırak"""
-        try:
-            if self.use_picamera and self.camera:
-                self.camera.stop()
-                self.camera.close()
-            elif not self.use_picamera and self.camera:
-                self.camera.release()
-            logging.info("Kamera kaynakları serbest bırakıldı")
-        except Exception as e:
-            logging.error(f"Kamera kapatma hatası: {e}")
-
-
-class ImageProcessor:
-    """Görüntü işleme ve OCR sınıfı"""
-    
-    @staticmethod
-    def preprocess_image(image):
-        """Görüntüyü OCR için ön işle"""
-        processed = image.copy()
-        
-        # Gri tonlamaya çevir
-        if config.GRAYSCALE:
-            processed = cv2.cvtColor(processed, cv2.COLOR_BGR2GRAY)
-        
-        # Görüntüyü büyüt (daha iyi OCR için)
-        if config.RESIZE_FACTOR != 1.0:
-            new_width = int(processed.shape[1] * config.RESIZE_FACTOR)
-            new_height = int(processed.shape[0] * config.RESIZE_FACTOR)
-            processed = cv2.resize(processed, (new_width, new_height), 
-                                   interpolation=cv2.INTER_CUBIC)
-        
-        # Gürültü azaltma
-        if config.DENOISE:
-            processed = cv2.fastNlMeansDenoising(processed)
-        
-        # Eşikleme (thresholding)
-        if config.THRESHOLD:
-            if config.THRESHOLD_METHOD == 'adaptive':
-                processed = cv2.adaptiveThreshold(
-                    processed, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
-                    cv2.THRESH_BINARY, 11, 2
-                )
-            else:  # otsu
-                _, processed = cv2.threshold(
-                    processed, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU
-                )
-        
-        return processed
-    
-    @staticmethod
-    def extract_numbers(image):
-        """OCR ile görüntüden sayıları çıkar"""
-        try:
-            # Görüntüyü ön işle
-            if config.IMAGE_PREPROCESSING:
-                processed_image = ImageProcessor.preprocess_image(image)
-            else:
-                processed_image = image
-            
-            # PIL formatına çevir
-            pil_image = Image.fromarray(processed_image)
-            
-            # OCR uygula
-            text = pytesseract.image_to_string(
-                pil_image,
-                lang=config.TESSERACT_LANG,
-                config=config.TESSERACT_CONFIG
-            )
-            
-            # OCR detaylarını al (güven skorları için)
-            data = pytesseract.image_to_data(
-                pil_image,
-                lang=config.TESSERACT_LANG,
-                config=config.TESSERACT_CONFIG,
-                output_type=pytesseract.Output.DICT
-            )
-            
-            # Güven skoru hesapla
-            confidences = [int(conf) for conf in data['conf'] if conf != '-1']
-            avg_confidence = sum(confidences) / len(confidences) if confidences else 0
-            
-            # Metni temizle
-            text = text.strip()
-            
-            logging.info(f"OCR sonucu: '{text}' (Güven: {avg_confidence:.1f}%)")
-            
-            return {
-                'text': text,
-                'confidence': avg_confidence,
-                'processed_image': processed_image
-            }
-        
-        except Exception as e:
-            logging.error(f"OCR hatası: {e}")
-            raise
-
-
-class ExcelWriter:
-    """Excel dosyası yazma sınıfı"""
-    
-    def __init__(self, filename, sheet_name="Sayılar"):
-        self.filename = filename
-        self.sheet_name = sheet_name
-    
-    def write_data(self, number_text, confidence, timestamp=None):
-        """Veriyi Excel dosyasına yaz"""
-        try:
-            if timestamp is None:
-                timestamp = datetime.now()
-            
-            # Veri satırı oluştur
-            data = {
-                'Tarih': [timestamp.strftime('%Y-%m-%d')],
-                'Saat': [timestamp.strftime('%H:%M:%S')],
-                'Sayı': [number_text],
-                'Güven (%)': [round(confidence, 2)]
-            }
-            
-            df = pd.DataFrame(data)
-            
-            # Dosya varsa ve ekleme modu aktifse
-            if os.path.exists(self.filename) and config.APPEND_MODE:
-                # Mevcut dosyayı oku
-                with pd.ExcelFile(self.filename) as xls:
-                    if self.sheet_name in xls.sheet_names:
-                        existing_df = pd.read_excel(xls, sheet_name=self.sheet_name)
-                        df = pd.concat([existing_df, df], ignore_index=True)
-                
-                # Dosyaya yaz
-                with pd.ExcelWriter(self.filename, engine='openpyxl', mode='a', 
-                                    if_sheet_exists='replace') as writer:
-                    df.to_excel(writer, sheet_name=self.sheet_name, index=False)
-            else:
-                # Yeni dosya oluştur
-                with pd.ExcelWriter(self.filename, engine='openpyxl') as writer:
-                    df.to_excel(writer, sheet_name=self.sheet_name, index=False)
-            
-            logging.info(f"Veri Excel'e yazıldı: {self.filename}")
-            return True
-        
-        except Exception as e:
-            logging.error(f"Excel yazma hatası: {e}")
-            raise
-
-
-def setup_logging():
-    """Loglama yapılandırması"""
-    log_format = '%(asctime)s - %(levelname)s - %(message)s'
-    log_level = getattr(logging, config.LOG_LEVEL.upper(), logging.INFO)
-    
-    handlers = []
-    
-    # Dosya handler
-    if config.LOG_FILE:
-        file_handler = logging.FileHandler(config.LOG_FILE, encoding='utf-8')
-        file_handler.setFormatter(logging.Formatter(log_format))
-        handlers.append(file_handler)
-    
-    # Konsol handler
-    if config.LOG_TO_CONSOLE:
-        console_handler = logging.StreamHandler()
-        console_handler.setFormatter(logging.Formatter(log_format))
-        handlers.append(console_handler)
-    
-    logging.basicConfig(
-        level=log_level,
-        format=log_format,
-        handlers=handlers
-    )
-
-
-def save_image(image, prefix="capture"):
-    """Görüntüyü diske kaydet"""
-    if not config.SAVE_IMAGES:
-        return None
-    
-    try:
-        # Çıktı klasörünü oluştur
-        output_dir = Path(config.IMAGE_OUTPUT_DIR)
-        output_dir.mkdir(exist_ok=True)
-        
-        # Dosya adı oluştur
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = output_dir / f"{prefix}_{timestamp}.jpg"
-        
-        # Görüntüyü kaydet
-        cv2.imwrite(str(filename), image)
-        logging.info(f"Görüntü kaydedildi: {filename}")
-        
-        return str(filename)
-    
-    except Exception as e:
-        logging.error(f"Görüntü kaydetme hatası: {e}")
-        return None
-
-
-def process_single_capture(camera, excel_writer):
-    """Tek bir görüntü yakalama ve işleme"""
-    try:
-        # Görüntü yakala
-        image = camera.capture_image()
-        
-        # Orijinal görüntüyü kaydet
-        if config.SAVE_IMAGES:
-            save_image(image, "original")
-        
-        # OCR işlemi
-        result = ImageProcessor.extract_numbers(image)
-        
-        # İşlenmiş görüntüyü kaydet
-        if config.SAVE_PROCESSED_IMAGES and config.SAVE_IMAGES:
-            save_image(result['processed_image'], "processed")
-        
-        # Güven skoru kontrolü
-        if result['confidence'] < config.MIN_CONFIDENCE:
-            logging.warning(
-                f"Düşük güven skoru: {result['confidence']:.1f}% "
-                f"(Minimum: {config.MIN_CONFIDENCE}%)"
-            )
-            print(f"⚠ Uyarı: Düşük güven skoru. OCR sonucu güvenilir olmayabilir.")
-        
-        # Excel'e yaz
-        if result['text']:
-            excel_writer.write_data(result['text'], result['confidence'])
-            print(f"✓ Tanınan sayı: {result['text']} (Güven: {result['confidence']:.1f}%)")
-            return True
-        else:
-            logging.warning("OCR sonucu boş")
-            print("⚠ Görüntüde sayı algılanamadı")
-            return False
-    
-    except Exception as e:
-        logging.error(f"İşlem hatası: {e}")
-        print(f"✗ Hata: {e}")
-        return False
+from appconfig import config, load_config, setup_logging
+from runtime import (Metrics, metrics, process_uptime, process_memory, StartupProfile, startup,
+                     FrameGate, frame_gate, retry_call, ReplayFinished)
+from cameras import FrameGrabber, ReplayFeed, CameraCapture
+from engines import PytesseractEngine, TesserocrEngine, SevenSegmentEngine
+from processing import (PreprocessPipeline, ImageProcessor, RoiLocator, ChangeDetector,
+                        majority_vote, FrameReader)
+from storage import (WorkbookRotation, WorkbookIndex, save_workbook, ExcelWriter, ReadingStore,
+                     SourceWriter, connect_store, foreign_sheets, check_foreign_sheets,
+                     export_excel, ExcelExporter)
+from archives import (image_encode_params, unique_image_path, save_image, FrameArchive,
+                      FrameArchiveReader, ImageArchiver, image_prefix, archive_image,
+                      archive_capture, IMAGE_TIMESTAMP_PATTERN, ARCHIVE_NAME_PATTERN,
+                      BATCH_IMAGE_EXTENSIONS, archive_source_name, image_sources, iter_image_dir,
+                      iter_frame_archive)
+from pipeline import (handle_result, burst_frames, process_single_capture, CaptureScheduler,
+                      CaptureSource, FairFrameQueue, CapturePipeline)
+from sources import (source_settings, source_sheets, camera_settings, reader_settings,
+                     create_camera, create_reader, create_source, RESTART_SETTINGS, apply_config,
+                     ConfigWatcher, start_config_watcher)
+from batch import iter_video, run_batch, load_batch_state, process_offline
+from daemon import ReadingService, DaemonServer
 
 
 def main():
@@ -371,66 +74,239 @@ def main():
         type=str,
         help='Özel yapılandırma dosyası'
     )
+    parser.add_argument(
+        '--pipeline', '-p',
+        action='store_true',
+        help='Sürekli modda yakalama, OCR ve kaydetmeyi paralel aşamalarda çalıştır'
+    )
+    parser.add_argument(
+        '--batch',
+        type=str,
+        metavar='KLASÖR',
+        help='Kamera yerine klasördeki kayıtlı görüntüleri işle'
+    )
+    parser.add_argument(
+        '--video',
+        type=str,
+        metavar='DOSYA',
+        help='Kamera yerine video dosyasındaki kareleri işle (CAPTURE_INTERVAL aralıklarla)'
+    )
+    parser.add_argument(
+        '--source',
+        type=str,
+        metavar='KAMERA',
+        help='Çoklu kamera arşivinde --batch ile yalnızca bu kameranın kayıtlarını işle'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=0,
+        help='Toplu işlemde paralel süreç sayısı (varsayılan: BATCH_WORKERS)'
+    )
+    parser.add_argument(
+        '--export',
+        action='store_true',
+        help='Veritabanındaki (DB_FILE) okumaları Excel dosyasına aktar ve çık'
+    )
+    parser.add_argument(
+        '--output', '-o',
+        type=str,
+        help='Toplu işlem/--export sonuçlarının yazılacağı Excel dosyası (varsayılan: EXCEL_FILE)'
+    )
+    parser.add_argument(
+        '--daemon', '-d',
+        action='store_true',
+        help='Kameraları açık tutup okumaları yerel API üzerinden istek üzerine yap'
+    )
+    parser.add_argument(
+        '--profile-startup',
+        action='store_true',
+        help='Başlangıç aşamalarının sürelerini (içe aktarma, kamera ısınması, ilk OCR) raporla'
+    )
     args = parser.parse_args()
     
     # Yapılandırmayı yükle
-    if args.config:
-        # Özel config dosyasını yükle
-        import importlib.util
-        spec = importlib.util.spec_from_file_location("config", args.config)
-        config_module = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(config_module)
-        globals()['config'] = config_module
-    
-    # Loglama başlat
-    setup_logging()
+    with startup.phase('yapılandırma + loglama'):
+        if args.config:
+            config.use(load_config(args.config))
+        
+        # Loglama başlat
+        setup_logging()
     logging.info("=" * 50)
     logging.info("Raspberry Pi OCR to Excel başlatılıyor...")
     logging.info("=" * 50)
     
+    # Veritabanından Excel'e aktarma
+    if args.export:
+        output = args.output or config.EXCEL_FILE
+        try:
+            rotation = WorkbookRotation.from_config(output, config.EXCEL_SHEET)
+            segments = export_excel(
+                config.DB_FILE, output, config.EXCEL_SHEET, rotation=rotation,
+                index=WorkbookIndex(config.EXCEL_INDEX_FILE) if rotation.enabled else None,
+                sheets=source_sheets()
+            )
+            rows = sum(segment['rows'] for segment in segments)
+            files = sorted({segment['file'] for segment in segments}) or [output]
+            print(f"✓ {rows} satır aktarıldı: {', '.join(files)}")
+        except Exception as e:
+            print(f"\n✗ Hata: {e}")
+            logging.error(f"Kritik hata: {e}", exc_info=True)
+            sys.exit(1)
+        return
+    
+    # Toplu işlem modu (kamera kullanılmaz)
+    if args.batch or args.video:
+        try:
+            process_offline(args)
+        except KeyboardInterrupt:
+            print("\n\n⚠ Toplu işlem durduruldu, aynı komutla kaldığı yerden devam edebilirsiniz")
+            logging.info("Toplu işlem kullanıcı tarafından durduruldu")
+        except Exception as e:
+            print(f"\n✗ Hata: {e}")
+            logging.error(f"Kritik hata: {e}", exc_info=True)
+            sys.exit(1)
+        return
+    
     # Sürekli mod kontrolü
     continuous = args.continuous or config.CONTINUOUS_MODE
     
-    camera = None
+    # Metrik dışa aktarımı
+    if config.METRICS_FILE:
+        metrics.start_exporter(config.METRICS_FILE, config.METRICS_FORMAT,
+                               config.METRICS_INTERVAL)
+    
+    sources = []
+    store = None
+    exporter = None
+    archiver = None
+    watcher = None
     try:
-        # Kamerayı başlat
-        print("Kamera başlatılıyor...")
-        camera = CameraCapture(
-            camera_type=config.CAMERA_TYPE,
-            camera_index=config.CAMERA_INDEX,
-            resolution=config.CAMERA_RESOLUTION
-        )
-        print("✓ Kamera hazır")
+        if config.STORAGE == 'sqlite':
+            # Okumalar önce veritabanına, Excel dosyası ondan üretilir
+            with startup.phase('veritabanı'):
+                # Kullanıcının Excel dosyasına eklediği sayfalar silinmesin
+                check_foreign_sheets(config.EXCEL_FILE,
+                                     {config.EXCEL_SHEET, *source_sheets().values()},
+                                     WorkbookRotation.from_config(config.EXCEL_FILE,
+                                                                  config.EXCEL_SHEET))
+                store = ReadingStore(config.DB_FILE)
+                if config.APPEND_MODE and os.path.exists(config.EXCEL_FILE):
+                    imported = store.import_excel(config.EXCEL_FILE, config.EXCEL_SHEET)
+                    if imported:
+                        print(f"✓ Mevcut Excel dosyasından {imported} satır veritabanına aktarıldı")
+                exporter = ExcelExporter(
+                    config.DB_FILE, config.EXCEL_FILE, config.EXCEL_SHEET,
+                    config.EXCEL_EXPORT_INTERVAL,
+                    start=None if config.APPEND_MODE else datetime.now(),
+                    sheets=source_sheets()
+                )
+                exporter.start_exporter()
+            print(f"✓ Veritabanı: {config.DB_FILE} (Excel: {config.EXCEL_FILE})")
+        
+        # Kameraları başlat (her kaynağın kendi okuma durumu ve çıktısı var)
+        for settings in source_settings():
+            if settings.get('name'):
+                print(f"Kamera başlatılıyor: {settings['name']}...")
+            else:
+                print("Kamera başlatılıyor...")
+            with startup.phase(f"kamera {settings.get('name') or ''}".strip()):
+                sources.append(create_source(settings, store))
+        print("✓ Kamera hazır" if len(sources) == 1 else f"✓ {len(sources)} kamera hazır")
+        if store is None:
+            for source in sources:
+                print(f"✓ Excel dosyası: {source.excel_writer.filename}")
         
-        # Excel writer oluştur
-        excel_writer = ExcelWriter(config.EXCEL_FILE, config.EXCEL_SHEET)
-        print(f"✓ Excel dosyası: {config.EXCEL_FILE}")
+        # Görüntü kaydı OCR döngüsünü bekletmesin (parça arşivi her zaman arka planda)
+        if config.SAVE_IMAGES and (config.ASYNC_ARCHIVE or config.ARCHIVE_FORMAT == 'chunks'):
+            archiver = ImageArchiver()
         
-        if continuous:
+        if args.daemon:
+            # Kameralar açık kalır, okumalar yerel API'den istenir
+            service = ReadingService(sources, archiver, config.DAEMON_HISTORY)
+            server = DaemonServer(service, config.DAEMON_SOCKET, config.DAEMON_HOST,
+                                  config.DAEMON_PORT)
+            # OCR motoru ilk istekten önce yüklensin
+            ImageProcessor.get_engine()
+            server.start()
+            print(f"\n🛰 Daemon modu aktif: {', '.join(server.addresses())}")
+            print("   Durdurmak için Ctrl+C basın\n")
+            watcher = start_config_watcher(args.config or config.__file__, sources, store)
+            # systemd gibi yöneticilerin SIGTERM'i de temiz kapanış yapsın
+            signal.signal(signal.SIGTERM, lambda signum, frame: service.stop())
+            try:
+                service.serve()
+            finally:
+                server.stop()
+        elif continuous:
             # Sürekli çalışma modu
             print(f"\n📸 Sürekli çalışma modu aktif")
-            print(f"   Çekim aralığı: {config.CAPTURE_INTERVAL} saniye")
-            if config.MAX_CAPTURES > 0:
-                print(f"   Maksimum çekim: {config.MAX_CAPTURES}")
+            for source in sources:
+                label = f"{source.name}: " if source.name else ""
+                first = source.scheduler.next_time()
+                print(f"   {label}Çekim aralığı: {source.interval} saniye "
+                      f"(ilk çekim {f'{first:%H:%M:%S}' if first else 'hemen'})")
+                if source.max_captures > 0:
+                    print(f"   {label}Maksimum çekim: {source.max_captures}")
             print("   Durdurmak için Ctrl+C basın\n")
             
-            capture_count = 0
-            while True:
-                if config.MAX_CAPTURES > 0 and capture_count >= config.MAX_CAPTURES:
+            # Yapılandırma değişiklikleri yeniden başlatmadan, kareler arasında uygulanır
+            watcher = start_config_watcher(args.config or config.__file__, sources, store)
+            
+            if args.pipeline or config.PIPELINE_MODE or len(sources) > 1:
+                # Yakalama, OCR ve kaydetme ayrı aşamalarda; kameralar ortak OCR havuzunda
+                pipeline = CapturePipeline(sources, archiver)
+                pipeline.run()
+                if len(sources) > 1:
+                    print("\n📊 Kamera istatistikleri:")
+                    pipeline.print_stats()
+                elif config.MAX_CAPTURES > 0:
                     print(f"\n✓ Maksimum çekim sayısına ulaşıldı: {config.MAX_CAPTURES}")
-                    break
-                
-                print(f"\n--- Çekim #{capture_count + 1} ---")
-                process_single_capture(camera, excel_writer)
-                capture_count += 1
+            else:
+                source = sources[0]
+                capture_count = 0
+                while True:
+                    if config.MAX_CAPTURES > 0 and capture_count >= config.MAX_CAPTURES:
+                        print(f"\n✓ Maksimum çekim sayısına ulaşıldı: {config.MAX_CAPTURES}")
+                        break
+                    
+                    # Sabit adımlı, duvar saatine hizalı çekim anını bekle
+                    source.scheduler.wait()
+                    print(f"\n--- Çekim #{capture_count + 1} ---")
+                    try:
+                        with frame_gate.frame():
+                            process_single_capture(source.camera, source.excel_writer,
+                                                   source.reader, archiver,
+                                                   scheduler=source.scheduler)
+                            source.excel_writer.flush_if_due()
+                    except ReplayFinished as e:
+                        print(f"\n✓ {e}")
+                        logging.info(str(e))
+                        break
+                    capture_count += 1
+                    
+                    next_time = source.scheduler.next_time()
+                    # Aralık yoksa sonraki çekim beklemeden yapılır
+                    if next_time and (config.MAX_CAPTURES == 0 or
+                                      capture_count < config.MAX_CAPTURES):
+                        print(f"⏳ Sonraki çekim: {next_time:%H:%M:%S}")
                 
-                if config.MAX_CAPTURES == 0 or capture_count < config.MAX_CAPTURES:
-                    print(f"⏳ {config.CAPTURE_INTERVAL} saniye bekleniyor...")
-                    time.sleep(config.CAPTURE_INTERVAL)
+                if source.scheduler.missed:
+                    print(f"⚠ {source.scheduler.missed} çekim zamanı kaçırıldı "
+                          f"(işlem süresi çekim aralığından uzun)")
         else:
             # Tek çekim modu
             print("\n📸 Görüntü yakalanıyor...\n")
-            process_single_capture(camera, excel_writer)
+            for source in sources:
+                if source.name:
+                    print(f"\n--- {source.name} ---")
+                try:
+                    process_single_capture(source.camera, source.excel_writer, source.reader,
+                                           archiver, source.name)
+                except ReplayFinished as e:
+                    # Kayıt bitti: hata değil, diğer kaynaklar yine okunur
+                    print(f"✓ {e}")
+                    logging.info(str(e))
         
         print("\n✓ İşlem tamamlandı!")
         logging.info("İşlem başarıyla tamamlandı")
@@ -446,11 +322,26 @@ def main():
     
     finally:
         # Temizlik
-        if camera:
+        if watcher:
+            watcher.stop()
+        if archiver:
+            archiver.close()
+        if sources:
             print("Kamera kapatılıyor...")
-            camera.release()
+        for source in sources:
+            source.close()
+        if store:
+            try:
+                store.close()
+            except Exception as e:
+                print(f"✗ Veritabanı kaydedilemedi: {e}")
+        if exporter:
+            exporter.stop_exporter(force=continuous or args.daemon)
+        metrics.stop_exporter()
         print("Program sonlandırıldı.")
         logging.info("Program sonlandırıldı")
+        if args.profile_startup:
+            startup.report()
 
 
 if __name__ == "__main__":
@@ -19,29 +19,51 @@ Kullanım:
 # MIN_CONFIDENCE = 70
 # 
 # CONTINUOUS_MODE = True
-# CAPTURE_INTERVAL = 60  # Her dakika bir okuma
+# CAPTURE_INTERVAL = 60  # Her dakikanın başında bir okuma
 # MAX_CAPTURES = 1440    # 24 saat (60 dakika x 24)
+# CAPTURE_INTERVAL_MAX = 300    # Sayaç dururken 5 dakikada bire kadar seyrelt
+# 
+# ROI = (400, 300, 600, 150)  # Sayaç ekranının konumu
+# SKIP_UNCHANGED = True         # Değer değişmediyse OCR yapma
 # 
 # EXCEL_FILE = "enerji_sayaci_okumalari.xlsx"
 # EXCEL_SHEET = "Günlük Okumalar"
+# EXCEL_ROTATE = 'week'         # Haftada bir yeni dosya (..._2026-W01.xlsx)
+# STORAGE = 'sqlite'           # Okumalar önce veritabanına, Excel ondan üretilir
+# DB_FILE = "enerji_sayaci.db"
+# EXCEL_EXPORT_INTERVAL = 3600  # Excel saatte bir güncellensin
+# 
+# OCR_ENGINE = 'sevenseg'      # LCD sayaçta Tesseract yerine yedi parçalı tanıyıcı
+# RESIZE_FACTOR = 1.0
 # 
 # SAVE_IMAGES = True
 # IMAGE_OUTPUT_DIR = "sayac_goruntuleri"
+# JPEG_QUALITY = 75             # Daha küçük arşiv
+# ARCHIVE_FORMAT = 'chunks'     # Binlerce küçük JPEG yerine parça dosyaları
 
 # ============================================
 # SENARYO 2: Yüksek Hızlı Sayma
 # ============================================
 # CAMERA_TYPE = "picamera"
 # CAMERA_RESOLUTION = (640, 480)  # Düşük çözünürlük = hızlı işleme
+# PICAMERA_MODE = 'video'         # Fotoğraf ayarı yerine sürekli akıştan yakala
+# OCR_ENGINE = 'tesserocr'        # Her karede yeni tesseract süreci başlatma
 # 
 # IMAGE_PREPROCESSING = True
 # RESIZE_FACTOR = 1.5  # Daha az büyütme
+# DENOISE_METHOD = 'median'  # fastNlMeans yerine hızlı filtre
+# RESIZE_LAST = True         # Filtreleri küçük görüntüde uygula
+# ROI_AUTO_DETECT = True  # Sadece sayı bölgesini işle
 # 
 # CONTINUOUS_MODE = True
 # CAPTURE_INTERVAL = 1  # Her saniye
 # MAX_CAPTURES = 0      # Sınırsız
+# PIPELINE_MODE = True  # Yakalama ve OCR paralel çalışsın
+# PIPELINE_OCR_WORKERS = 3
 # 
 # EXCEL_FILE = "hizli_sayim.xlsx"
+# EXCEL_ROTATE = 'day'
+# EXCEL_ROTATE_ROWS = 50000     # Günde 86400 okuma: dosyalar ofiste açılabilir kalsın
 # SAVE_IMAGES = False   # Hız için görüntü kaydetme
 
 # ============================================
@@ -55,10 +77,14 @@ Kullanım:
 # THRESHOLD = True
 # THRESHOLD_METHOD = 'otsu'
 # DENOISE = True
-# RESIZE_FACTOR = 3.0  # Maksimum büyütme
+# RESIZE_FACTOR = 'auto'  # Rakamları Tesseract'ın sevdiği boya getir (sabit 3.0 yerine)
 # 
 # MIN_CONFIDENCE = 90  # Yüksek güven eşiği
 # 
+# # Alternatif: pahalı ön işleme yerine seri çekim ve oylama
+# BURST_FRAMES = 5      # En fazla 5 kare, iki okuma uyuşunca dur
+# BURST_WORKERS = 2
+# 
 # SAVE_IMAGES = True
 # SAVE_PROCESSED_IMAGES = True
 # 
@@ -81,6 +107,33 @@ Kullanım:
 # 
 # EXCEL_FILE = "test_results.xlsx"
 
+# ============================================
+# SENARYO 5: Tek Pi'da Birden Fazla Sayaç
+# ============================================
+# SOURCES = [
+#     {'name': 'elektrik', 'camera_index': 0, 'roi': (400, 300, 600, 150),
+#      'sheet': 'Elektrik'},
+#     {'name': 'su', 'camera_index': 2, 'interval': 30, 'sheet': 'Su'},
+#     {'name': 'gaz', 'camera_index': 4, 'roi_auto_detect': True, 'sheet': 'Gaz'},
+# ]
+# PIPELINE_OCR_WORKERS = 3  # Tüm kameralar ortak OCR havuzunu kullanır
+# CONTINUOUS_MODE = True
+
+# ============================================
+# SENARYO 6: Donanımsız Yük ve Uzun Süre Testi
+# ============================================
+# CAMERA_TYPE = "replay"
+# REPLAY_PATH = "captured_images"  # veya video dosyası
+# REPLAY_FPS = 15
+# REPLAY_JITTER = 0.05
+# REPLAY_DROP_RATE = 0.01
+# REPLAY_SEED = 42
+# 
+# CONTINUOUS_MODE = True
+# CAPTURE_INTERVAL = 1
+# MAX_CAPTURES = 0
+# METRICS_FILE = "soak.prom"  # resident_memory_bytes ile bellek büyümesini izle
+
 # ============================================
 # VARSAYILAN AYARLAR (config.py ile aynı)
 # ============================================
@@ -90,11 +143,31 @@ CAMERA_TYPE = "auto"
 CAMERA_INDEX = 0
 CAMERA_RESOLUTION = (1280, 720)
 CAMERA_WARMUP_TIME = 2
+CAMERA_WARMUP_TOLERANCE = 0.02
+CAMERA_WARMUP_STABLE_FRAMES = 3
+CAMERA_GRABBER = True
+CAMERA_MAX_FRAME_AGE = 0.5
+CAMERA_FRAME_TIMEOUT = 2
+PICAMERA_MODE = 'still'
+PICAMERA_LORES = None
+
+# Tekrar Oynatma Kamerası
+REPLAY_PATH = None
+REPLAY_FPS = 0
+REPLAY_LOOP = True
+REPLAY_JITTER = 0
+REPLAY_DROP_RATE = 0
+REPLAY_SEED = None
+
+# Çoklu Kamera
+SOURCES = []
 
 # OCR Ayarları
 TESSERACT_CONFIG = '--oem 3 --psm 6 -c tessedit_char_whitelist=0123456789.'
 TESSERACT_LANG = 'eng'
 MIN_CONFIDENCE = 60
+OCR_ENGINE = 'pytesseract'
+SEVENSEG_SLANT = 0
 
 # Görüntü Ön İşleme Ayarları
 IMAGE_PREPROCESSING = True
@@ -102,28 +175,102 @@ GRAYSCALE = True
 THRESHOLD = True
 THRESHOLD_METHOD = 'adaptive'
 DENOISE = True
+DENOISE_METHOD = 'nlmeans'
+DENOISE_KERNEL = 3
 RESIZE_FACTOR = 2.0
+AUTO_SCALE_HEIGHT = 32
+AUTO_SCALE_LIMITS = (0.25, 4.0)
+RESIZE_LAST = False
+
+# İlgi Bölgesi (ROI) Ayarları
+ROI = None
+ROI_AUTO_DETECT = False
+ROI_PADDING = 0.2
+ROI_DRIFT_THRESHOLD = 0.5
+
+# Değişiklik Algılama
+SKIP_UNCHANGED = False
+CHANGE_METHOD = 'diff'
+CHANGE_THRESHOLD = 20
+CHANGE_MAX_SKIPS = 60
+LOG_REPEATED = True
+
+# Seri Çekim
+BURST_FRAMES = 1
+BURST_WORKERS = 2
+BURST_PREPROCESS = {'RESIZE_FACTOR': 1.5, 'DENOISE_METHOD': 'median', 'RESIZE_LAST': True}
+
+# Veritabanı Ayarları
+STORAGE = 'excel'
+DB_FILE = "ocr_results.db"
+DB_COMMIT_ROWS = 10
+DB_COMMIT_INTERVAL = 5
+EXCEL_EXPORT_INTERVAL = 60
 
 # Excel Ayarları
 EXCEL_FILE = "ocr_results.xlsx"
 EXCEL_SHEET = "Sayılar"
 APPEND_MODE = True
+EXCEL_FLUSH_ROWS = 10
+EXCEL_FLUSH_INTERVAL = 30
+EXCEL_ROTATE = None
+EXCEL_ROTATE_ROWS = 0
+EXCEL_ROTATE_TARGET = 'file'
+EXCEL_INDEX_FILE = "excel_index.json"
 
 # Loglama Ayarları
 LOG_FILE = "ocr_log.txt"
 LOG_LEVEL = "INFO"
 LOG_TO_CONSOLE = True
 
+# Metrikler
+METRICS_FILE = None
+METRICS_FORMAT = 'prometheus'
+METRICS_INTERVAL = 15
+
 # Çalışma Modu
 CONTINUOUS_MODE = False
 CAPTURE_INTERVAL = 5
 MAX_CAPTURES = 100
+CAPTURE_ALIGN = True
+CAPTURE_INTERVAL_MAX = 0
+CAPTURE_STABLE_READS = 3
+
+# Yapılandırma İzleme
+CONFIG_WATCH = True
+CONFIG_WATCH_INTERVAL = 2
+
+# İşlem Hattı (Pipeline) Ayarları
+PIPELINE_MODE = False
+PIPELINE_OCR_WORKERS = 2
+PIPELINE_QUEUE_SIZE = 4
+PIPELINE_BACKPRESSURE = 'drop_oldest'
+
+# Daemon Modu (--daemon)
+DAEMON_SOCKET = "/tmp/raspi_ocr.sock"
+DAEMON_HOST = '127.0.0.1'
+DAEMON_PORT = 0
+DAEMON_HISTORY = 100
+DAEMON_CAPTURE_TIMEOUT = 30
+
+# Toplu İşlem (--batch / --video)
+BATCH_WORKERS = 0
 
 # Görüntü Kaydetme
 SAVE_IMAGES = True
 IMAGE_OUTPUT_DIR = "captured_images"
 SAVE_PROCESSED_IMAGES = True
+IMAGE_FORMAT = 'jpg'
+JPEG_QUALITY = 90
+PNG_COMPRESSION = 3
+ASYNC_ARCHIVE = True
+ARCHIVE_QUEUE_SIZE = 16
+ARCHIVE_PRESSURE_SAMPLE = 4
+ARCHIVE_FORMAT = 'images'
+ARCHIVE_CHUNK_FRAMES = 3600
+ARCHIVE_ROI_ONLY = True
 
 # Hata Yönetimi
 MAX_RETRIES = 3
 RETRY_DELAY = 1
+RETRY_MAX_DELAY = 30
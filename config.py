@@ -4,15 +4,38 @@ Bu dosyayı düzenleyerek programın davranışını özelleştirebilirsiniz.
 """
 
 # Kamera Ayarları
-CAMERA_TYPE = "auto"  # "picamera", "usb", "auto" (otomatik algıla)
+CAMERA_TYPE = "auto"  # "picamera", "usb", "auto" (otomatik algıla) veya "replay" (kayıttan, donanımsız test)
 CAMERA_INDEX = 0  # USB kamera için cihaz indeksi
 CAMERA_RESOLUTION = (1280, 720)  # Görüntü çözünürlüğü (genişlik, yükseklik)
-CAMERA_WARMUP_TIME = 2  # Kamera ısınma süresi (saniye)
+CAMERA_WARMUP_TIME = 2  # En uzun kamera ısınma süresi (saniye); parlaklık/pozlama oturunca daha erken biter
+CAMERA_WARMUP_TOLERANCE = 0.02  # Ardışık ölçümler arasında izin verilen değişim oranı
+CAMERA_WARMUP_STABLE_FRAMES = 3  # Kamera hazır sayılmadan önce bu kadar ardışık oturmuş ölçüm
+CAMERA_GRABBER = True  # USB kamerada kareleri arka planda sürekli çek (eski tampon karesi yerine en son kare)
+CAMERA_MAX_FRAME_AGE = 0.5  # Bundan eski kare bayat sayılır, yenisi beklenir (saniye)
+CAMERA_FRAME_TIMEOUT = 2  # Taze kare için en fazla bekleme (saniye)
+PICAMERA_MODE = 'still'  # 'still' (fotoğraf ayarı, yavaş) veya 'video' (sürekli akış, hızlı)
+PICAMERA_LORES = None  # 'video' modunda kareleri bu boyuttaki düşük çözünürlüklü akıştan al, örn. (640, 480)
+
+# Tekrar Oynatma Kamerası (CAMERA_TYPE = "replay", yük ve uzun süre testi)
+REPLAY_PATH = None  # Video dosyası veya görüntü klasörü
+REPLAY_FPS = 0  # Kare hızı (0 = beklemeden, her çekimde sıradaki kare)
+REPLAY_LOOP = True  # Kayıt bitince başa sar (False = kayıt bitince o kaynağın çekimi durur)
+REPLAY_JITTER = 0  # Her kareye eklenecek en fazla rastgele gecikme (saniye)
+REPLAY_DROP_RATE = 0  # Kare kaybı olasılığı (0-1), yakalama hatası olarak görünür
+REPLAY_SEED = None  # Tekrarlanabilir gecikme/kayıp için rastgele tohum
+
+# Çoklu Kamera
+# Her kaynak bir sözlüktür: 'name' (zorunlu), 'camera_type', 'camera_index',
+# 'resolution', 'replay_path', 'roi', 'roi_auto_detect', 'interval', 'max_captures', 'sheet',
+# 'excel_file' (STORAGE = 'excel' için). Verilmeyen ayarlar genel ayarlardan alınır.
+SOURCES = []  # Boş = yukarıdaki ayarlarla tek kamera
 
 # OCR Ayarları
 TESSERACT_CONFIG = '--oem 3 --psm 6 -c tessedit_char_whitelist=0123456789.'  # Sadece sayılar ve nokta
 TESSERACT_LANG = 'eng'  # OCR dili ('eng' veya 'tur')
 MIN_CONFIDENCE = 60  # Minimum güven skoru (0-100)
+OCR_ENGINE = 'pytesseract'  # 'pytesseract', 'tesserocr' (süreç içi, daha hızlı; kurulu değilse pytesseract) veya 'sevenseg' (yedi parçalı LCD/LED, Tesseract'sız)
+SEVENSEG_SLANT = 0  # 'sevenseg': rakamların sağa yatıklığı (derece, örn. 8)
 
 # Görüntü Ön İşleme Ayarları
 IMAGE_PREPROCESSING = True  # Görüntü ön işlemeyi etkinleştir
@@ -20,28 +43,102 @@ GRAYSCALE = True  # Gri tonlamaya çevir
 THRESHOLD = True  # Eşikleme uygula
 THRESHOLD_METHOD = 'adaptive'  # 'adaptive' veya 'otsu'
 DENOISE = True  # Gürültü azaltma
-RESIZE_FACTOR = 2.0  # Görüntüyü büyütme faktörü (OCR doğruluğu için)
+DENOISE_METHOD = 'nlmeans'  # 'nlmeans' (en iyi, çok yavaş), 'median', 'bilateral', 'gaussian' (hızlı)
+DENOISE_KERNEL = 3  # median/gaussian çekirdek boyutu, bilateral komşuluk çapı
+RESIZE_FACTOR = 2.0  # Görüntüyü büyütme faktörü (OCR doğruluğu için) veya 'auto' (karakter yüksekliğine göre)
+AUTO_SCALE_HEIGHT = 32  # 'auto': karakterlerin getirileceği yükseklik (piksel, Tesseract için ~30)
+AUTO_SCALE_LIMITS = (0.25, 4.0)  # 'auto': en küçük ve en büyük ölçek
+RESIZE_LAST = False  # Gürültü azaltma ve eşiklemeyi büyütmeden önce yap (çok daha hızlı)
+
+# İlgi Bölgesi (ROI) Ayarları
+ROI = None  # Sabit bölge (x, y, genişlik, yükseklik); None = tüm kare
+ROI_AUTO_DETECT = False  # ROI tanımlı değilse sayı bölgesini otomatik bul
+ROI_PADDING = 0.2  # Otomatik bölgeye eklenecek kenar payı (bölge yüksekliğine oranla)
+ROI_DRIFT_THRESHOLD = 0.5  # Bölgedeki kenar yoğunluğu bu orana düşerse yeniden ara
+
+# Değişiklik Algılama
+SKIP_UNCHANGED = False  # Görüntü değişmediyse OCR'ı atla, son sonucu kullan
+CHANGE_METHOD = 'diff'  # 'diff' (ortalama mutlak fark) veya 'hash' (algısal hash)
+CHANGE_THRESHOLD = 20  # 'diff' için blok başına gri seviye farkı (0-255), 'hash' için farklı bit sayısı (0-256)
+CHANGE_MAX_SKIPS = 60  # Bu kadar atlamadan sonra OCR'ı yine de çalıştır (0 = sınırsız)
+LOG_REPEATED = True  # Değişmeyen karelerde de 'tekrar' notuyla satır yaz
+
+# Seri Çekim
+BURST_FRAMES = 1  # 1 = kapalı; >1 ise en fazla bu kadar kare okunur, iki okuma uyuşunca durulur
+BURST_WORKERS = 2  # Seri çekimde aynı anda okunan kare sayısı
+BURST_PREPROCESS = {'RESIZE_FACTOR': 1.5, 'DENOISE_METHOD': 'median', 'RESIZE_LAST': True}  # Seri çekim karelerinde genel ayarların yerine kullanılan (ucuz) ön işleme ayarları
+
+# Veritabanı Ayarları
+STORAGE = 'excel'  # 'excel' (doğrudan Excel'e yaz) veya 'sqlite' (okumalar önce veritabanına, Excel ondan üretilir; dosyada başka sayfa olmamalı)
+DB_FILE = "ocr_results.db"  # SQLite veritabanı dosyası
+DB_COMMIT_ROWS = 10  # Bu kadar satır biriktiğinde işlemi kaydet (commit)
+DB_COMMIT_INTERVAL = 5  # En geç bu kadar saniyede bir işlemi kaydet
+EXCEL_EXPORT_INTERVAL = 60  # Excel dosyasını veritabanından yeniden üretme aralığı (saniye, 0 = yalnızca çıkışta)
 
 # Excel Ayarları
-EXCEL_FILE = "ocr_results.xlsx"  # Çıktı Excel dosyası
+EXCEL_FILE = "ocr_results.xlsx"  # Çıktı Excel dosyası (döndürmede strftime kodları kullanılabilir, örn. "readings_%Y-%m-%d.xlsx")
 EXCEL_SHEET = "Sayılar"  # Excel sheet ismi
 APPEND_MODE = True  # Mevcut dosyaya ekle (False ise üzerine yaz)
+EXCEL_FLUSH_ROWS = 10  # Bu kadar satır biriktiğinde diske yaz (STORAGE = 'excel' ve toplu işlem)
+EXCEL_FLUSH_INTERVAL = 30  # En geç bu kadar saniyede bir diske yaz (STORAGE = 'excel' ve toplu işlem)
+EXCEL_ROTATE = None  # None (tek dosya), 'day' (günlük) veya 'week' (haftalık) döndürme
+EXCEL_ROTATE_ROWS = 0  # Bu kadar satırdan sonra yeni dosyaya geç (0 = kapalı)
+EXCEL_ROTATE_TARGET = 'file'  # 'file' (yeni dosya) veya 'sheet' (aynı dosyada yeni sayfa)
+EXCEL_INDEX_FILE = "excel_index.json"  # Döndürülen dosyaların dizini
 
 # Loglama Ayarları
 LOG_FILE = "ocr_log.txt"  # Log dosyası
 LOG_LEVEL = "INFO"  # DEBUG, INFO, WARNING, ERROR, CRITICAL
 LOG_TO_CONSOLE = True  # Konsola da log yazdır
 
+# Metrikler
+METRICS_FILE = None  # Metrik dosyası (örn. "/var/lib/node_exporter/textfile_collector/raspi_ocr.prom"); None = kapalı
+METRICS_FORMAT = 'prometheus'  # 'prometheus' (node exporter textfile) veya 'json'
+METRICS_INTERVAL = 15  # Metrik dosyasının güncellenme aralığı (saniye)
+
 # Çalışma Modu
 CONTINUOUS_MODE = False  # Sürekli çalışma modu (True) veya tek çekim (False)
 CAPTURE_INTERVAL = 5  # Sürekli modda çekimler arası bekleme (saniye)
 MAX_CAPTURES = 100  # Sürekli modda maksimum çekim sayısı (0 = sınırsız)
+CAPTURE_ALIGN = True  # Çekimleri duvar saatine hizala (60 sn → her dakikanın başı); işlem süresi aralığı kaydırmaz
+CAPTURE_INTERVAL_MAX = 0  # Uyarlamalı aralık: değer değişmedikçe aralık bu değere kadar ikiye katlanır (0 = kapalı)
+CAPTURE_STABLE_READS = 3  # Aralık uzatılmadan önce art arda değişmeyen okuma sayısı
+
+# Yapılandırma İzleme
+CONFIG_WATCH = True  # Sürekli modda yapılandırma dosyası değişince yeniden yükle (kamera yalnızca kendi ayarları değişirse yeniden başlatılır)
+CONFIG_WATCH_INTERVAL = 2  # Dosya değişikliği kontrol aralığı (saniye); SIGHUP beklemeden yükler
+
+# İşlem Hattı (Pipeline) Ayarları
+PIPELINE_MODE = False  # Sürekli modda yakalama, OCR ve kaydetmeyi paralel aşamalarda çalıştır
+PIPELINE_OCR_WORKERS = 2  # Paralel OCR iş parçacığı sayısı
+PIPELINE_QUEUE_SIZE = 4  # Aşamalar arası kuyruk kapasitesi
+PIPELINE_BACKPRESSURE = 'drop_oldest'  # 'drop_oldest' (en eski kareyi at) veya 'block' (yakalamayı beklet)
+
+# Daemon Modu (--daemon)
+DAEMON_SOCKET = "/tmp/raspi_ocr.sock"  # Yerel API'nin Unix soketi (None = kapalı)
+DAEMON_HOST = '127.0.0.1'  # TCP dinleme adresi (yalnızca bu makine)
+DAEMON_PORT = 0  # TCP portu (0 = kapalı), örn. 8765
+DAEMON_HISTORY = 100  # /history için bellekte tutulan son okuma sayısı
+DAEMON_CAPTURE_TIMEOUT = 30  # /capture isteğinin en uzun bekleme süresi (saniye)
+
+# Toplu İşlem (--batch / --video)
+BATCH_WORKERS = 0  # Paralel süreç sayısı (0 = tüm çekirdekler)
 
 # Görüntü Kaydetme
 SAVE_IMAGES = True  # Yakalanan görüntüleri kaydet
 IMAGE_OUTPUT_DIR = "captured_images"  # Görüntülerin kaydedileceği klasör
 SAVE_PROCESSED_IMAGES = True  # İşlenmiş görüntüleri de kaydet
+IMAGE_FORMAT = 'jpg'  # 'jpg' veya 'png'
+JPEG_QUALITY = 90  # JPEG kalitesi (0-100)
+PNG_COMPRESSION = 3  # PNG sıkıştırma seviyesi (0-9)
+ASYNC_ARCHIVE = True  # Görüntüleri arka planda kaydet (OCR döngüsünü bekletmez)
+ARCHIVE_QUEUE_SIZE = 16  # Kaydedilmeyi bekleyen en fazla görüntü sayısı
+ARCHIVE_PRESSURE_SAMPLE = 4  # Kuyruk yarıdan fazla doluyken her N görüntüden birini kaydet
+ARCHIVE_FORMAT = 'images'  # 'images' (her görüntü ayrı dosya) veya 'chunks' (dönen parça dosyaları, --batch ile okunabilir)
+ARCHIVE_CHUNK_FRAMES = 3600  # Parça başına kare sayısı
+ARCHIVE_ROI_ONLY = True  # Parça arşivinde orijinal karenin yalnızca ROI bölgesini sakla
 
 # Hata Yönetimi
-MAX_RETRIES = 3  # Başarısız OCR denemelerinde maksimum tekrar sayısı
-RETRY_DELAY = 1  # Tekrar denemeleri arasındaki bekleme (saniye)
+MAX_RETRIES = 3  # Başarısız yakalama ve OCR denemelerinde maksimum tekrar sayısı (kamera 2. tekrardan itibaren yeniden açılır)
+RETRY_DELAY = 1  # İlk tekrar öncesi bekleme (saniye); her tekrarda ikiye katlanır
+RETRY_MAX_DELAY = 30  # Tekrarlar arasındaki en uzun bekleme (saniye)
@@ -0,0 +1,282 @@
+"""
+Daemon modu - Capture Numbers uygulaması için
+Kameraları açık tutup istek üzerine okuyan servis ve yerel HTTP API'si
+"""
+
+import os
+import time
+import json
+import queue
+import logging
+import threading
+import concurrent.futures
+from collections import deque
+
+from appconfig import config
+from runtime import metrics, frame_gate
+from archives import archive_capture
+from pipeline import handle_result, burst_frames
+
+
+class ReadingService:
+    """Daemon modu: kameraları ve OCR motorunu sıcak tutup istek üzerine okuyan servis
+    
+    Yerel API istekleri (DaemonServer) ayrı iş parçacıklarında gelir; çekimler
+    ise kameraları ve veritabanını açan ana iş parçacığında, serve() içinde
+    sırayla yapılır. Aynı kaynak için henüz başlamamış bir çekim varsa yeni
+    istek ona eklenir (aynı anda gelen istekler tek kare okutur).
+    """
+    
+    def __init__(self, sources, archiver=None, history=100):
+        self.sources = list(sources)
+        self.archiver = archiver
+        self.started = time.monotonic()
+        self.lock = threading.Lock()
+        self.jobs = queue.Queue()
+        self.pending = {}
+        self.history = deque(maxlen=max(1, history))
+        self.latest = {}
+        self.stop_event = threading.Event()
+    
+    def find_source(self, name=None):
+        """Adı verilen kaynağı (verilmezse ilk kaynağı) bul
+        
+        Raises:
+            KeyError: Kaynak yoksa
+        """
+        if not name:
+            return self.sources[0]
+        for source in self.sources:
+            if source.name == name or source.label == name:
+                return source
+        raise KeyError(name)
+    
+    def request_capture(self, name=None):
+        """Çekim isteğini kuyruğa ekle
+        
+        Returns:
+            concurrent.futures.Future: Okuma sözlüğüyle tamamlanır
+        """
+        source = self.find_source(name)
+        with self.lock:
+            future = self.pending.get(id(source))
+            if future is None:
+                future = concurrent.futures.Future()
+                self.pending[id(source)] = future
+                self.jobs.put(source)
+            return future
+    
+    def capture(self, source):
+        """Kaynaktan bir kare okuyup kaydet (ana iş parçacığında çağrılır)
+        
+        Returns:
+            dict: Okuma (source, timestamp, text, confidence, repeated, saved, duration_ms)
+        """
+        started = time.monotonic()
+        with frame_gate.frame():
+            image, timestamp = source.camera.capture_frame()
+            source.count('captures')
+            result = source.reader.read(image, burst_frames(source.camera))
+            source.count('reads', time.monotonic() - started)
+            archive_capture(self.archiver, image, result, timestamp, source.name)
+            saved = handle_result(result, source.excel_writer, timestamp)
+            source.excel_writer.flush_if_due()
+        
+        reading = {
+            'source': source.label,
+            'timestamp': timestamp.isoformat(timespec='milliseconds'),
+            'text': result['text'],
+            'confidence': round(result['confidence'], 2),
+            'repeated': bool(result.get('repeated')),
+            'saved': bool(saved),
+            'duration_ms': round((time.monotonic() - started) * 1000, 1)
+        }
+        with self.lock:
+            self.latest[source.label] = reading
+            self.history.append(reading)
+        return reading
+    
+    def serve(self):
+        """stop() çağrılana kadar kuyruktaki çekimleri yap"""
+        while not self.stop_event.is_set():
+            try:
+                source = self.jobs.get(timeout=1)
+            except queue.Empty:
+                # İstek gelmese de bekleyen satırlar zamanında kaydedilsin
+                for source in self.sources:
+                    source.excel_writer.flush_if_due()
+                continue
+            
+            with self.lock:
+                future = self.pending.pop(id(source))
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(self.capture(source))
+            except Exception as e:
+                source.count('errors')
+                metrics.increment('errors', stage='daemon')
+                logging.error(f"{source.label}: çekim hatası: {e}", exc_info=True)
+                future.set_exception(e)
+    
+    def stop(self):
+        """serve() döngüsünü bitir"""
+        self.stop_event.set()
+    
+    def health(self):
+        """Servis ve kaynak durumu"""
+        with self.lock:
+            latest = dict(self.latest)
+        sources = {}
+        for source in self.sources:
+            stats = source.stats()
+            reading = latest.get(source.label)
+            stats['latest'] = reading['timestamp'] if reading else None
+            sources[source.label] = stats
+        return {
+            'status': 'ok',
+            'uptime_seconds': round(time.monotonic() - self.started, 1),
+            'pending_captures': self.jobs.qsize(),
+            'sources': sources
+        }
+    
+    def handle(self, method, path, query):
+        """API isteğini yanıtla
+        
+        POST /capture?source=AD      Hemen bir kare oku ve kaydet
+        GET  /latest?source=AD       Son okuma
+        GET  /history?limit=N&source=AD  Son okumalar (en yenisi sonda)
+        GET  /health                 Servis ve kamera durumu
+        
+        Returns:
+            tuple: (HTTP durum kodu, JSON'a çevrilecek yanıt)
+        """
+        name = query.get('source')
+        try:
+            if path == '/health' and method == 'GET':
+                return 200, self.health()
+            if path == '/capture' and method == 'POST':
+                future = self.request_capture(name)
+                try:
+                    return 200, future.result(timeout=config.DAEMON_CAPTURE_TIMEOUT)
+                except concurrent.futures.TimeoutError:
+                    return 504, {'error': 'Çekim zaman aşımına uğradı'}
+                except Exception as e:
+                    return 503, {'error': f'Çekim başarısız: {e}'}
+            if path == '/latest' and method == 'GET':
+                label = self.find_source(name).label
+                with self.lock:
+                    reading = self.latest.get(label)
+                if reading is None:
+                    return 404, {'error': 'Henüz okuma yok'}
+                return 200, reading
+            if path == '/history' and method == 'GET':
+                label = self.find_source(name).label if name else None
+                limit = int(query.get('limit', self.history.maxlen))
+                with self.lock:
+                    readings = [reading for reading in self.history
+                                if label is None or reading['source'] == label]
+                return 200, readings[-limit:] if limit > 0 else []
+        except KeyError:
+            return 400, {'error': f'Bilinmeyen kaynak: {name}'}
+        except ValueError:
+            return 400, {'error': 'Geçersiz limit'}
+        if path in ('/health', '/capture', '/latest', '/history'):
+            return 405, {'error': f'{method} desteklenmiyor'}
+        return 404, {'error': f'Bilinmeyen adres: {path}'}
+
+
+class DaemonServer:
+    """ReadingService'i yerel HTTP API olarak sunan sunucular
+    
+    DAEMON_SOCKET verilirse Unix soketinde (yalnızca bu makinedeki
+    kullanıcılar, dosya izinleriyle korunur), DAEMON_PORT > 0 ise
+    DAEMON_HOST:DAEMON_PORT üzerinde dinlenir. http.server yalnızca daemon
+    modunda içe aktarılır.
+    """
+    
+    def __init__(self, service, socket_path=None, host='127.0.0.1', port=0):
+        self.service = service
+        self.socket_path = socket_path
+        self.host = host
+        self.port = port
+        self.servers = []
+        self.threads = []
+    
+    def _handler(self):
+        """İstekleri service.handle'a yönlendiren istek sınıfı"""
+        import http.server
+        from urllib.parse import urlsplit, parse_qsl
+        service = self.service
+        
+        class Handler(http.server.BaseHTTPRequestHandler):
+            server_version = 'raspi-ocr'
+            
+            def _respond(self, method):
+                url = urlsplit(self.path)
+                with metrics.timer('api'):
+                    status, payload = service.handle(method, url.path, dict(parse_qsl(url.query)))
+                body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def do_GET(self):
+                self._respond('GET')
+            
+            def do_POST(self):
+                self._respond('POST')
+            
+            def log_message(self, format, *args):
+                logging.debug(f"API: {format % args}")
+        
+        return Handler
+    
+    def start(self):
+        """Sunucuları arka plan iş parçacıklarında başlat"""
+        import http.server
+        import socketserver
+        handler = self._handler()
+        
+        if self.socket_path:
+            class UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+                daemon_threads = True
+                
+                def get_request(self):
+                    # BaseHTTPRequestHandler istemci adresini (ad, port) bekler
+                    request, _ = super().get_request()
+                    return request, ('unix', 0)
+            
+            # Önceki çalışmadan kalan soket dosyası
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+            self.servers.append(UnixServer(self.socket_path, handler))
+            os.chmod(self.socket_path, 0o660)
+        if self.port:
+            self.servers.append(http.server.ThreadingHTTPServer((self.host, self.port), handler))
+        if not self.servers:
+            raise ValueError("Daemon modu için DAEMON_SOCKET veya DAEMON_PORT gerekli")
+        
+        for server in self.servers:
+            thread = threading.Thread(target=server.serve_forever, name="daemon-api", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+    
+    def addresses(self):
+        """Dinlenen adresler (bilgi mesajları için)"""
+        addresses = []
+        if self.socket_path:
+            addresses.append(f"unix:{self.socket_path}")
+        if self.port:
+            addresses.append(f"http://{self.host}:{self.port}")
+        return addresses
+    
+    def stop(self):
+        """Sunucuları durdur ve soket dosyasını sil"""
+        for server in self.servers:
+            server.shutdown()
+            server.server_close()
+        if self.socket_path and self.servers and os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
@@ -0,0 +1,333 @@
+"""
+OCR motorları - Capture Numbers uygulaması için
+pytesseract, süreç içi tesserocr ve yedi parçalı gösterge tanıyıcısı
+"""
+
+import shlex
+import logging
+import threading
+
+import cv2
+import numpy as np
+# pytesseract (pandas ve PIL ile birlikte) ve tesserocr ilk kullanıldıkları yerde
+# içe aktarılır; başlangıç süresinin büyük kısmı bunlardı
+
+
+class PytesseractEngine:
+    """pytesseract ile OCR motoru (her çağrıda tesseract süreci başlatır)"""
+    
+    def __init__(self, lang, tesseract_config):
+        # pandas ve PIL'i de yüklediği için ancak OCR gerektiğinde içe aktarılır
+        import pytesseract
+        from PIL import Image
+        self.pytesseract = pytesseract
+        self.Image = Image
+        self.lang = lang
+        self.tesseract_config = tesseract_config
+    
+    @staticmethod
+    def _parse_ocr_data(data):
+        """image_to_data çıktısından metni ve kelime detaylarını oluştur
+        
+        Satırlar image_to_string ile aynı şekilde birleştirilir: aynı satırdaki
+        kelimeler boşlukla, satırlar yeni satır karakteriyle ayrılır.
+        """
+        lines = {}
+        words = []
+        for i, word_text in enumerate(data.get('text', [])):
+            word_text = str(word_text).strip()
+            conf = float(data['conf'][i])
+            if not word_text or conf < 0:
+                continue
+            
+            words.append({
+                'text': word_text,
+                'confidence': conf,
+                'box': (data['left'][i], data['top'][i],
+                        data['width'][i], data['height'][i])
+            })
+            line_key = (data['block_num'][i], data['par_num'][i], data['line_num'][i])
+            lines.setdefault(line_key, []).append(word_text)
+        
+        text = '\n'.join(' '.join(line) for line in lines.values())
+        return text.strip(), words
+    
+    def recognize(self, image):
+        """Görüntüyü tanı
+        
+        Returns:
+            tuple: (metin, kelime listesi)
+        """
+        # PIL formatına çevir
+        pil_image = self.Image.fromarray(image)
+        
+        # Tek geçişte OCR uygula (metin, güven skorları ve kutular birlikte)
+        data = self.pytesseract.image_to_data(
+            pil_image,
+            lang=self.lang,
+            config=self.tesseract_config,
+            output_type=self.pytesseract.Output.DICT
+        )
+        return self._parse_ocr_data(data)
+
+
+class TesserocrEngine:
+    """tesserocr ile süreç içi OCR motoru
+    
+    Tesseract API'si her iş parçacığı için bir kez başlatılır ve açık tutulur;
+    dil dosyası tekrar yüklenmez, görüntü NumPy belleğinden doğrudan verilir
+    (PIL dönüşümü veya geçici dosya yok). tesserocr kurulu değilse
+    ImportError fırlatır.
+    """
+    
+    def __init__(self, lang, tesseract_config):
+        import tesserocr
+        self.tesserocr = tesserocr
+        self.lang = lang
+        self.oem, self.psm, self.variables = self._parse_config(tesseract_config)
+        self.local = threading.local()
+    
+    @staticmethod
+    def _parse_config(tesseract_config):
+        """'--oem 3 --psm 6 -c anahtar=değer' biçimindeki ayarları ayrıştır"""
+        oem, psm, variables = None, None, {}
+        args = shlex.split(tesseract_config or '')
+        i = 0
+        while i < len(args):
+            if args[i] == '--oem' and i + 1 < len(args):
+                oem = int(args[i + 1])
+                i += 1
+            elif args[i] == '--psm' and i + 1 < len(args):
+                psm = int(args[i + 1])
+                i += 1
+            elif args[i] == '-c' and i + 1 < len(args):
+                name, _, value = args[i + 1].partition('=')
+                variables[name] = value
+                i += 1
+            i += 1
+        return oem, psm, variables
+    
+    def _get_api(self):
+        """Bu iş parçacığının API nesnesini döndür, yoksa başlat"""
+        api = getattr(self.local, 'api', None)
+        if api is None:
+            kwargs = {'lang': self.lang}
+            if self.oem is not None:
+                kwargs['oem'] = self.oem
+            if self.psm is not None:
+                kwargs['psm'] = self.psm
+            api = self.tesserocr.PyTessBaseAPI(**kwargs)
+            for name, value in self.variables.items():
+                api.SetVariable(name, value)
+            self.local.api = api
+            logging.info("tesserocr API başlatıldı")
+        return api
+    
+    def recognize(self, image):
+        """Görüntüyü tanı
+        
+        Returns:
+            tuple: (metin, kelime listesi)
+        """
+        api = self._get_api()
+        
+        if image.ndim == 3:
+            image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        image = np.ascontiguousarray(image)
+        height, width = image.shape[:2]
+        channels = 1 if image.ndim == 2 else image.shape[2]
+        api.SetImageBytes(image.tobytes(), width, height, channels, image.strides[0])
+        api.Recognize()
+        
+        words = []
+        level = self.tesserocr.RIL.WORD
+        for item in self.tesserocr.iterate_level(api.GetIterator(), level):
+            word_text = (item.GetUTF8Text(level) or '').strip()
+            conf = item.Confidence(level)
+            box = item.BoundingBox(level)
+            if not word_text or conf < 0 or box is None:
+                continue
+            x1, y1, x2, y2 = box
+            words.append({
+                'text': word_text,
+                'confidence': float(conf),
+                'box': (x1, y1, x2 - x1, y2 - y1)
+            })
+        
+        text = api.GetUTF8Text().strip()
+        api.Clear()
+        return text, words
+
+
+class SevenSegmentEngine:
+    """Yedi parçalı (seven-segment) LCD/LED göstergeler için NumPy tanıyıcı
+    
+    Tesseract kullanılmaz. Ön işlenmiş görüntüde rakam satırı ve rakamlar
+    satır/sütun izdüşümleriyle bulunur; her rakam sabit boyutlu bir ızgaraya
+    küçültülüp yedi parçanın doluluk oranı tek matris çarpımıyla ölçülür ve
+    en yakın rakam desenine atanır. Dar ve tam boylu bölgeler '1', satırın
+    altındaki küçük noktalar '.' olarak okunur. Kare başına birkaç milisaniye
+    sürer. Uyarlamalı eşikleme kalın parçaların içini boşalttığından bu motor
+    ön işlemede her zaman Otsu eşiklemesini kullanır (PREPROCESS). slant
+    verilirse (derece) eğik (italik) rakamlar önce düzeltilir.
+    """
+    
+    # Ön işleme ayarlarında değiştirilenler (bkz. ImageProcessor.extract_numbers)
+    PREPROCESS = {'THRESHOLD_METHOD': 'otsu'}
+    
+    # Rakam örnekleme ızgarası (satır, sütun)
+    GRID = (24, 14)
+    # Parçaların ızgaradaki bölgeleri (satır başı, satır sonu, sütun başı, sütun sonu; oran)
+    SEGMENTS = {
+        'a': (0.0, 0.15, 0.25, 0.75),
+        'b': (0.15, 0.45, 0.7, 1.0),
+        'c': (0.55, 0.85, 0.7, 1.0),
+        'd': (0.85, 1.0, 0.25, 0.75),
+        'e': (0.55, 0.85, 0.0, 0.3),
+        'f': (0.15, 0.45, 0.0, 0.3),
+        'g': (0.43, 0.57, 0.25, 0.75),
+    }
+    # Rakam desenleri (abcdefg); bazı göstergelerin 6, 7 ve 9 çizimleri de eklendi
+    PATTERNS = (
+        ('0', '1111110'), ('1', '0110000'), ('2', '1101101'), ('3', '1111001'),
+        ('4', '0110011'), ('5', '1011011'), ('6', '1011111'), ('6', '0011111'),
+        ('7', '1110000'), ('7', '1110010'), ('8', '1111111'), ('9', '1111011'),
+        ('9', '1110011'),
+    )
+    # '1' sayılacak en fazla genişlik / rakam yüksekliği oranı
+    ONE_WIDTH = 0.3
+    # Nokta sayılacak en fazla boyut / rakam yüksekliği oranı
+    DOT_SIZE = 0.25
+    
+    def __init__(self, slant=0):
+        self.shear = np.tan(np.radians(slant))
+        rows, cols = self.GRID
+        masks = np.zeros((len(self.SEGMENTS), rows, cols), dtype=np.float32)
+        for i, (top, bottom, left, right) in enumerate(self.SEGMENTS.values()):
+            masks[i, int(round(top * rows)):int(round(bottom * rows)),
+                  int(round(left * cols)):int(round(right * cols))] = 1.0
+        # Doluluk oranı = maske · hücre / maske alanı
+        self.masks = (masks / masks.sum(axis=(1, 2), keepdims=True)).reshape(len(masks), -1)
+        self.labels = [label for label, _ in self.PATTERNS]
+        self.patterns = np.array([[int(bit) for bit in pattern] for _, pattern in self.PATTERNS],
+                                 dtype=np.float32)
+    
+    @staticmethod
+    def _foreground(image):
+        """Rakam piksellerini True olan ikili maske olarak döndür
+        
+        Eşiklenmemiş görüntü Otsu ile eşiklenir. Koyu rakam/açık zemin (LCD)
+        ve açık rakam/koyu zemin (LED) ayrımı, rakamların karenin azınlığı
+        olduğu varsayımıyla yapılır.
+        """
+        if image.ndim == 3:
+            image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        _, binary = cv2.threshold(image, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        foreground = binary == 0
+        if foreground.mean() > 0.5:
+            foreground = ~foreground
+        return foreground
+    
+    @staticmethod
+    def _runs(mask, max_gap=0):
+        """Boolean dizideki ardışık True bölgelerini (başlangıç, bitiş) olarak döndür
+        
+        max_gap pikselden kısa boşluklarla ayrılan bölgeler birleştirilir.
+        """
+        padded = np.concatenate(([False], mask, [False]))
+        edges = np.flatnonzero(padded[1:] != padded[:-1])
+        runs = []
+        for start, end in zip(edges[::2], edges[1::2]):
+            if runs and start - runs[-1][1] <= max_gap:
+                runs[-1] = (runs[-1][0], end)
+            else:
+                runs.append((start, end))
+        return runs
+    
+    def _text_band(self, foreground):
+        """Rakam satırının (en yüksek bölge ve ona yakın bölgeler) satır aralığı"""
+        rows = self._runs(foreground.any(axis=1))
+        if not rows:
+            return None
+        top, bottom = max(rows, key=lambda run: run[1] - run[0])
+        # 0, 1, 7 gibi rakamlarda ortadaki boşluk satırı ikiye bölebilir
+        changed = True
+        while changed:
+            changed = False
+            for start, end in rows:
+                gap = max(start - bottom, top - end)
+                if 0 < gap <= (bottom - top) // 2 and not top <= start < bottom:
+                    top, bottom = min(top, start), max(bottom, end)
+                    changed = True
+        return top, bottom
+    
+    def recognize(self, image):
+        """Görüntüyü tanı
+        
+        Returns:
+            tuple: (metin, karakter listesi)
+        """
+        foreground = self._foreground(image)
+        if self.shear:
+            # Sağa yatık rakamları dik hale getir (alt satırlar yerinde, üstler sola)
+            height, width = foreground.shape
+            shear = np.float32([[1, self.shear, -self.shear * height], [0, 1, 0]])
+            foreground = cv2.warpAffine(foreground.view(np.uint8), shear, (width, height),
+                                        flags=cv2.INTER_NEAREST) > 0
+        band = self._text_band(foreground)
+        if band is None:
+            return '', []
+        top, bottom = band
+        height = bottom - top
+        band_mask = foreground[top:bottom]
+        
+        # Parçalar arasındaki 1-2 piksellik boşluklar rakamı bölmesin; nokta
+        # ise komşu rakama birleşmesin
+        columns = self._runs(band_mask.any(axis=0), max_gap=max(1, int(height * 0.02)))
+        
+        chars = []
+        cells = []
+        for left, right in columns:
+            region = band_mask[:, left:right]
+            filled_rows = np.flatnonzero(region.any(axis=1))
+            # Gürültü lekelerini atla
+            if region.sum() < max(2, (height * 0.05) ** 2):
+                continue
+            region_top, region_bottom = filled_rows[0], filled_rows[-1] + 1
+            width = right - left
+            box = (int(left), int(top + region_top), int(width), int(region_bottom - region_top))
+            
+            if (region_bottom - region_top <= height * self.DOT_SIZE
+                    and width <= height * self.DOT_SIZE):
+                if region_bottom >= height * (1 - self.DOT_SIZE):
+                    chars.append(['.', 100.0, box])
+                continue
+            if width <= height * self.ONE_WIDTH:
+                # Dar rakam: sütunun satırı ne kadar kapladığı güven skorudur
+                chars.append(['1', 100.0 * len(filled_rows) / height, box])
+                continue
+            
+            cell = cv2.resize(region.astype(np.float32), self.GRID[::-1],
+                              interpolation=cv2.INTER_AREA)
+            chars.append([None, 0.0, box])
+            cells.append(cell.ravel())
+        
+        if cells:
+            # Tüm rakamların parça doluluğu tek seferde: (rakam, parça)
+            fills = np.stack(cells) @ self.masks.T
+            fills /= np.maximum(fills.max(axis=1, keepdims=True), 1e-6)
+            distances = np.abs(fills[:, None, :] - self.patterns[None, :, :]).mean(axis=2)
+            best = distances.argmin(axis=1)
+            unknown = iter(char for char in chars if char[0] is None)
+            for index, distance in zip(best, distances[np.arange(len(best)), best]):
+                char = next(unknown)
+                char[0] = self.labels[index]
+                char[1] = float(100.0 * (1.0 - distance))
+        
+        # Baştaki nokta anlamsız (genellikle leke)
+        while chars and chars[0][0] == '.':
+            chars.pop(0)
+        text = ''.join(char for char, _, _ in chars)
+        words = [{'text': char, 'confidence': confidence, 'box': box}
+                 for char, confidence, box in chars if char != '.']
+        return text, words
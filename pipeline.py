@@ -0,0 +1,517 @@
+"""
+Çekim - Capture Numbers uygulaması için
+Tek çekim, çekim zamanlayıcısı ve sürekli moddaki paralel işlem hattı
+"""
+
+import time
+import queue
+import logging
+import threading
+from collections import deque
+from datetime import datetime
+
+from appconfig import config
+from runtime import metrics, frame_gate, ReplayFinished
+from processing import FrameReader
+from archives import archive_capture
+
+
+def handle_result(result, excel_writer, timestamp=None):
+    """OCR sonucunu değerlendir ve Excel'e yaz"""
+    # Güven skoru kontrolü
+    if result['confidence'] < config.MIN_CONFIDENCE:
+        metrics.increment('low_confidence')
+        logging.warning(
+            f"Düşük güven skoru: {result['confidence']:.1f}% "
+            f"(Minimum: {config.MIN_CONFIDENCE}%)"
+        )
+        print(f"⚠ Uyarı: Düşük güven skoru. OCR sonucu güvenilir olmayabilir.")
+    
+    # Değişmeyen kare: isteğe bağlı olarak tekrar satırı yaz
+    if result.get('repeated'):
+        if config.LOG_REPEATED:
+            excel_writer.write_data(result['text'], result['confidence'], timestamp,
+                                    repeated=True)
+        print(f"= Değer değişmedi: {result['text']}")
+        return True
+    
+    # Excel'e yaz
+    if result['text']:
+        excel_writer.write_data(result['text'], result['confidence'], timestamp)
+        print(f"✓ Tanınan sayı: {result['text']} (Güven: {result['confidence']:.1f}%)")
+        return True
+    else:
+        metrics.increment('empty_reads')
+        logging.warning("OCR sonucu boş")
+        print("⚠ Görüntüde sayı algılanamadı")
+        return False
+
+
+def burst_frames(camera):
+    """Seri çekim açıksa (BURST_FRAMES > 1) sonraki kareleri yakalayan yineleyici"""
+    if config.BURST_FRAMES <= 1:
+        return None
+    return (camera.capture_frame(new_frame=True)[0] for _ in range(config.BURST_FRAMES - 1))
+
+
+def process_single_capture(camera, excel_writer, reader=None, archiver=None, name=None,
+                           scheduler=None):
+    """Tek bir görüntü yakalama ve işleme
+    
+    name verilirse (çoklu kamera) kaydedilen görüntü adlarına eklenir.
+    scheduler verilirse okuma sonucu uyarlamalı çekim aralığı için bildirilir.
+    """
+    if reader is None:
+        reader = FrameReader()
+    
+    try:
+        # Görüntü yakala
+        image, timestamp = camera.capture_frame()
+        
+        # OCR işlemi (seri çekimde sonraki kareler gerektikçe yakalanır)
+        result = reader.read(image, burst_frames(camera))
+        if scheduler is not None:
+            scheduler.observe(result)
+        
+        # Orijinal ve işlenmiş görüntüyü kaydet
+        archive_capture(archiver, image, result, timestamp, name)
+        
+        return handle_result(result, excel_writer, timestamp)
+    
+    except ReplayFinished:
+        raise
+    except Exception as e:
+        logging.error(f"İşlem hatası: {e}")
+        print(f"✗ Hata: {e}")
+        return False
+
+
+class CaptureScheduler:
+    """Kaymayan, duvar saatine hizalı çekim zamanlayıcısı
+    
+    Çekim anları işlem süresinden bağımsız olarak sabit adımla ilerler; align
+    açıksa aralığın katlarına hizalanır (60 sn → her dakikanın başı, 3600 sn →
+    her saat başı, yerel saate göre). Bir çekim anı yarım aralıktan fazla
+    geçilmişse o an kaçırılmış sayılır, atlanır ve raporlanır; sonraki çekim
+    yine hizalı bir anda yapılır.
+    
+    max_interval aralıktan büyükse aralık uyarlamalıdır: okuma art arda
+    stable_reads kez değişmediğinde aralık max_interval'a kadar ikiye
+    katlanır, değer değiştiğinde hemen temel aralığa döner.
+    """
+    
+    def __init__(self, interval, align=True, max_interval=0, stable_reads=3, label='kamera'):
+        self.base_interval = interval
+        self.interval = interval
+        self.align = align and interval > 0
+        self.max_interval = max_interval if max_interval and max_interval > interval else interval
+        self.stable_reads = max(1, stable_reads)
+        self.label = label
+        
+        self.lock = threading.Lock()
+        self.missed = 0
+        self.stable = 0
+        self.last_text = None
+        self.last_deadline = None
+        self.deadline = self._grid_after(time.time(), inclusive=True)
+    
+    def _grid_after(self, moment, inclusive=False):
+        """moment'tan sonraki (inclusive ise moment dahil) ilk çekim anı"""
+        if not self.align:
+            return moment
+        offset = time.localtime(moment).tm_gmtoff
+        slots = (moment + offset) / self.interval
+        # Kayan nokta hatası bir aralığı atlatmasın
+        slot = int(slots) if inclusive and slots - int(slots) < 1e-6 else int(slots) + 1
+        return slot * self.interval - offset
+    
+    def _following(self, deadline):
+        """deadline'dan sonraki çekim anı"""
+        if self.align:
+            return self._grid_after(deadline)
+        return deadline + self.interval
+    
+    def next_time(self):
+        """Planlanan sonraki çekim anı (aralık yoksa None: çekimler beklemeden yapılır)"""
+        if self.interval <= 0:
+            return None
+        with self.lock:
+            return datetime.fromtimestamp(self.deadline)
+    
+    def wait(self, stop_event=None):
+        """Sıradaki çekim anına kadar bekle
+        
+        Returns:
+            datetime: Çekimin planlandığı an; stop_event ayarlandıysa None
+        """
+        if self.interval <= 0:
+            # Aralık yok: beklemeden art arda çek
+            return None if stop_event is not None and stop_event.is_set() else datetime.now()
+        while True:
+            with self.lock:
+                now = time.time()
+                if now - self.deadline > self.interval / 2:
+                    # Çekim anı kaçırıldı: geçmiş anları atla, sonraki anı bekle
+                    missed = int((now - self.deadline) // self.interval) + 1
+                    self.missed += missed
+                    metrics.increment('missed_deadlines', missed, source=self.label)
+                    logging.warning(
+                        f"{self.label}: {missed} çekim zamanı kaçırıldı "
+                        f"(planlanan {datetime.fromtimestamp(self.deadline):%H:%M:%S})"
+                    )
+                    self.deadline = self._grid_after(now) if self.align else now
+                elif self.deadline - now > self.interval:
+                    # Sistem saati geri alındı; planı yeniden hizala
+                    logging.warning(f"{self.label}: sistem saati değişti, çekim planı yenilendi")
+                    self.deadline = self._grid_after(now, inclusive=True)
+                remaining = self.deadline - now
+                if remaining <= 0:
+                    self.last_deadline = self.deadline
+                    self.deadline = self._following(self.deadline)
+                    return datetime.fromtimestamp(self.last_deadline)
+            
+            # Uzun beklemeler parçalanır; saat ayarlanırsa plan yeniden kontrol edilir
+            timeout = min(remaining, 60)
+            if stop_event is not None:
+                if stop_event.wait(timeout):
+                    return None
+            else:
+                time.sleep(timeout)
+    
+    def observe(self, result):
+        """Okuma sonucuna göre çekim aralığını uyarla
+        
+        Boş veya başarısız okumalar aralığı değiştirmez.
+        """
+        if self.max_interval == self.base_interval or not result or not result.get('text'):
+            return
+        with self.lock:
+            if result.get('repeated') or result['text'] == self.last_text:
+                self.stable += 1
+                interval = self.interval
+                if self.stable >= self.stable_reads:
+                    interval = min(self.interval * 2, self.max_interval)
+                    self.stable = 0
+            else:
+                self.stable = 0
+                interval = self.base_interval
+            self.last_text = result['text']
+            
+            if interval != self.interval:
+                logging.info(f"{self.label}: çekim aralığı {self.interval} → {interval} saniye")
+                self.interval = interval
+                if self.last_deadline is not None:
+                    self.deadline = self._following(self.last_deadline)
+
+
+class CaptureSource:
+    """Bir kamera kaynağı: kamera, okuma durumu, çekim aralığı ve çıktı
+    
+    Kaynağa özgü çekim, okuma, atlama ve hata sayılarını tutar; tek
+    kameralı kullanımda name None'dır.
+    """
+    
+    def __init__(self, camera, excel_writer, interval, max_captures=0, reader=None, name=None):
+        self.camera = camera
+        self.excel_writer = excel_writer
+        self.interval = interval
+        self.max_captures = max_captures
+        self.reader = reader or FrameReader()
+        self.name = name
+        self.label = name or 'kamera'
+        self.scheduler = CaptureScheduler(interval, config.CAPTURE_ALIGN,
+                                          config.CAPTURE_INTERVAL_MAX,
+                                          config.CAPTURE_STABLE_READS, self.label)
+        
+        self.lock = threading.Lock()
+        # İşlem hattında son yakalanan karenin sırası (eskimiş seri çekim durdurulur)
+        self.captured = None
+        self.started = time.monotonic()
+        self.counts = {'captures': 0, 'reads': 0, 'dropped': 0, 'errors': 0}
+        self.ocr_seconds = 0.0
+    
+    def count(self, event, seconds=None):
+        """Kaynak istatistiğini ve etiketli metriği artır"""
+        with self.lock:
+            self.counts[event] += 1
+            if seconds is not None:
+                self.ocr_seconds += seconds
+        metrics.increment(f'source_{event}', source=self.label)
+    
+    def stats(self):
+        """Kaynağın istatistikleri ve dakikadaki okuma sayısı"""
+        with self.lock:
+            stats = dict(self.counts)
+            ocr_seconds = self.ocr_seconds
+        stats['missed'] = self.scheduler.missed
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        stats['reads_per_minute'] = round(stats['reads'] * 60 / elapsed, 2)
+        stats['mean_ocr_seconds'] = round(ocr_seconds / stats['reads'], 3) if stats['reads'] else None
+        return stats
+    
+    def close(self):
+        """Çıktıyı kaydet ve kamerayı kapat"""
+        try:
+            self.excel_writer.close()
+        except Exception as e:
+            print(f"✗ Excel dosyası kaydedilemedi: {e}")
+        self.camera.release()
+
+
+class FairFrameQueue:
+    """Kaynaklar arasında sırayla (round-robin) kare dağıtan kuyruk
+    
+    Her kaynağın kendi sınırlı kuyruğu vardır ve OCR işçileri kareleri
+    kaynaklar arasında sırayla alır; böylece sık çeken veya OCR'ı yavaş bir
+    kamera diğerlerini bekletmez. Bir kaynağın kuyruğu dolduğunda yalnızca
+    o kaynağın kareleri atılır (ya da o kaynağın yakalaması bekletilir).
+    """
+    
+    def __init__(self, maxsize):
+        self.maxsize = max(1, maxsize)
+        self.queues = {}
+        self.order = deque()
+        self.closed = False
+        self.condition = threading.Condition()
+    
+    def put(self, key, item, block=False):
+        """Kareyi kaynağın kuyruğuna ekle
+        
+        Kuyruk doluysa block=True ise yer açılana kadar bekler, değilse en
+        eski kareyi çıkarıp döndürür.
+        
+        Returns:
+            Atılan öğe veya None
+        """
+        with self.condition:
+            frames = self.queues.get(key)
+            if frames is None:
+                frames = self.queues[key] = deque()
+                self.order.append(key)
+            
+            dropped = None
+            while len(frames) >= self.maxsize:
+                if not block:
+                    dropped = frames.popleft()
+                    break
+                self.condition.wait()
+            frames.append(item)
+            self.condition.notify_all()
+            return dropped
+    
+    def get(self):
+        """Sıradaki kaynağın en eski karesini al
+        
+        Returns:
+            Öğe veya kuyruk kapatılıp boşaldıysa None
+        """
+        with self.condition:
+            while True:
+                for _ in range(len(self.order)):
+                    key = self.order[0]
+                    self.order.rotate(-1)
+                    if self.queues[key]:
+                        item = self.queues[key].popleft()
+                        self.condition.notify_all()
+                        return item
+                if self.closed:
+                    return None
+                self.condition.wait()
+    
+    def close(self):
+        """Yeni kare gelmeyecek; kuyruk boşalınca get() None döndürür"""
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+
+class CapturePipeline:
+    """Sürekli mod için aşamalı işlem hattı: yakalama → OCR → kaydetme
+    
+    Her kaynağın (kameranın) kendi yakalama iş parçacığı vardır; kareler
+    ortak bir OCR işçi havuzunda kaynaklar arasında sırayla (FairFrameQueue)
+    tanınır. Böylece önceki kare tanınırken kameralar yeni kare yakalamaya
+    devam eder. OCR yetişemediğinde PIPELINE_BACKPRESSURE ayarına göre ya
+    kaynağın en eski karesi atılır ('drop_oldest') ya da o kaynağın
+    yakalaması bekletilir ('block'). Sonuçlar her kaynak için yakalama
+    sırasıyla yazılır.
+    """
+    
+    _STOP = object()
+    
+    def __init__(self, sources, archiver=None):
+        self.sources = list(sources)
+        self.archiver = archiver
+        self.workers = max(1, config.PIPELINE_OCR_WORKERS)
+        self.backpressure = config.PIPELINE_BACKPRESSURE
+        
+        self.frames = FairFrameQueue(config.PIPELINE_QUEUE_SIZE)
+        self.results = queue.Queue(maxsize=config.PIPELINE_QUEUE_SIZE * len(self.sources))
+        self.stop_event = threading.Event()
+        self.active_captures = len(self.sources)
+        self.lock = threading.Lock()
+        self.dropped = 0
+    
+    def _put_frame(self, source, item):
+        """Kareyi OCR kuyruğuna ekle, doluysa geri basınç politikasını uygula"""
+        dropped = self.frames.put(source, item, block=self.backpressure == 'block')
+        if dropped is None:
+            return
+        
+        old_seq, old_timestamp = dropped[1], dropped[2]
+        with self.lock:
+            self.dropped += 1
+        source.count('dropped')
+        metrics.increment('dropped_frames')
+        logging.warning(f"OCR yetişemiyor, {source.label} çekim #{old_seq + 1} atlandı")
+        # Yazma aşaması sırayı beklemesin diye boş sonuç gönder
+        self.results.put((source, old_seq, old_timestamp, None, None))
+    
+    def _burst_frames(self, source, seq):
+        """Seri çekimin sonraki karelerini OCR aşamasında gerektikçe yakalayan yineleyici
+        
+        Erken çıkışta kalan kareler hiç yakalanmaz. Kaynaktan yeni bir kare
+        yakalandıysa, kamera yeniden yüklemeyle değiştiyse veya hat durduysa
+        kareler artık aynı sahneyi göstermez; seri çekim eldekilerle biter.
+        """
+        if config.BURST_FRAMES <= 1:
+            return None
+        camera = source.camera
+        count = config.BURST_FRAMES - 1
+        
+        def frames():
+            for _ in range(count):
+                if (self.stop_event.is_set() or source.camera is not camera or
+                        source.captured != seq):
+                    return
+                yield camera.capture_frame(new_frame=True)[0]
+        return frames()
+    
+    def _capture_loop(self, source):
+        """Yakalama aşaması: kaynaktan aralıklarla kare yakala ve kuyruğa ekle"""
+        seq = 0
+        try:
+            while not self.stop_event.is_set():
+                if source.max_captures > 0 and seq >= source.max_captures:
+                    break
+                
+                # Çekim anları işlem süresinden bağımsız, sabit adımla ilerler
+                if source.scheduler.wait(self.stop_event) is None:
+                    break
+                timestamp = datetime.now()
+                try:
+                    with frame_gate.frame():
+                        image, timestamp = source.camera.capture_frame()
+                        source.captured = seq
+                    # Seri çekim kareleri OCR aşamasında gerektikçe yakalanır
+                    burst = self._burst_frames(source, seq)
+                    source.count('captures')
+                    self._put_frame(source, (source, seq, timestamp, image, burst))
+                except ReplayFinished as e:
+                    logging.info(f"{source.label}: {e}")
+                    break
+                except Exception as e:
+                    logging.error(f"İşlem hatası ({source.label}): {e}")
+                    source.count('errors')
+                    self.results.put((source, seq, timestamp, None, None))
+                seq += 1
+        finally:
+            with self.lock:
+                self.active_captures -= 1
+                if self.active_captures == 0:
+                    self.frames.close()
+    
+    def _ocr_loop(self):
+        """OCR aşaması: kuyruktaki kareleri tanı"""
+        while True:
+            item = self.frames.get()
+            if item is None:
+                break
+            
+            source, seq, timestamp, image, burst = item
+            started = time.monotonic()
+            try:
+                with frame_gate.frame():
+                    result = source.reader.read(image, burst)
+                source.count('reads', time.monotonic() - started)
+            except Exception as e:
+                logging.error(f"OCR hatası ({source.label}): {e}")
+                source.count('errors')
+                result = None
+            self.results.put((source, seq, timestamp, image, result))
+        
+        self.results.put(self._STOP)
+    
+    def _write(self, source, seq, timestamp, image, result):
+        """Kaydetme aşaması: görüntüleri ve sonucu yaz"""
+        if source.name:
+            print(f"\n--- {source.name}: çekim #{seq + 1} ---")
+        else:
+            print(f"\n--- Çekim #{seq + 1} ---")
+        if result is None:
+            print("⚠ Çekim işlenemedi, atlandı")
+            return
+        source.scheduler.observe(result)
+        
+        try:
+            archive_capture(self.archiver, image, result, timestamp, source.name)
+            handle_result(result, source.excel_writer, timestamp)
+            source.excel_writer.flush_if_due()
+        except Exception as e:
+            logging.error(f"İşlem hatası: {e}")
+            print(f"✗ Hata: {e}")
+    
+    def run(self):
+        """İşlem hattını çalıştır; kaydetme aşaması çağıran iş parçacığında yürür
+        
+        Returns:
+            int: Yazma aşamasına ulaşan çekim sayısı
+        """
+        threads = [
+            threading.Thread(target=self._capture_loop, args=(source,),
+                             name=f"capture-{source.label}", daemon=True)
+            for source in self.sources
+        ]
+        threads += [
+            threading.Thread(target=self._ocr_loop, name=f"ocr-{i}", daemon=True)
+            for i in range(self.workers)
+        ]
+        for thread in threads:
+            thread.start()
+        
+        # Sonuçları her kaynak için yakalama sırasına göre yaz
+        pending = {id(source): {} for source in self.sources}
+        next_seq = {id(source): 0 for source in self.sources}
+        finished_workers = 0
+        try:
+            while finished_workers < self.workers:
+                item = self.results.get()
+                if item is self._STOP:
+                    finished_workers += 1
+                    continue
+                
+                source, seq = item[0], item[1]
+                pending[id(source)][seq] = item
+                while next_seq[id(source)] in pending[id(source)]:
+                    with frame_gate.frame():
+                        self._write(*pending[id(source)].pop(next_seq[id(source)]))
+                    next_seq[id(source)] += 1
+        finally:
+            self.stop_event.set()
+        
+        written = sum(next_seq.values())
+        logging.info(
+            f"İşlem hattı tamamlandı: {written} çekim, {self.dropped} kare atlandı"
+        )
+        if len(self.sources) > 1:
+            for source in self.sources:
+                logging.info(f"{source.label}: {source.stats()}")
+        return written
+    
+    def print_stats(self):
+        """Kaynak başına istatistikleri yazdır"""
+        for source in self.sources:
+            stats = source.stats()
+            print(f"   {source.label}: {stats['reads']} okuma "
+                  f"({stats['reads_per_minute']}/dk), {stats['dropped']} atlandı, "
+                  f"{stats['missed']} zamanı kaçırıldı, {stats['errors']} hata")
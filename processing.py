@@ -0,0 +1,715 @@
+"""
+Görüntü işleme - Capture Numbers uygulaması için
+Ön işleme hattı, OCR, ilgi bölgesi, değişiklik algılama ve kare okuyucu
+"""
+
+import logging
+import threading
+import itertools
+import concurrent.futures
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+from appconfig import config
+from runtime import metrics, startup, retry_call
+from engines import PytesseractEngine, TesserocrEngine, SevenSegmentEngine
+
+
+class PreprocessPipeline:
+    """Yapılandırmadan bir kez kurulan ön işleme hattı
+    
+    Adımlar (gri tonlama, büyütme, gürültü azaltma, eşikleme) kurulumda
+    belirlenir. Ara adımların çıktı dizileri iş parçacığı başına saklanır ve
+    OpenCV'nin dst= parametresiyle her karede yeniden kullanılır; yalnızca son
+    adımın çıktısı yeni dizi olarak ayrılır (sonuçla birlikte saklandığı için).
+    RESIZE_LAST açıksa gürültü azaltma ve eşikleme küçük görüntüde yapılır,
+    büyütme en sona bırakılır; küçültme ise her zaman ilk adımdır. overrides
+    verilirse bu ayarlar yapılandırmadaki değerlerin yerine kullanılır (örn.
+    seri çekimdeki ucuz ön işleme veya FrameReader'ın çözdüğü otomatik ölçek).
+    """
+    
+    SETTINGS = ('GRAYSCALE', 'RESIZE_FACTOR', 'RESIZE_LAST', 'DENOISE', 'DENOISE_METHOD',
+                'DENOISE_KERNEL', 'THRESHOLD', 'THRESHOLD_METHOD')
+    
+    def __init__(self, overrides=None):
+        settings = self.settings(overrides)
+        # 'auto' FrameReader tarafından karakter yüksekliğine göre çözülür;
+        # çözülmeden gelirse (örn. doğrudan preprocess_image) ölçeklenmez
+        factor = settings['RESIZE_FACTOR']
+        self.resize_factor = 1.0 if factor == 'auto' else float(factor)
+        self.threshold_method = settings['THRESHOLD_METHOD']
+        self.denoise_method = settings['DENOISE_METHOD']
+        # Çekirdek boyutu tek sayı olmalı
+        self.kernel = max(1, int(settings['DENOISE_KERNEL'])) | 1
+        
+        steps = []
+        if settings['GRAYSCALE']:
+            steps.append(('grayscale', self._grayscale))
+        resize = ('resize', self._resize) if self.resize_factor != 1.0 else None
+        # Küçültmede filtreler küçük görüntüde çalışsın
+        resize_last = settings['RESIZE_LAST'] and self.resize_factor > 1.0
+        if resize and not resize_last:
+            steps.append(resize)
+        if settings['DENOISE']:
+            steps.append(('denoise', self._denoise))
+        if settings['THRESHOLD']:
+            steps.append(('threshold', self._threshold))
+        if resize and resize_last:
+            steps.append(resize)
+        
+        self.steps = steps
+        if self.resize_factor < 1.0:
+            self.resize_interpolation = cv2.INTER_AREA
+        else:
+            self.resize_interpolation = cv2.INTER_LINEAR if resize_last else cv2.INTER_CUBIC
+        self.local = threading.local()
+    
+    @staticmethod
+    def settings(overrides=None):
+        """Hattı etkileyen ayarlar; overrides'taki değerler yapılandırmadakileri ezer"""
+        settings = {name: getattr(config, name) for name in PreprocessPipeline.SETTINGS}
+        for name, value in (overrides or {}).items():
+            if name not in settings:
+                raise ValueError(f"Bilinmeyen ön işleme ayarı: {name}")
+            settings[name] = value
+        return settings
+    
+    @staticmethod
+    def config_key(overrides=None):
+        """Hattı etkileyen ayarlar (değiştiğinde hat yeniden kurulur)"""
+        return tuple(PreprocessPipeline.settings(overrides).values())
+    
+    def _grayscale(self, image, dst=None):
+        """Gri tonlamaya çevir"""
+        if image.ndim == 2:
+            return image
+        return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY, dst=dst)
+    
+    def _resize(self, image, dst=None):
+        """Görüntüyü büyüt (daha iyi OCR için) veya küçült"""
+        new_width = int(image.shape[1] * self.resize_factor)
+        new_height = int(image.shape[0] * self.resize_factor)
+        return cv2.resize(image, (new_width, new_height), dst=dst,
+                          interpolation=self.resize_interpolation)
+    
+    def _denoise(self, image, dst=None):
+        """Gürültü azaltma (DENOISE_METHOD)"""
+        if self.denoise_method == 'median':
+            return cv2.medianBlur(image, self.kernel, dst=dst)
+        if self.denoise_method == 'gaussian':
+            return cv2.GaussianBlur(image, (self.kernel, self.kernel), 0, dst=dst)
+        if self.denoise_method == 'bilateral':
+            return cv2.bilateralFilter(image, self.kernel, 50, 50, dst=dst)
+        # nlmeans: en iyi sonuç, en yavaş
+        return cv2.fastNlMeansDenoising(image, dst=dst)
+    
+    def _threshold(self, image, dst=None):
+        """Eşikleme (thresholding)"""
+        if self.threshold_method == 'adaptive':
+            return cv2.adaptiveThreshold(
+                image, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+                cv2.THRESH_BINARY, 11, 2, dst=dst
+            )
+        # otsu
+        _, processed = cv2.threshold(
+            image, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU, dst=dst
+        )
+        return processed
+    
+    def run(self, image):
+        """Adımları sırayla uygula"""
+        buffers = getattr(self.local, 'buffers', None)
+        if buffers is None:
+            buffers = self.local.buffers = [None] * len(self.steps)
+        
+        processed = image
+        last = len(self.steps) - 1
+        for i, (_, step) in enumerate(self.steps):
+            source = processed
+            if i == last:
+                processed = step(source)
+            else:
+                processed = step(source, buffers[i])
+                # Adım girdiyi olduğu gibi döndürdüyse tampon olarak saklama
+                if processed is not source:
+                    buffers[i] = processed
+        
+        # Giriş görüntüsü hiç değişmediyse çağıranın dizisini paylaşma
+        return image.copy() if processed is image else processed
+
+
+class ImageProcessor:
+    """Görüntü işleme ve OCR sınıfı"""
+    
+    _engine = None
+    _engine_key = None
+    _engine_lock = threading.Lock()
+    
+    @staticmethod
+    def get_engine():
+        """Yapılandırmadaki OCR motorunu döndür (bir kez oluşturulur)
+        
+        OCR_ENGINE = 'tesserocr' seçiliyse ve modül kurulu değilse
+        pytesseract'a geri dönülür. 'sevenseg' Tesseract kullanmayan yedi
+        parçalı gösterge tanıyıcısıdır.
+        """
+        key = (config.OCR_ENGINE, config.TESSERACT_LANG, config.TESSERACT_CONFIG,
+               config.SEVENSEG_SLANT)
+        with ImageProcessor._engine_lock:
+            if ImageProcessor._engine_key != key:
+                engine = None
+                if config.OCR_ENGINE == 'tesserocr':
+                    try:
+                        engine = TesserocrEngine(config.TESSERACT_LANG, config.TESSERACT_CONFIG)
+                        logging.info("OCR motoru: tesserocr (süreç içi)")
+                    except ImportError:
+                        logging.warning("tesserocr modülü bulunamadı, pytesseract kullanılacak")
+                elif config.OCR_ENGINE == 'sevenseg':
+                    engine = SevenSegmentEngine(config.SEVENSEG_SLANT)
+                    logging.info("OCR motoru: yedi parçalı gösterge tanıyıcı")
+                if engine is None:
+                    engine = PytesseractEngine(config.TESSERACT_LANG, config.TESSERACT_CONFIG)
+                ImageProcessor._engine = engine
+                ImageProcessor._engine_key = key
+            return ImageProcessor._engine
+    
+    # Ayar anahtarı -> hat; en son kullanılan en sonda
+    _preprocessors = OrderedDict()
+    # Saklanan en fazla hat sayısı (her hat iş parçacığı başına tampon tutar)
+    PREPROCESSOR_CACHE_SIZE = 8
+    
+    @staticmethod
+    def get_preprocessor(overrides=None):
+        """Yapılandırmadaki ön işleme hattını döndür (ayarlar değişmedikçe bir kez kurulur)
+        
+        overrides verilirse (örn. BURST_PREPROCESS, kameranın otomatik ölçeği)
+        bu ayarlarla kurulan hat ayrıca saklanır. Yeniden yüklemeler ve farklı
+        ölçekler hat biriktirmesin diye en az kullanılan hat atılır.
+        """
+        key = PreprocessPipeline.config_key(overrides)
+        cache = ImageProcessor._preprocessors
+        with ImageProcessor._engine_lock:
+            pipeline = cache.get(key)
+            if pipeline is None:
+                pipeline = cache[key] = PreprocessPipeline(overrides)
+                while len(cache) > ImageProcessor.PREPROCESSOR_CACHE_SIZE:
+                    cache.popitem(last=False)
+            else:
+                cache.move_to_end(key)
+            return pipeline
+    
+    @staticmethod
+    def preprocess_steps(overrides=None):
+        """Yapılandırmaya göre ön işleme adımlarını sırasıyla döndür
+        
+        Returns:
+            list: (adım adı, fonksiyon(kaynak, dst=None)) çiftleri
+        """
+        return ImageProcessor.get_preprocessor(overrides).steps
+    
+    @staticmethod
+    def estimate_char_height(image):
+        """Karakterlerin yüksekliğini bağlı bileşenlerden tahmin et
+        
+        Görüntü Otsu ile eşiklenir ve her iki renk için (koyu rakam/açık zemin
+        ve tersi) karaktere benzeyen (yüksekliği genişliğinden büyük, çok
+        küçük veya kare boyu olmayan) bileşenler seçilir. Yükseklikleri
+        birbirine %20 yakın en kalabalık grup aynı satırdaki rakamlar kabul
+        edilir ve grubun ortanca yüksekliği döndürülür.
+        
+        Returns:
+            float: Piksel cinsinden yükseklik, karakter bulunamazsa None
+        """
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+        # Büyük karelerde tahmin küçültülmüş kopyada yapılır
+        shrink = max(1, gray.shape[1] // 1280)
+        if shrink > 1:
+            gray = cv2.resize(gray, (gray.shape[1] // shrink, gray.shape[0] // shrink),
+                              interpolation=cv2.INTER_AREA)
+        _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        
+        best = None
+        for mask in (binary, cv2.bitwise_not(binary)):
+            _, _, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=8)
+            widths = stats[1:, cv2.CC_STAT_WIDTH]
+            heights = stats[1:, cv2.CC_STAT_HEIGHT]
+            areas = stats[1:, cv2.CC_STAT_AREA]
+            candidates = ((heights >= 6) & (heights < gray.shape[0] * 0.9)
+                          & (heights * 1.25 >= widths) & (heights <= widths * 8)
+                          & (areas >= 0.15 * widths * heights))
+            heights = np.sort(heights[candidates])
+            if not len(heights):
+                continue
+            
+            # Her yükseklik için kendisinin %20 üstüne kadar olan bileşen sayısı
+            ends = np.searchsorted(heights, heights * 1.2, side='right')
+            counts = ends - np.arange(len(heights))
+            # Eşitlikte daha uzun karakterler (küçük etiket yazıları yerine rakamlar)
+            start = len(counts) - 1 - int(np.argmax(counts[::-1]))
+            group = (int(counts[start]), float(np.median(heights[start:ends[start]])))
+            if best is None or group > best:
+                best = group
+        
+        return best[1] * shrink if best else None
+    
+    @staticmethod
+    def preprocess_image(image, overrides=None):
+        """Görüntüyü OCR için ön işle"""
+        with metrics.timer('preprocess'):
+            return ImageProcessor.get_preprocessor(overrides).run(image)
+    
+    @staticmethod
+    def extract_numbers(image, preprocess=None):
+        """OCR ile görüntüden sayıları çıkar
+        
+        preprocess verilirse ön işleme ayarlarından bunlar değiştirilir.
+        """
+        try:
+            engine = ImageProcessor.get_engine()
+            # Motorun gerektirdiği ön işleme ayarları (örn. yedi parçalı tanıyıcıda Otsu)
+            if getattr(engine, 'PREPROCESS', None):
+                preprocess = dict(engine.PREPROCESS, **(preprocess or {}))
+            
+            # Görüntüyü ön işle
+            if config.IMAGE_PREPROCESSING:
+                processed_image = ImageProcessor.preprocess_image(image, preprocess)
+            else:
+                processed_image = image
+            
+            # OCR uygula
+            with metrics.timer('ocr'):
+                text, words = engine.recognize(processed_image)
+            startup.mark('ilk OCR sonucu')
+            
+            # Güven skoru hesapla (sadece tanınan kelimeler)
+            confidences = [word['confidence'] for word in words]
+            avg_confidence = sum(confidences) / len(confidences) if confidences else 0
+            
+            logging.info(f"OCR sonucu: '{text}' (Güven: {avg_confidence:.1f}%)")
+            
+            return {
+                'text': text,
+                'confidence': avg_confidence,
+                'words': words,
+                'processed_image': processed_image
+            }
+        
+        except Exception as e:
+            metrics.increment('errors', stage='ocr')
+            logging.error(f"OCR hatası: {e}")
+            raise
+
+
+class RoiLocator:
+    """OCR öncesi ilgi bölgesini (ROI) belirleyen sınıf
+    
+    Sabit bir bölge verilirse her karede o kullanılır. Otomatik modda sayıların
+    bulunduğu bölge kontur analiziyle bulunur ve önbelleğe alınır; bölgedeki
+    kenar yoğunluğu tespit anındakinin ROI_DRIFT_THRESHOLD oranının altına
+    düşerse (görüntü kaydıysa) yeniden aranır.
+    """
+    
+    # Otomatik tespitin yapıldığı en büyük genişlik (hız için)
+    DETECT_WIDTH = 640
+    
+    def __init__(self, roi=None, auto_detect=False):
+        self.fixed_roi = tuple(roi) if roi else None
+        self.auto_detect = auto_detect
+        self.padding = config.ROI_PADDING
+        self.drift_threshold = config.ROI_DRIFT_THRESHOLD
+        self.cached_roi = None
+        self.baseline_density = None
+        self.lock = threading.Lock()
+    
+    @staticmethod
+    def _to_gray(image):
+        """Görüntüyü gri tonlamaya çevir (zaten griyse olduğu gibi döndür)"""
+        if image.ndim == 3:
+            return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        return image
+    
+    @staticmethod
+    def _edge_density(gray):
+        """Morfolojik gradyan ile ortalama kenar yoğunluğu (0-1)"""
+        kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (3, 3))
+        gradient = cv2.morphologyEx(gray, cv2.MORPH_GRADIENT, kernel)
+        return float(cv2.mean(gradient)[0]) / 255.0
+    
+    def detect(self, image):
+        """Sayı bölgesini kontur analiziyle bul
+        
+        Returns:
+            tuple: (x, y, genişlik, yükseklik) veya bulunamazsa None
+        """
+        gray = self._to_gray(image)
+        height, width = gray.shape[:2]
+        scale = min(1.0, self.DETECT_WIDTH / width)
+        small = cv2.resize(gray, None, fx=scale, fy=scale,
+                           interpolation=cv2.INTER_AREA) if scale < 1.0 else gray
+        
+        # Kenarları bul ve karakterleri yatayda birleştir (açık/koyu zemin fark etmez)
+        kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (3, 3))
+        gradient = cv2.morphologyEx(small, cv2.MORPH_GRADIENT, kernel)
+        _, binary = cv2.threshold(gradient, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        merge_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (15, 5))
+        merged = cv2.morphologyEx(binary, cv2.MORPH_CLOSE, merge_kernel)
+        
+        contours, _ = cv2.findContours(merged, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        
+        small_h, small_w = small.shape[:2]
+        min_area = small_h * small_w * 0.001
+        best, best_score = None, 0
+        for contour in contours:
+            x, y, w, h = cv2.boundingRect(contour)
+            # Metin satırına benzemeyen bölgeleri ele
+            if w * h < min_area or h < 8 or w < h or w > 0.95 * small_w:
+                continue
+            score = cv2.countNonZero(binary[y:y + h, x:x + w])
+            if score > best_score:
+                best, best_score = (x, y, w, h), score
+        
+        if best is None:
+            return None
+        
+        # Kenar payı ekle ve tam çözünürlüğe ölçekle
+        x, y, w, h = best
+        pad = int(h * self.padding)
+        x0 = max(0, int((x - pad) / scale))
+        y0 = max(0, int((y - pad) / scale))
+        x1 = min(width, int((x + w + pad) / scale))
+        y1 = min(height, int((y + h + pad) / scale))
+        return (x0, y0, x1 - x0, y1 - y0)
+    
+    def locate(self, image):
+        """Bu kare için kullanılacak bölgeyi döndür (None = tüm kare)"""
+        if self.fixed_roi:
+            return self.fixed_roi
+        if not self.auto_detect:
+            return None
+        
+        with self.lock:
+            if self.cached_roi is not None:
+                x, y, w, h = self.cached_roi
+                density = self._edge_density(self._to_gray(image[y:y + h, x:x + w]))
+                if density >= self.baseline_density * self.drift_threshold:
+                    return self.cached_roi
+                logging.info("ROI kaydı algılandı, bölge yeniden aranıyor")
+            
+            roi = self.detect(image)
+            if roi is None:
+                logging.warning("Sayı bölgesi bulunamadı, tüm kare kullanılacak")
+                self.cached_roi = None
+                return None
+            
+            x, y, w, h = roi
+            self.cached_roi = roi
+            self.baseline_density = self._edge_density(self._to_gray(image[y:y + h, x:x + w]))
+            logging.info(f"Sayı bölgesi bulundu: {roi}")
+            return roi
+    
+    def invalidate(self):
+        """Önbellekteki otomatik bölgeyi geçersiz kıl"""
+        with self.lock:
+            self.cached_roi = None
+    
+    @staticmethod
+    def crop(image, roi):
+        """Görüntüyü bölgeye kırp"""
+        if roi is None:
+            return image
+        x, y, w, h = roi
+        return image[y:y + h, x:x + w]
+
+
+class ChangeDetector:
+    """Kareler arasındaki değişikliği algılayan sınıf
+    
+    Kare küçültülmüş gri bir imzaya indirgenir ve son OCR yapılan karenin
+    imzasıyla karşılaştırılır. 'diff' yönteminde 32x32 blokların ortalama
+    mutlak farkının en büyüğü (gri seviye), 'hash' yönteminde ortalama hash'in (aHash, 16x16) farklı bit
+    sayısı CHANGE_THRESHOLD ile karşılaştırılır.
+    """
+    
+    SIGNATURE_SIZE = 32
+    HASH_SIZE = 16
+    
+    def __init__(self, method='diff', threshold=4, max_skips=0):
+        self.method = method
+        self.threshold = threshold
+        self.max_skips = max_skips
+        self.reference = None
+        self.skips = 0
+    
+    def signature(self, image):
+        """Karenin karşılaştırma imzasını hesapla"""
+        gray = RoiLocator._to_gray(image)
+        if self.method == 'hash':
+            small = cv2.resize(gray, (self.HASH_SIZE, self.HASH_SIZE),
+                               interpolation=cv2.INTER_AREA)
+            return small > small.mean()
+        return cv2.resize(gray, (self.SIGNATURE_SIZE, self.SIGNATURE_SIZE),
+                          interpolation=cv2.INTER_AREA)
+    
+    def distance(self, signature):
+        """İmzanın referans imzaya uzaklığı"""
+        if self.method == 'hash':
+            return int(np.count_nonzero(signature != self.reference))
+        # Küçük bir rakam değişikliği tüm karenin ortalamasında kaybolmasın
+        # diye her hücrenin (blok ortalaması) farkının en büyüğü alınır
+        return float(cv2.absdiff(signature, self.reference).max())
+    
+    def is_unchanged(self, signature):
+        """Kare referans kareyle aynı kabul edilebilir mi?"""
+        if self.reference is None:
+            return False
+        # Yavaş değişimleri kaçırmamak için belirli aralıklarla OCR'ı zorla
+        if self.max_skips and self.skips >= self.max_skips:
+            return False
+        if self.distance(signature) > self.threshold:
+            return False
+        self.skips += 1
+        return True
+    
+    def set_reference(self, signature):
+        """OCR yapılan karenin imzasını referans olarak sakla"""
+        self.reference = signature
+        self.skips = 0
+    
+    def reset(self):
+        """Referansı temizle; bir sonraki kare mutlaka OCR'dan geçer"""
+        self.reference = None
+        self.skips = 0
+
+
+def majority_vote(results):
+    """Okumaları karakter bazında çoğunluk oyuyla birleştir
+    
+    Önce en çok okumanın verdiği metin uzunluğu seçilir; bu uzunluktaki
+    okumaların her konumunda en çok oy alan karakter kullanılır. Eşitlikte
+    güven skorları toplamı yüksek olan kazanır. Güven skoru, oy verenlerin
+    ortalama güveninin karakterlerdeki ortalama oy payıyla çarpımıdır.
+    """
+    readings = [(''.join(result['text'].split()), result) for result in results]
+    readings = [(text, result) for text, result in readings if text]
+    if not readings:
+        return max(results, key=lambda result: result['confidence'])
+    
+    lengths = {}
+    for text, result in readings:
+        count, weight = lengths.get(len(text), (0, 0.0))
+        lengths[len(text)] = (count + 1, weight + result['confidence'])
+    length = max(lengths, key=lengths.get)
+    voters = [(text, result) for text, result in readings if len(text) == length]
+    
+    chars = []
+    shares = []
+    for i in range(length):
+        tally = {}
+        for text, result in voters:
+            count, weight = tally.get(text[i], (0, 0.0))
+            tally[text[i]] = (count + 1, weight + result['confidence'])
+        char = max(tally, key=tally.get)
+        chars.append(char)
+        shares.append(tally[char][0] / len(voters))
+    text = ''.join(chars)
+    
+    # Kutular ve işlenmiş görüntü oylanan metne en yakın okumadan alınır
+    best = max(voters, key=lambda item: (sum(a == b for a, b in zip(item[0], text)),
+                                         item[1]['confidence']))[1]
+    mean_confidence = sum(result['confidence'] for _, result in voters) / len(voters)
+    return dict(best, text=text, confidence=mean_confidence * sum(shares) / length)
+
+
+class FrameReader:
+    """Bir kameranın karelerini okuyan sınıf
+    
+    ImageProcessor'ı kameraya özgü durumla (ROI önbelleği, son sonuç gibi)
+    birlikte kullanır; ardışık kareler arasında bu durum korunur.
+    """
+    
+    def __init__(self, roi=None, auto_detect=None):
+        self.roi_locator = RoiLocator(
+            roi=config.ROI if roi is None else roi,
+            auto_detect=config.ROI_AUTO_DETECT if auto_detect is None else auto_detect
+        )
+        self.change_detector = None
+        if config.SKIP_UNCHANGED:
+            self.change_detector = ChangeDetector(
+                config.CHANGE_METHOD, config.CHANGE_THRESHOLD, config.CHANGE_MAX_SKIPS
+            )
+        self.last_result = None
+        self.scale = None
+        self.scale_key = None
+        self.lock = threading.Lock()
+    
+    _burst_pool = None
+    _burst_lock = threading.Lock()
+    
+    @staticmethod
+    def get_burst_pool():
+        """Seri çekim OCR iş parçacığı havuzu (tüm kameralar için ortak)"""
+        with FrameReader._burst_lock:
+            if FrameReader._burst_pool is None:
+                FrameReader._burst_pool = concurrent.futures.ThreadPoolExecutor(
+                    max(1, config.BURST_WORKERS), thread_name_prefix='burst'
+                )
+            return FrameReader._burst_pool
+    
+    def read(self, image, burst=None):
+        """Kareyi ROI'ye kırp ve OCR uygula
+        
+        Değişiklik algılama açıksa ve kare son OCR yapılan kareden farklı
+        değilse OCR atlanır; önceki sonuç 'repeated' olarak işaretlenip döndürülür.
+        burst verilirse (aynı sahnenin sonraki karelerini veren yineleyici)
+        kareler seri çekim olarak okunur (bkz. _read_burst).
+        """
+        metrics.increment('frames')
+        with metrics.timer('roi'):
+            roi = self.roi_locator.locate(image)
+            crop = RoiLocator.crop(image, roi)
+        
+        signature = None
+        if self.change_detector:
+            signature = self.change_detector.signature(crop)
+            with self.lock:
+                if self.last_result and self.change_detector.is_unchanged(signature):
+                    metrics.increment('skipped_unchanged')
+                    logging.info("Görüntü değişmedi, önceki OCR sonucu kullanıldı")
+                    return dict(self.last_result, repeated=True)
+        
+        if burst is not None:
+            result = self._read_burst(crop, (RoiLocator.crop(frame, roi) for frame in burst),
+                                      self.preprocess_overrides(crop, roi, config.BURST_PREPROCESS))
+        else:
+            preprocess = self.preprocess_overrides(crop, roi)
+            result = retry_call(lambda: ImageProcessor.extract_numbers(crop, preprocess), "OCR")
+        result['roi'] = roi
+        result['repeated'] = False
+        
+        if signature is not None:
+            with self.lock:
+                if result['text']:
+                    self.change_detector.set_reference(signature)
+                    self.last_result = result
+                else:
+                    self.change_detector.reset()
+                    self.last_result = None
+        
+        # Otomatik bölgede hiçbir şey okunamadıysa bir sonraki karede yeniden ara
+        if not result['text'] and roi is not None and not self.roi_locator.fixed_roi:
+            self.roi_locator.invalidate()
+        # Okunamadıysa otomatik ölçek de bir sonraki karede yeniden hesaplanır
+        if not result['text']:
+            with self.lock:
+                self.scale = None
+        
+        return result
+    
+    def preprocess_overrides(self, crop, roi=None, overrides=None):
+        """RESIZE_FACTOR = 'auto' ise ölçeği bu kameranın önbelleğinden çöz
+        
+        Returns:
+            dict: extract_numbers'a verilecek ön işleme ayarları (veya None)
+        """
+        if PreprocessPipeline.settings(overrides)['RESIZE_FACTOR'] != 'auto':
+            return overrides
+        return dict(overrides or {}, RESIZE_FACTOR=self.auto_scale(crop, roi))
+    
+    def auto_scale(self, crop, roi=None):
+        """Karakter yüksekliğini AUTO_SCALE_HEIGHT'e getiren ölçek
+        
+        Ölçek kamera başına önbelleğe alınır; yalnızca ilk karede, bölge (ROI)
+        veya kare boyutu değiştiğinde ve okuma başarısız olduğunda yeniden
+        hesaplanır. Karakter bulunamazsa ölçeklenmez (1.0).
+        """
+        key = (roi, crop.shape[:2])
+        with self.lock:
+            if self.scale is not None and self.scale_key == key:
+                return self.scale
+        
+        with metrics.timer('autoscale'):
+            height = ImageProcessor.estimate_char_height(crop)
+        if height is None:
+            logging.warning("Otomatik ölçek: karakter bulunamadı, ölçeklenmedi")
+            return 1.0
+        
+        low, high = config.AUTO_SCALE_LIMITS
+        scale = min(max(config.AUTO_SCALE_HEIGHT / height, low), high)
+        # Küçük farklar için yeniden örnekleme yapılmaz; yuvarlama hat önbelleğini sınırlar
+        scale = 1.0 if abs(scale - 1.0) < 0.1 else round(scale, 2)
+        logging.info(f"Otomatik ölçek: karakter yüksekliği {height:.0f} px → {scale}x")
+        with self.lock:
+            self.scale, self.scale_key = scale, key
+        return scale
+    
+    @staticmethod
+    def _consensus(results):
+        """Güveni MIN_CONFIDENCE üzerinde ve aynı metni veren iki okuma varsa güvenlisini döndür"""
+        seen = {}
+        for result in results:
+            text = ''.join(result['text'].split())
+            if not text or result['confidence'] < config.MIN_CONFIDENCE:
+                continue
+            if text in seen:
+                return max(seen[text], result, key=lambda item: item['confidence'])
+            seen[text] = result
+        return None
+    
+    def _read_burst(self, crop, crops, preprocess=None):
+        """Seri çekim: kareleri ucuz ön işlemeyle (preprocess) paralel oku
+        
+        Aynı anda en fazla BURST_WORKERS kare okunur; sonraki kare ancak bir
+        okuma bittiğinde yakalanır, böylece erken çıkışta fazladan kare
+        yakalanmaz. İki okuma uyuştuğunda hemen döner, uyuşmazsa tüm
+        okumaların karakter bazında çoğunluk oyu kullanılır.
+        """
+        pool = FrameReader.get_burst_pool()
+        crops = itertools.chain([crop], crops)
+        pending = set()
+        results = []
+        exhausted = False
+        try:
+            while True:
+                while not exhausted and len(pending) < max(1, config.BURST_WORKERS):
+                    try:
+                        next_crop = next(crops)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    except Exception as e:
+                        # Kamera seri çekimin ortasında hata verdiyse eldekilerle devam et
+                        logging.warning(f"Seri çekim karesi alınamadı: {e}")
+                        exhausted = True
+                        break
+                    pending.add(pool.submit(ImageProcessor.extract_numbers, next_crop,
+                                            preprocess))
+                if not pending:
+                    break
+                
+                done, pending = concurrent.futures.wait(
+                    pending, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                for future in done:
+                    try:
+                        results.append(future.result())
+                    except Exception:
+                        # extract_numbers hatayı zaten kaydetti
+                        pass
+                
+                agreed = self._consensus(results)
+                if agreed is not None:
+                    metrics.increment('burst_consensus')
+                    metrics.increment('burst_reads', len(results))
+                    return dict(agreed, burst_reads=len(results))
+        finally:
+            for future in pending:
+                future.cancel()
+        
+        if not results:
+            raise Exception("Seri çekimde hiçbir kare okunamadı")
+        metrics.increment('burst_vote')
+        metrics.increment('burst_reads', len(results))
+        logging.info(f"Seri çekimde okumalar uyuşmadı, {len(results)} okumanın çoğunluk oyu kullanıldı")
+        return dict(majority_vote(results), burst_reads=len(results))
@@ -0,0 +1,332 @@
+"""
+Çalışma zamanı yardımcıları - Capture Numbers uygulaması için
+Aşama metrikleri, başlangıç profili, kare/yapılandırma kilidi ve yeniden deneme
+"""
+
+import os
+import sys
+import time
+import json
+import logging
+import threading
+from contextlib import contextmanager
+
+from appconfig import config
+
+
+class Metrics:
+    """Aşama gecikmeleri ve sayaçlar için iş parçacığı güvenli metrik deposu
+    
+    Gecikmeler monoton saatle ölçülüp histogramlarda, olaylar (kare, atlama,
+    düşük güven, hata) sayaçlarda tutulur. Metrikler periyodik olarak
+    Prometheus textfile (node exporter) veya JSON formatında dosyaya yazılır.
+    """
+    
+    PREFIX = 'raspi_ocr'
+    # Histogram sınırları (saniye)
+    BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+        self.started = time.time()
+        self._exporter = None
+        self._export_args = None
+        self._stop_event = threading.Event()
+    
+    def increment(self, name, value=1, **labels):
+        """Sayacı artır"""
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+    
+    def observe(self, stage, seconds):
+        """Bir aşamanın süresini histograma ekle"""
+        with self.lock:
+            histogram = self.histograms.get(stage)
+            if histogram is None:
+                histogram = {'counts': [0] * len(self.BUCKETS), 'count': 0, 'sum': 0.0}
+                self.histograms[stage] = histogram
+            for i, bound in enumerate(self.BUCKETS):
+                if seconds <= bound:
+                    histogram['counts'][i] += 1
+            histogram['count'] += 1
+            histogram['sum'] += seconds
+    
+    @contextmanager
+    def timer(self, stage):
+        """Bloğun süresini ölç: with metrics.timer('ocr'): ..."""
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.monotonic() - started)
+    
+    @staticmethod
+    def _format_labels(labels):
+        """Prometheus etiket biçimi: {anahtar="değer",...}"""
+        if not labels:
+            return ''
+        return '{' + ','.join(f'{key}="{value}"' for key, value in labels) + '}'
+    
+    def to_prometheus(self):
+        """Metrikleri Prometheus metin formatında döndür"""
+        with self.lock:
+            counters = dict(self.counters)
+            histograms = {stage: dict(h, counts=list(h['counts']))
+                          for stage, h in self.histograms.items()}
+        
+        lines = []
+        for name in sorted({name for name, _ in counters}):
+            metric = f"{self.PREFIX}_{name}_total"
+            lines.append(f"# TYPE {metric} counter")
+            for (counter_name, labels), value in sorted(counters.items()):
+                if counter_name == name:
+                    lines.append(f"{metric}{self._format_labels(labels)} {value}")
+        
+        metric = f"{self.PREFIX}_stage_duration_seconds"
+        if histograms:
+            lines.append(f"# TYPE {metric} histogram")
+        for stage, histogram in sorted(histograms.items()):
+            for bound, count in zip(self.BUCKETS, histogram['counts']):
+                lines.append(f'{metric}_bucket{{stage="{stage}",le="{bound}"}} {count}')
+            lines.append(f'{metric}_bucket{{stage="{stage}",le="+Inf"}} {histogram["count"]}')
+            lines.append(f'{metric}_sum{{stage="{stage}"}} {histogram["sum"]:.6f}')
+            lines.append(f'{metric}_count{{stage="{stage}"}} {histogram["count"]}')
+        
+        lines.append(f"# TYPE {self.PREFIX}_start_time_seconds gauge")
+        lines.append(f"{self.PREFIX}_start_time_seconds {self.started:.0f}")
+        memory = process_memory()
+        if memory is not None:
+            lines.append(f"# TYPE {self.PREFIX}_resident_memory_bytes gauge")
+            lines.append(f"{self.PREFIX}_resident_memory_bytes {memory}")
+        return '\n'.join(lines) + '\n'
+    
+    def to_dict(self):
+        """Metrikleri JSON'a uygun sözlük olarak döndür"""
+        with self.lock:
+            counters = {}
+            for (name, labels), value in sorted(self.counters.items()):
+                label_text = ','.join(f"{key}={value}" for key, value in labels)
+                counters[f"{name}[{label_text}]" if label_text else name] = value
+            stages = {}
+            for stage, histogram in sorted(self.histograms.items()):
+                stages[stage] = {
+                    'count': histogram['count'],
+                    'sum_seconds': round(histogram['sum'], 6),
+                    'mean_seconds': round(histogram['sum'] / histogram['count'], 6),
+                    'buckets': dict(zip(map(str, self.BUCKETS), histogram['counts']))
+                }
+        return {
+            'start_time': self.started,
+            'updated': time.time(),
+            'resident_memory_bytes': process_memory(),
+            'counters': counters,
+            'stages': stages
+        }
+    
+    def export(self, path, fmt='prometheus'):
+        """Metrikleri dosyaya atomik olarak yaz"""
+        try:
+            if fmt == 'json':
+                content = json.dumps(self.to_dict(), indent=2, ensure_ascii=False)
+            else:
+                content = self.to_prometheus()
+            temp_file = f"{path}.tmp"
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                f.write(content)
+            os.replace(temp_file, path)
+        except Exception as e:
+            logging.error(f"Metrik yazma hatası: {e}")
+    
+    def start_exporter(self, path, fmt='prometheus', interval=15):
+        """Metrikleri arka planda periyodik olarak dosyaya yaz"""
+        def export_loop():
+            while not self._stop_event.wait(interval):
+                self.export(path, fmt)
+        
+        self._export_args = (path, fmt)
+        self._stop_event.clear()
+        self._exporter = threading.Thread(target=export_loop, name="metrics", daemon=True)
+        self._exporter.start()
+        logging.info(f"Metrikler {interval} saniyede bir yazılacak: {path}")
+    
+    def stop_exporter(self):
+        """Arka plan yazıcısını durdur ve son durumu yaz"""
+        if self._exporter is None:
+            return
+        self._stop_event.set()
+        self._exporter.join()
+        self._exporter = None
+        self.export(*self._export_args)
+
+
+# Uygulama genelindeki metrikler
+metrics = Metrics()
+
+
+def process_uptime():
+    """Sürecin başlangıcından bu yana geçen süre (saniye), Linux dışında None
+    
+    Python yorumlayıcısının açılışı ve modül içe aktarmaları da dahildir.
+    """
+    try:
+        with open('/proc/self/stat') as f:
+            # Süreç adı boşluk içerebilir; alanlar ')' sonrasından sayılır
+            fields = f.read().rsplit(')', 1)[1].split()
+        with open('/proc/uptime') as f:
+            uptime = float(f.read().split()[0])
+        return uptime - int(fields[19]) / os.sysconf('SC_CLK_TCK')
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def process_memory():
+    """Sürecin bellekte tuttuğu (RSS) bayt sayısı, Linux dışında None
+    
+    Uzun süreli testlerde bellek sızıntısını izlemek için metriklere eklenir.
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+class StartupProfile:
+    """Başlangıç aşamalarının süreleri (--profile-startup)
+    
+    Yorumlayıcı ve içe aktarma süresi /proc üzerinden, sonraki aşamalar
+    phase() bloklarıyla, ilk kare ve ilk OCR sonucu gibi olaylar mark() ile
+    süreç başlangıcına göre kaydedilir.
+    """
+    
+    def __init__(self):
+        self.started = time.monotonic()
+        self.before_start = process_uptime()
+        self.lock = threading.Lock()
+        self.phases = []
+        self.marks = {}
+    
+    def elapsed(self):
+        """Süreç başlangıcından (bilinmiyorsa modül yüklenmesinden) bu yana geçen süre"""
+        return (self.before_start or 0.0) + time.monotonic() - self.started
+    
+    @contextmanager
+    def phase(self, name):
+        """Bloğun süresini başlangıç aşaması olarak kaydet"""
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            with self.lock:
+                self.phases.append((name, time.monotonic() - started))
+    
+    def mark(self, name):
+        """Olayın ilk gerçekleştiği anı kaydet (sonraki çağrılar yok sayılır)"""
+        if name in self.marks:
+            return
+        with self.lock:
+            self.marks.setdefault(name, self.elapsed())
+    
+    def report(self, file=None):
+        """Başlangıç aşamalarını, olayları ve metrik aşama toplamlarını yazdır"""
+        file = file or sys.stderr
+        print("\n⏱ Başlangıç profili", file=file)
+        if self.before_start is not None:
+            print(f"   {'yorumlayıcı + içe aktarma':<28}{self.before_start * 1000:9.1f} ms",
+                  file=file)
+        for name, seconds in self.phases:
+            print(f"   {name:<28}{seconds * 1000:9.1f} ms", file=file)
+        for name, at in sorted(self.marks.items(), key=lambda item: item[1]):
+            print(f"   {name + ' (süreç başından)':<28}{at * 1000:9.1f} ms", file=file)
+        
+        # Aşama ortalamaları (ilk çağrı tembel içe aktarmayı da içerir)
+        stages = metrics.to_dict().get('stages', {})
+        if stages:
+            print("   Aşamalar (toplam / çağrı):", file=file)
+            for stage, info in sorted(stages.items()):
+                print(f"     {stage:<26}{info['sum_seconds'] * 1000:9.1f} ms / {info['count']}",
+                      file=file)
+
+
+startup = StartupProfile()
+
+
+class FrameGate:
+    """Kare işleme ile yapılandırma değişimini birbirinden ayıran kilit
+    
+    Kareler frame() ile paylaşımlı girer (birden fazla iş parçacığı aynı
+    anda), yapılandırma değişimi exclusive() ile tek başına girer: işlenen
+    karelerin bitmesini bekler ve bu sırada yeni kare başlamaz. Böylece bir
+    kare hiçbir zaman eski ve yeni ayarların karışımıyla işlenmez.
+    """
+    
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.active = 0
+        self.exclusive_held = False
+    
+    @contextmanager
+    def frame(self):
+        """Tek bir karenin işlenmesi (iç içe kullanılmamalı)"""
+        with self.condition:
+            while self.exclusive_held:
+                self.condition.wait()
+            self.active += 1
+        try:
+            yield
+        finally:
+            with self.condition:
+                self.active -= 1
+                self.condition.notify_all()
+    
+    @contextmanager
+    def exclusive(self):
+        """Kareler arasında, başka kare işlenmezken çalış"""
+        with self.condition:
+            while self.exclusive_held:
+                self.condition.wait()
+            # Önce yeni karelerin girişi kapatılır, sonra işlenenler beklenir
+            self.exclusive_held = True
+            while self.active:
+                self.condition.wait()
+        try:
+            yield
+        finally:
+            with self.condition:
+                self.exclusive_held = False
+                self.condition.notify_all()
+
+
+frame_gate = FrameGate()
+
+
+def retry_call(operation, description, before_retry=None):
+    """operation'ı başarısız olursa MAX_RETRIES kez daha dene
+    
+    Denemeler arasında RETRY_DELAY'den başlayıp her seferinde ikiye katlanan
+    (en fazla RETRY_MAX_DELAY) süre beklenir. before_retry verilirse her
+    yeniden denemeden önce deneme sırasıyla (0'dan başlayarak) çağrılır.
+    Son denemenin hatası yukarı iletilir; ReplayFinished yeniden denenmez.
+    """
+    attempts = max(0, config.MAX_RETRIES) + 1
+    for attempt in range(attempts):
+        try:
+            return operation()
+        except ReplayFinished:
+            raise
+        except Exception as e:
+            if attempt + 1 >= attempts:
+                raise
+            delay = min(config.RETRY_DELAY * 2 ** attempt, config.RETRY_MAX_DELAY)
+            logging.warning(f"{description} başarısız ({e}), {delay:g} saniye sonra yeniden "
+                            f"deneniyor ({attempt + 1}/{attempts - 1})")
+            time.sleep(delay)
+            if before_retry is not None:
+                before_retry(attempt)
+
+
+class ReplayFinished(Exception):
+    """Döngüsüz (REPLAY_LOOP = False) tekrar oynatmanın kareleri bitti"""
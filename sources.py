@@ -0,0 +1,338 @@
+"""
+Kaynaklar - Capture Numbers uygulaması için
+Kaynak (kamera) ayarları ve kurulumu, yapılandırmanın çalışırken yeniden yüklenmesi
+"""
+
+import os
+import time
+import signal
+import logging
+import threading
+
+from appconfig import config, load_config
+from runtime import metrics, frame_gate
+from cameras import CameraCapture
+from processing import FrameReader
+from storage import ExcelWriter
+from pipeline import CaptureScheduler, CaptureSource
+
+
+def source_settings():
+    """SOURCES ayarındaki kaynakları döndür; boşsa genel kamera ayarlarıyla tek kaynak"""
+    if not config.SOURCES:
+        return [{}]
+    names = [settings.get('name') for settings in config.SOURCES]
+    if not all(names) or len(set(names)) != len(names):
+        raise ValueError("SOURCES içindeki her kaynağın benzersiz bir 'name' değeri olmalı")
+    return config.SOURCES
+
+
+def source_sheets():
+    """Kaynak adı -> Excel sayfa adı"""
+    return {settings['name']: settings.get('sheet', config.EXCEL_SHEET)
+            for settings in config.SOURCES}
+
+
+def camera_settings(settings):
+    """Kaynağın kamerasını belirleyen ayarlar (değişirse kamera yeniden başlatılır)"""
+    return (settings.get('camera_type', config.CAMERA_TYPE),
+            settings.get('camera_index', config.CAMERA_INDEX),
+            tuple(settings.get('resolution', config.CAMERA_RESOLUTION)),
+            settings.get('replay_path', config.REPLAY_PATH),
+            config.CAMERA_GRABBER, config.PICAMERA_MODE, config.PICAMERA_LORES,
+            config.REPLAY_FPS, config.REPLAY_LOOP, config.REPLAY_JITTER,
+            config.REPLAY_DROP_RATE, config.REPLAY_SEED)
+
+
+def reader_settings(settings):
+    """Kaynağın okuyucu durumunu belirleyen ayarlar
+    
+    Değişirse okuyucu yeniden oluşturulur: ROI, değişiklik algılama ve
+    önbellekteki otomatik ölçek sıfırlanır.
+    """
+    return (settings.get('roi'), settings.get('roi_auto_detect'), config.ROI,
+            config.ROI_AUTO_DETECT, config.ROI_PADDING, config.ROI_DRIFT_THRESHOLD,
+            config.SKIP_UNCHANGED, config.CHANGE_METHOD, config.CHANGE_THRESHOLD,
+            config.CHANGE_MAX_SKIPS, config.RESIZE_FACTOR, config.AUTO_SCALE_HEIGHT,
+            tuple(config.AUTO_SCALE_LIMITS))
+
+
+def create_camera(settings):
+    """Kaynak ayarlarından kamerayı başlat"""
+    return CameraCapture(
+        camera_type=settings.get('camera_type', config.CAMERA_TYPE),
+        camera_index=settings.get('camera_index', config.CAMERA_INDEX),
+        resolution=settings.get('resolution', config.CAMERA_RESOLUTION),
+        replay_path=settings.get('replay_path'),
+        name=settings.get('name')
+    )
+
+
+def create_reader(settings):
+    """Kaynak ayarlarından okuyucu oluştur"""
+    return FrameReader(roi=settings.get('roi'), auto_detect=settings.get('roi_auto_detect'))
+
+
+def create_source(settings, store=None):
+    """Kaynak ayarlarından kamera, okuyucu ve çıktı oluştur
+    
+    Kaynakta verilmeyen ayarlar genel ayarlardan alınır. store verilirse
+    okumalar ortak veritabanına kaynak adıyla, verilmezse kaynağın kendi
+    Excel dosyasına yazılır.
+    """
+    name = settings.get('name')
+    camera = create_camera(settings)
+    try:
+        if store is not None:
+            excel_writer = store.for_source(name)
+        else:
+            filename = settings.get('excel_file')
+            if filename is None:
+                filename = config.EXCEL_FILE
+                if name:
+                    # Kaynaklar aynı çalışma kitabını birbirinin üzerine yazmasın
+                    stem, extension = os.path.splitext(filename)
+                    filename = f"{stem}_{name}{extension}"
+            excel_writer = ExcelWriter(filename, settings.get('sheet', config.EXCEL_SHEET))
+    except Exception:
+        camera.release()
+        raise
+    
+    source = CaptureSource(
+        camera, excel_writer,
+        settings.get('interval', config.CAPTURE_INTERVAL),
+        settings.get('max_captures', config.MAX_CAPTURES),
+        create_reader(settings), name
+    )
+    source.settings = settings
+    return source
+
+
+# Çalışırken değiştirilemeyen ayarlar (dosyalar, iş parçacığı sayıları, çalışma modu)
+RESTART_SETTINGS = (
+    'STORAGE', 'DB_FILE', 'EXCEL_FILE', 'EXCEL_SHEET', 'APPEND_MODE', 'EXCEL_ROTATE',
+    'EXCEL_ROTATE_ROWS', 'EXCEL_ROTATE_TARGET', 'EXCEL_INDEX_FILE', 'EXCEL_EXPORT_INTERVAL',
+    'CONTINUOUS_MODE', 'PIPELINE_MODE', 'PIPELINE_OCR_WORKERS', 'PIPELINE_QUEUE_SIZE',
+    'PIPELINE_BACKPRESSURE', 'BURST_WORKERS', 'ASYNC_ARCHIVE', 'ARCHIVE_QUEUE_SIZE',
+    'ARCHIVE_FORMAT', 'ARCHIVE_CHUNK_FRAMES', 'IMAGE_OUTPUT_DIR', 'LOG_FILE', 'LOG_TO_CONSOLE',
+    'METRICS_FILE', 'METRICS_FORMAT', 'METRICS_INTERVAL', 'CONFIG_WATCH', 'CONFIG_WATCH_INTERVAL',
+    'DAEMON_SOCKET', 'DAEMON_HOST', 'DAEMON_PORT', 'DAEMON_HISTORY'
+)
+
+
+def apply_config(new_config, sources, store=None):
+    """Yeni yapılandırmayı çalışan kaynaklara uygula (frame_gate.exclusive içinde çağrılır)
+    
+    Ön işleme, OCR ve kaydetme ayarları her karede yapılandırmadan okunduğu
+    için yapılandırmanın değiştirilmesi yeterlidir. Kamera yalnızca kendi
+    ayarları değiştiyse yeniden başlatılır; okuyucu ve çekim zamanlayıcısı
+    ayarları değiştiyse yenilenir. RESTART_SETTINGS'teki değişiklikler
+    uygulanmaz, uyarı verilir. Aygıt aynı anda iki kez açılamadığından
+    (V4L2, Picamera2) eski kamera yeni ayarlarla açılmadan önce kapatılır.
+    Yeni kameralardan biri açılamazsa (veya SOURCES geçersizse) hiçbir şey
+    değişmez: eski yapılandırma kalır, kapatılan kameralar eski ayarlarıyla
+    yeniden açılır.
+    
+    Returns:
+        list: Değişen ayar adları
+    
+    Raises:
+        Exception: Yeni yapılandırma uygulanamadıysa
+    """
+    old_config = config.module
+    changed = sorted(
+        name for name in set(dir(old_config)) | set(dir(new_config))
+        if name.isupper() and getattr(old_config, name, None) != getattr(new_config, name, None)
+    )
+    if not changed:
+        return changed
+    
+    # Yeniden başlatma gerektiren ayarlar o zamana kadar eski değerleriyle kalır
+    restart = [name for name in changed if name in RESTART_SETTINGS]
+    for name in restart:
+        setattr(new_config, name, getattr(old_config, name))
+    
+    before = {id(source): (camera_settings(source.settings), reader_settings(source.settings))
+              for source in sources}
+    # Okuyucular ve değişen kameralar yeni ayarlarla hazırlanır; herhangi biri
+    # başarısız olursa eski ayarlar ve kameralar geri yüklenir
+    config.use(new_config)
+    plans = []
+    try:
+        new_sources = {settings.get('name'): settings for settings in source_settings()}
+        for source in sources:
+            settings = new_sources.get(source.name, source.settings)
+            old_camera, old_reader = before[id(source)]
+            plans.append({'source': source, 'settings': settings, 'camera': None,
+                          'reader': None, 'restart': camera_settings(settings) != old_camera,
+                          'released': False})
+            if reader_settings(settings) != old_reader:
+                plans[-1]['reader'] = create_reader(settings)
+        
+        for plan in plans:
+            if plan['restart']:
+                source = plan['source']
+                logging.info(f"{source.label}: kamera ayarları değişti, kamera yeniden başlatılıyor")
+                # Aygıt ancak eski kamera bırakıldıktan sonra yeniden açılabilir
+                source.camera.release()
+                plan['released'] = True
+                plan['camera'] = create_camera(plan['settings'])
+    except Exception:
+        config.use(old_config)
+        for plan in plans:
+            if plan['camera'] is not None:
+                plan['camera'].release()
+            if plan['released']:
+                source = plan['source']
+                try:
+                    source.camera.reconnect()
+                except Exception as e:
+                    # Kamera bir sonraki çekimde yeniden açılmaya çalışılır
+                    logging.error(f"{source.label}: kamera eski ayarlarla açılamadı: {e}")
+        raise
+    
+    if set(new_sources) != {source.name for source in sources}:
+        restart.append('SOURCES (kaynak adları)')
+    if restart:
+        logging.warning(f"Şu ayarlar yeniden başlatınca geçerli olur: {', '.join(restart)}")
+    
+    for plan in plans:
+        source, settings = plan['source'], plan['settings']
+        source.settings = settings
+        if plan['camera'] is not None:
+            source.camera = plan['camera']
+        if plan['reader'] is not None:
+            source.reader = plan['reader']
+        
+        interval = settings.get('interval', config.CAPTURE_INTERVAL)
+        source.max_captures = settings.get('max_captures', config.MAX_CAPTURES)
+        if interval != source.interval or {'CAPTURE_ALIGN', 'CAPTURE_INTERVAL_MAX',
+                                           'CAPTURE_STABLE_READS'} & set(changed):
+            missed = source.scheduler.missed
+            source.interval = interval
+            source.scheduler = CaptureScheduler(interval, config.CAPTURE_ALIGN,
+                                                config.CAPTURE_INTERVAL_MAX,
+                                                config.CAPTURE_STABLE_READS, source.label)
+            source.scheduler.missed = missed
+        
+        writer = getattr(source.excel_writer, 'store', source.excel_writer)
+        if isinstance(writer, ExcelWriter):
+            writer.flush_rows = config.EXCEL_FLUSH_ROWS
+            writer.flush_interval = config.EXCEL_FLUSH_INTERVAL
+    
+    if store is not None:
+        store.flush_rows = config.DB_COMMIT_ROWS
+        store.flush_interval = config.DB_COMMIT_INTERVAL
+    logging.getLogger().setLevel(getattr(logging, config.LOG_LEVEL.upper(), logging.INFO))
+    metrics.increment('config_reloads')
+    return changed
+
+
+class ConfigWatcher:
+    """Yapılandırma dosyasını izleyip değiştiğinde yeniden yükleyen iş parçacığı
+    
+    Dosyanın değiştirilme zamanı ve boyutu CONFIG_WATCH_INTERVAL saniyede bir
+    kontrol edilir; trigger() (SIGHUP) beklemeden yeniden yükler. Yeni dosya
+    önce tamamen yüklenir; hatalıysa eski ayarlarla devam edilir. Geçerliyse
+    apply(yeni yapılandırma) kareler arasında (frame_gate.exclusive) çağrılır.
+    Uygulanamayan bir dosya (örn. yeni kamera açılamadı) değişmese de en
+    erken 30 saniye sonra yeniden denenir.
+    """
+    
+    def __init__(self, path, apply, interval=2):
+        self.path = path
+        self.apply = apply
+        self.interval = interval
+        self.stamp = self._stamp()
+        self.retry_at = None
+        self._requested = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread = None
+    
+    def _stamp(self):
+        """Dosyanın değiştirilme zamanı ve boyutu (yoksa None)"""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+    
+    def trigger(self):
+        """Dosya değişmemiş olsa da yeniden yükle (sinyal işleyicisinden çağrılabilir)"""
+        self._requested.set()
+    
+    def reload(self):
+        """Dosyayı yükleyip uygula
+        
+        Returns:
+            bool: Yeni yapılandırma uygulandıysa True
+        """
+        try:
+            new_config = load_config(self.path)
+        except Exception as e:
+            metrics.increment('errors', stage='config')
+            logging.error(f"Yapılandırma yüklenemedi, eski ayarlarla devam ediliyor: {e}")
+            return False
+        
+        try:
+            with frame_gate.exclusive():
+                changed = self.apply(new_config)
+        except Exception as e:
+            metrics.increment('errors', stage='config')
+            logging.error(f"Yapılandırma uygulanamadı, eski ayarlarla devam ediliyor: {e}",
+                          exc_info=True)
+            # Dosya değişmese de bir süre sonra yeniden denenir (örn. kamera takılınca)
+            self.retry_at = time.monotonic() + max(self.interval, 30)
+            return False
+        self.retry_at = None
+        
+        if changed:
+            logging.info(f"Yapılandırma yeniden yüklendi: {', '.join(changed)}")
+            print(f"↻ Yapılandırma yeniden yüklendi: {', '.join(changed)}")
+        return True
+    
+    def _run(self):
+        while not self._stop_event.is_set():
+            requested = self._requested.wait(self.interval)
+            if self._stop_event.is_set():
+                break
+            self._requested.clear()
+            
+            stamp = self._stamp()
+            retry = self.retry_at is not None and time.monotonic() >= self.retry_at
+            if not requested and not retry and (stamp is None or stamp == self.stamp):
+                continue
+            # Düzenleyici dosyayı yazmayı bitirsin
+            while True:
+                time.sleep(0.2)
+                latest = self._stamp()
+                if latest == stamp:
+                    break
+                stamp = latest
+            self.stamp = stamp
+            self.reload()
+    
+    def start(self):
+        """İzlemeyi başlat"""
+        self._thread = threading.Thread(target=self._run, name="config-watcher", daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        """İzlemeyi durdur"""
+        self._stop_event.set()
+        self._requested.set()
+        if self._thread:
+            self._thread.join(timeout=2)
+
+
+def start_config_watcher(path, sources, store=None):
+    """CONFIG_WATCH açıksa yapılandırma izleyicisini ve SIGHUP işleyicisini başlat"""
+    if not config.CONFIG_WATCH:
+        return None
+    watcher = ConfigWatcher(path, lambda new_config: apply_config(new_config, sources, store),
+                            config.CONFIG_WATCH_INTERVAL)
+    watcher.start()
+    if hasattr(signal, 'SIGHUP'):
+        signal.signal(signal.SIGHUP, lambda signum, frame: watcher.trigger())
+    print(f"↻ Yapılandırma izleniyor: {watcher.path} (SIGHUP ile hemen yüklenir)\n")
+    return watcher
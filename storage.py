@@ -0,0 +1,749 @@
+"""
+Kayıt - Capture Numbers uygulaması için
+Excel yazıcısı, dosya döndürme, SQLite deposu ve veritabanından Excel'e aktarma
+"""
+
+import os
+import time
+import json
+import logging
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+
+from appconfig import config
+from runtime import metrics
+# openpyxl ilk kullanıldığı yerde içe aktarılır (başlangıç süresini kısaltır)
+
+
+class WorkbookRotation:
+    """Excel dosyalarını tarih veya satır sayısına göre döndürme kuralı
+    
+    period 'day' veya 'week' ise her gün/hafta, max_rows verilirse her
+    max_rows satırda bir yeni dosyaya (target='sheet' ise aynı dosyada yeni
+    sayfaya) geçilir. Dosya (veya sayfa) adındaki strftime kodları dönemin
+    başlangıç tarihiyle doldurulur (örn. 'readings_%Y-%m-%d.xlsx'); adda kod
+    yoksa sonuna tarih eklenir. Aynı dönemdeki sonraki parçalar '_2', '_3', ...
+    ekiyle adlandırılır.
+    """
+    
+    DEFAULT_SUFFIXES = {'day': '_%Y-%m-%d', 'week': '_%G-W%V'}
+    
+    def __init__(self, filename, sheet_name="Sayılar", period=None, max_rows=0, target='file'):
+        if period not in (None, 'day', 'week'):
+            raise ValueError(f"Geçersiz döndürme dönemi: {period}")
+        self.filename = filename
+        self.sheet_name = sheet_name
+        self.period = period
+        self.max_rows = max_rows or 0
+        self.target = target
+    
+    @classmethod
+    def from_config(cls, filename, sheet_name="Sayılar"):
+        """EXCEL_ROTATE* ayarlarından döndürme kuralı oluştur"""
+        return cls(filename, sheet_name, config.EXCEL_ROTATE, config.EXCEL_ROTATE_ROWS,
+                   config.EXCEL_ROTATE_TARGET)
+    
+    @property
+    def enabled(self):
+        return bool(self.period or self.max_rows)
+    
+    def period_start(self, timestamp):
+        """Zaman damgasının ait olduğu dönemin başlangıcı (döndürme yoksa None)"""
+        if self.period is None:
+            return None
+        start = datetime.combine(timestamp.date(), datetime.min.time())
+        if self.period == 'week':
+            start -= timedelta(days=start.weekday())
+        return start
+    
+    def is_full(self, rows):
+        """Parça satır sınırına ulaştı mı"""
+        return bool(self.max_rows) and rows >= self.max_rows
+    
+    def _name(self, template, period, part, extension=True):
+        if period is not None:
+            if '%' not in template:
+                stem, ext = os.path.splitext(template) if extension else (template, '')
+                template = stem + self.DEFAULT_SUFFIXES[self.period] + ext
+            template = period.strftime(template)
+        if part > 1:
+            stem, ext = os.path.splitext(template) if extension else (template, '')
+            template = f"{stem}_{part}{ext}"
+        return template
+    
+    def target_for(self, period, part=1, sheet_name=None):
+        """Dönem ve parça için (dosya adı, sayfa adı)
+        
+        sheet_name verilirse varsayılan sayfa adı yerine o kullanılır.
+        """
+        sheet_name = sheet_name or self.sheet_name
+        if not self.enabled:
+            return self.filename, sheet_name
+        if self.target == 'sheet':
+            return self.filename, self._name(sheet_name, period, part, extension=False)
+        return self._name(self.filename, period, part), sheet_name
+
+
+class WorkbookIndex:
+    """Döndürülen Excel dosyalarının küçük JSON dizini
+    
+    Her dosya/sayfa için ilk ve son okuma zamanı ile satır sayısı tutulur;
+    böylece istenen tarihteki dosya, dosyalar açılmadan bulunabilir.
+    """
+    
+    def __init__(self, path):
+        self.path = path
+        self.entries = []
+        try:
+            with open(path, encoding='utf-8') as f:
+                self.entries = json.load(f).get('files', [])
+        except (OSError, ValueError):
+            pass
+    
+    def update(self, filename, sheet_name, rows, first=None, last=None):
+        """Dosya/sayfa kaydını güncelle ve dizini diske yaz"""
+        for entry in self.entries:
+            if entry['file'] == filename and entry['sheet'] == sheet_name:
+                break
+        else:
+            entry = {'file': filename, 'sheet': sheet_name, 'first': None, 'last': None}
+            self.entries.append(entry)
+        
+        entry['rows'] = rows
+        if first is not None and (entry['first'] is None or
+                                  first.isoformat(sep=' ') < entry['first']):
+            entry['first'] = first.isoformat(sep=' ')
+        if last is not None:
+            entry['last'] = last.isoformat(sep=' ')
+        self.entries.sort(key=lambda item: (item['first'] or '', item['file'], item['sheet']))
+        
+        temp_file = f"{self.path}.tmp"
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump({'files': self.entries}, f, indent=2, ensure_ascii=False)
+        os.replace(temp_file, self.path)
+
+
+def save_workbook(workbook, filename):
+    """Çalışma kitabını geçici dosyaya yazıp atomik olarak yerine taşı
+    
+    Yazma sırasında elektrik kesilirse eski dosya bozulmaz. openpyxl ekleme
+    yapamaz; her çağrıda dosyanın tamamı yeniden yazılır, yani süre dosyadaki
+    satır sayısıyla büyür.
+    """
+    temp_file = f"{filename}.tmp"
+    try:
+        with open(temp_file, 'wb') as f:
+            workbook.save(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_file, filename)
+    except BaseException:
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
+        raise
+
+
+class ExcelWriter:
+    """Excel dosyası yazma sınıfı
+    
+    Çalışma kitabı bir kez açılıp bellekte tutulur. Yeni satırlar sayfanın
+    sonuna eklenir ve EXCEL_FLUSH_ROWS satırda bir, EXCEL_FLUSH_INTERVAL
+    saniyede bir veya close() çağrıldığında toplu olarak diske yazılır.
+    
+    EXCEL_ROTATE / EXCEL_ROTATE_ROWS ayarlandıysa okumalar gün, hafta veya
+    satır sayısına göre ayrı dosyalara (ya da sayfalara) yazılır; böylece
+    açık dosya ve her diske yazma küçük kalır. Döndürülen dosyalar
+    EXCEL_INDEX_FILE dizininde listelenir.
+    
+    Sınırlama: her diske yazma çalışma kitabının tamamını yeniden kaydeder
+    (O(satır sayısı)). EXCEL_FLUSH_ROWS bu maliyeti yalnızca satırlara yayar;
+    döndürme kapalıyken dosya büyüdükçe her yazma yavaşlar. Uzun süreli
+    kayıtta EXCEL_ROTATE veya EXCEL_ROTATE_ROWS ile dosya boyu sınırlanmalı
+    ya da STORAGE = 'sqlite' kullanılmalıdır.
+    """
+    
+    HEADERS = ['Tarih', 'Saat', 'Sayı', 'Güven (%)', 'Not']
+    REPEATED_NOTE = 'tekrar'
+    
+    def __init__(self, filename, sheet_name="Sayılar", rotation=None):
+        self.rotation = rotation or WorkbookRotation.from_config(filename, sheet_name)
+        self.index = WorkbookIndex(config.EXCEL_INDEX_FILE) if self.rotation.enabled else None
+        self.flush_rows = config.EXCEL_FLUSH_ROWS
+        self.flush_interval = config.EXCEL_FLUSH_INTERVAL
+        self.pending_rows = 0
+        self.last_flush = time.monotonic()
+        self.workbook = None
+        self.sheet = None
+        
+        # Döndürme durumu: güncel dönem, parça, satır sayısı, yazılan ilk/son okuma
+        self.period = None
+        self.part = 1
+        self.rows = 0
+        self.first_written = None
+        self.last_written = None
+        
+        if self.rotation.enabled:
+            # Hedef dosya ilk satırın zamanına göre açılır (toplu işlemde eski tarihler)
+            self.filename, self.sheet_name = self.rotation.target_for(
+                self.rotation.period_start(datetime.now()))
+        else:
+            self._switch(None, 1)
+    
+    def _switch(self, period, part):
+        """Dönem/parça için hedef dosyayı aç (dolu parçalar atlanır)"""
+        if self.workbook is not None:
+            self.close()
+        
+        while True:
+            self.filename, self.sheet_name = self.rotation.target_for(period, part)
+            self.pending_rows = 0
+            self._open_workbook()
+            if not self.rotation.is_full(self.rows):
+                break
+            self.workbook.close()
+            part += 1
+        
+        self.period = period
+        self.part = part
+        self.first_written = None
+        self.last_written = None
+        if self.rotation.enabled:
+            logging.info(f"Excel hedefi: {self.filename} [{self.sheet_name}]")
+    
+    def _rotate_if_needed(self, timestamp):
+        """Okuma yeni bir döneme aitse veya parça dolduysa sonraki hedefe geç"""
+        period = self.rotation.period_start(timestamp)
+        if self.workbook is None or period != self.period:
+            self._switch(period, 1)
+        elif self.rotation.is_full(self.rows):
+            self._switch(period, self.part + 1)
+    
+    def _open_workbook(self):
+        """Çalışma kitabını aç, yoksa veya bozuksa yenisini oluştur"""
+        from openpyxl import load_workbook, Workbook
+        self.workbook = None
+        temp_file = f"{self.filename}.tmp"
+        if os.path.exists(temp_file):
+            # Önceki çalışmadan yarım kalmış geçici dosya
+            logging.warning(f"Yarım kalmış geçici dosya silindi: {temp_file}")
+            os.remove(temp_file)
+        
+        if os.path.exists(self.filename) and config.APPEND_MODE:
+            try:
+                self.workbook = load_workbook(self.filename)
+            except Exception as e:
+                backup = f"{self.filename}.bozuk_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+                os.replace(self.filename, backup)
+                logging.warning(
+                    f"Excel dosyası okunamadı ({e}), yedeklendi: {backup}"
+                )
+                self.workbook = None
+        
+        if self.workbook is None:
+            self.workbook = Workbook()
+            self.workbook.remove(self.workbook.active)
+        
+        if self.sheet_name in self.workbook.sheetnames:
+            self.sheet = self.workbook[self.sheet_name]
+            if self.sheet.cell(row=1, column=len(self.HEADERS)).value is None:
+                # Eski sürümle oluşturulmuş sayfaya yeni sütun başlığını ekle
+                self.sheet.cell(row=1, column=len(self.HEADERS), value=self.HEADERS[-1])
+            self.rows = self.sheet.max_row - 1
+        else:
+            # Yeni sayfaya başlık satırı ekle
+            self.sheet = self.workbook.create_sheet(self.sheet_name)
+            self.sheet.append(self.HEADERS)
+            self.pending_rows += 1
+            self.rows = 0
+    
+    def write_data(self, number_text, confidence, timestamp=None, repeated=False):
+        """Veriyi Excel sayfasına ekle (diske toplu yazılır)"""
+        try:
+            if timestamp is None:
+                timestamp = datetime.now()
+            if self.rotation.enabled:
+                self._rotate_if_needed(timestamp)
+            
+            with metrics.timer('excel_write'):
+                # Veri satırı oluştur
+                row = [
+                    timestamp.strftime('%Y-%m-%d'),
+                    timestamp.strftime('%H:%M:%S'),
+                    number_text,
+                    round(confidence, 2)
+                ]
+                if repeated:
+                    row.append(self.REPEATED_NOTE)
+                self.sheet.append(row)
+                self.pending_rows += 1
+                self.rows += 1
+                self.first_written = self.first_written or timestamp
+                self.last_written = timestamp
+            logging.debug(f"Satır Excel kuyruğuna eklendi ({self.pending_rows} bekliyor)")
+        
+        except Exception as e:
+            metrics.increment('errors', stage='excel')
+            logging.error(f"Excel yazma hatası: {e}")
+            raise
+        
+        self.flush_if_due()
+        return True
+    
+    def flush_if_due(self):
+        """Satır veya süre eşiği aşıldıysa bekleyen satırları diske yaz"""
+        if not self.pending_rows:
+            return
+        if (self.pending_rows >= self.flush_rows or
+                time.monotonic() - self.last_flush >= self.flush_interval):
+            self.flush()
+    
+    def flush(self):
+        """Bekleyen satırları diske yaz
+        
+        Dosya önce geçici bir dosyaya yazılır, ardından atomik olarak yerine
+        taşınır; böylece yazma sırasında elektrik kesilirse eski dosya bozulmaz.
+        Bekleyen satır sayısından bağımsız olarak dosyanın tamamı yazılır.
+        """
+        if not self.pending_rows:
+            return
+        
+        try:
+            with metrics.timer('excel_flush'):
+                save_workbook(self.workbook, self.filename)
+            if self.index is not None:
+                self.index.update(self.filename, self.sheet_name, self.rows,
+                                  self.first_written, self.last_written)
+            
+            logging.info(f"{self.pending_rows} satır Excel'e yazıldı: {self.filename}")
+            self.pending_rows = 0
+            self.last_flush = time.monotonic()
+        
+        except Exception as e:
+            metrics.increment('errors', stage='excel')
+            logging.error(f"Excel yazma hatası: {e}")
+            raise
+    
+    def close(self):
+        """Bekleyen satırları yaz ve çalışma kitabını kapat"""
+        if self.workbook is None:
+            return
+        self.flush()
+        self.workbook.close()
+        self.workbook = None
+
+
+class ReadingStore:
+    """Okumaları SQLite veritabanına kaydeden sınıf
+    
+    ExcelWriter ile aynı arayüzü sunar. Veritabanı WAL modunda açılır ve
+    satırlar DB_COMMIT_ROWS satırda bir veya DB_COMMIT_INTERVAL saniyede bir
+    tek bir işlemle (transaction) kaydedilir. Elektrik kesilirse veritabanı
+    bozulmaz, en fazla son işlemdeki satırlar kaybolur. Excel dosyası bu
+    veritabanından export_excel ile üretilir.
+    """
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS readings (
+            id INTEGER PRIMARY KEY,
+            timestamp TEXT NOT NULL,
+            number TEXT NOT NULL,
+            confidence REAL NOT NULL,
+            note TEXT,
+            source TEXT
+        );
+        CREATE INDEX IF NOT EXISTS readings_timestamp ON readings (timestamp);
+    """
+    
+    def __init__(self, path):
+        self.path = path
+        self.flush_rows = config.DB_COMMIT_ROWS
+        self.flush_interval = config.DB_COMMIT_INTERVAL
+        self.pending_rows = 0
+        self.last_flush = time.monotonic()
+        self.connection = connect_store(path)
+    
+    def import_excel(self, filename, sheet_name="Sayılar"):
+        """Veritabanı boşsa eski sürümün yazdığı Excel dosyasındaki satırları aktar
+        
+        Böylece Excel veritabanından yeniden üretildiğinde geçmiş kaybolmaz.
+        
+        Returns:
+            int: Aktarılan satır sayısı
+        """
+        if self.connection.execute("SELECT 1 FROM readings LIMIT 1").fetchone():
+            return 0
+        
+        from openpyxl import load_workbook
+        workbook = load_workbook(filename, read_only=True)
+        try:
+            if sheet_name not in workbook.sheetnames:
+                return 0
+            rows = 0
+            for row in workbook[sheet_name].iter_rows(min_row=2, values_only=True):
+                date, clock, number, confidence = (tuple(row) + (None,) * 4)[:4]
+                if not date or number is None:
+                    continue
+                note = row[4] if len(row) > 4 else None
+                self.connection.execute(
+                    "INSERT INTO readings (timestamp, number, confidence, note) "
+                    "VALUES (?, ?, ?, ?)",
+                    (f"{date} {clock or '00:00:00'}", str(number), confidence or 0, note)
+                )
+                rows += 1
+            self.connection.commit()
+        finally:
+            workbook.close()
+        
+        logging.info(f"{rows} satır Excel dosyasından veritabanına aktarıldı: {filename}")
+        return rows
+    
+    def for_source(self, source):
+        """Okumaları verilen kaynak adıyla kaydeden yazıcı döndür"""
+        return SourceWriter(self, source)
+    
+    def write_data(self, number_text, confidence, timestamp=None, repeated=False, source=None):
+        """Okumayı açık işleme ekle (toplu olarak kaydedilir)"""
+        try:
+            if timestamp is None:
+                timestamp = datetime.now()
+            
+            with metrics.timer('db_write'):
+                self.connection.execute(
+                    "INSERT INTO readings (timestamp, number, confidence, note, source) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (timestamp.isoformat(sep=' '), number_text, round(confidence, 2),
+                     ExcelWriter.REPEATED_NOTE if repeated else None, source)
+                )
+                self.pending_rows += 1
+            logging.debug(f"Satır veritabanı işlemine eklendi ({self.pending_rows} bekliyor)")
+        
+        except Exception as e:
+            metrics.increment('errors', stage='db')
+            logging.error(f"Veritabanı yazma hatası: {e}")
+            raise
+        
+        self.flush_if_due()
+        return True
+    
+    def flush_if_due(self):
+        """Satır veya süre eşiği aşıldıysa açık işlemi kaydet"""
+        if not self.pending_rows:
+            return
+        if (self.pending_rows >= self.flush_rows or
+                time.monotonic() - self.last_flush >= self.flush_interval):
+            self.flush()
+    
+    def flush(self):
+        """Açık işlemi diske kaydet (commit)"""
+        if not self.pending_rows:
+            return
+        
+        try:
+            with metrics.timer('db_commit'):
+                self.connection.commit()
+            logging.info(f"{self.pending_rows} satır veritabanına kaydedildi: {self.path}")
+            self.pending_rows = 0
+            self.last_flush = time.monotonic()
+        
+        except Exception as e:
+            metrics.increment('errors', stage='db')
+            logging.error(f"Veritabanı yazma hatası: {e}")
+            raise
+    
+    def close(self):
+        """Bekleyen satırları kaydet ve bağlantıyı kapat"""
+        self.flush()
+        self.connection.close()
+
+
+class SourceWriter:
+    """Ortak ReadingStore'a tek bir kaynağın (kameranın) okumalarını yazan sınıf
+    
+    ExcelWriter arayüzünü sunar; işlem (commit) zamanlaması ortak depoya aittir.
+    """
+    
+    def __init__(self, store, source):
+        self.store = store
+        self.source = source
+    
+    @property
+    def pending_rows(self):
+        return self.store.pending_rows
+    
+    def write_data(self, number_text, confidence, timestamp=None, repeated=False):
+        return self.store.write_data(number_text, confidence, timestamp, repeated, self.source)
+    
+    def flush_if_due(self):
+        self.store.flush_if_due()
+    
+    def flush(self):
+        self.store.flush()
+    
+    def close(self):
+        """Ortak depo açık kalır; yalnızca bekleyen satırlar kaydedilir"""
+        self.store.flush()
+
+
+def connect_store(path):
+    """Okuma veritabanını WAL modunda aç, tablo yoksa oluştur"""
+    connection = sqlite3.connect(path)
+    connection.execute("PRAGMA journal_mode=WAL")
+    # WAL'da FULL: kaydedilen (commit) her işlem elektrik kesintisinden sonra da durur
+    connection.execute("PRAGMA synchronous=FULL")
+    connection.executescript(ReadingStore.SCHEMA)
+    columns = [row[1] for row in connection.execute("PRAGMA table_info(readings)")]
+    if 'source' not in columns:
+        # Tek kameralı sürümle oluşturulmuş veritabanı
+        connection.execute("ALTER TABLE readings ADD COLUMN source TEXT")
+        connection.commit()
+    return connection
+
+
+def foreign_sheets(filename, sheet_names, rotation=None):
+    """Dosyadaki okuma sayfası olmayan (kullanıcının eklediği) sayfalar
+    
+    sheet_names okumaların yazıldığı temel sayfa adlarıdır; sayfa döndürmede
+    bunlardan türetilen '<ad>_<dönem>' sayfaları da okuma sayfası sayılır.
+    """
+    if not os.path.exists(filename):
+        return []
+    from openpyxl import load_workbook
+    workbook = load_workbook(filename, read_only=True)
+    try:
+        names = workbook.sheetnames
+    finally:
+        workbook.close()
+    rotated = rotation is not None and rotation.enabled and rotation.target == 'sheet'
+    return [
+        name for name in names
+        if name not in sheet_names
+        and not (rotated and any(name.startswith(f"{base}_") for base in sheet_names))
+    ]
+
+
+def check_foreign_sheets(filename, sheet_names, rotation=None):
+    """Dosyada başka sayfalar varsa yeniden üretmeyi reddet
+    
+    Veritabanından üretilen dosya yalnızca okuma sayfalarını içerir; üzerine
+    yazmak kullanıcının eklediği sayfaları silerdi.
+    
+    Raises:
+        Exception: Dosyada okuma sayfası olmayan sayfalar varsa
+    """
+    foreign = foreign_sheets(filename, sheet_names, rotation)
+    if foreign:
+        raise Exception(
+            f"{filename} okuma dışı sayfalar içeriyor ({', '.join(foreign)}), üzerine "
+            f"yazılmadı; EXCEL_FILE için ayrı bir dosya seçin veya STORAGE = 'excel' kullanın"
+        )
+
+
+def export_excel(db_path, filename, sheet_name="Sayılar", start=None, rotation=None,
+                 index=None, part=1, sheets=None):
+    """Veritabanındaki okumaları Excel dosyasına aktar
+    
+    Satırlar openpyxl'in yalnızca yazma (write-only) modunda akıtılır; geçmiş
+    ne kadar uzun olursa olsun bellek kullanımı sabit kalır. Dosyalar geçici
+    bir dosyaya yazılıp atomik olarak yerine taşınır. rotation verilirse
+    okumalar WorkbookRotation kuralına göre birden fazla dosyaya/sayfaya
+    bölünür ve index güncellenir. Her kaynağın (kameranın) okumaları kendi
+    sayfasına yazılır.
+    
+    Args:
+        start: Verilirse yalnızca bu zamandan sonraki okumalar aktarılır
+        part: start'taki okumanın ait olduğu parça numarası
+        sheets: Kaynak adı -> sayfa adı (kaynaksız okumalar sheet_name'e)
+    
+    Returns:
+        list: Her dosya parçası için {'file', 'part', 'rows', 'first', 'last',
+            'sheets'} sözlükleri; 'sheets' sayfa adı -> {'rows', 'first', 'last'}
+    """
+    if not os.path.exists(db_path):
+        raise Exception(f"Veritabanı bulunamadı: {db_path}")
+    rotation = rotation or WorkbookRotation(filename, sheet_name)
+    
+    from openpyxl import Workbook
+    connection = connect_store(db_path)
+    segments = []
+    workbook = None
+    current_file = None
+    
+    sheets = sheets or {}
+    base_sheets = {sheet_name, *sheets.values()}
+    
+    def finish_file():
+        save_workbook(workbook, current_file)
+        if index is not None:
+            for segment in segments:
+                if segment['file'] != current_file:
+                    continue
+                for name, sheet_info in segment['sheets'].items():
+                    index.update(segment['file'], name, sheet_info['rows'],
+                                 sheet_info['first'], sheet_info['last'])
+    
+    try:
+        with metrics.timer('excel_export'):
+            cursor = connection.execute(
+                "SELECT timestamp, number, confidence, note, source FROM readings "
+                "WHERE timestamp >= ? ORDER BY timestamp, id",
+                (start.isoformat(sep=' ') if start else '',)
+            )
+            segment = None
+            open_sheets = {}
+            for timestamp, number, confidence, note, source in cursor:
+                read_at = datetime.fromisoformat(timestamp)
+                period = rotation.period_start(read_at)
+                if (segment is None or period != segment['period']
+                        or rotation.is_full(segment['rows'])):
+                    if segment is None:
+                        next_part = part
+                    elif period != segment['period']:
+                        next_part = 1
+                    else:
+                        next_part = segment['part'] + 1
+                    target_file = rotation.target_for(period, next_part)[0]
+                    if target_file != current_file:
+                        if workbook is not None:
+                            finish_file()
+                        check_foreign_sheets(target_file, base_sheets, rotation)
+                        workbook = Workbook(write_only=True)
+                        current_file = target_file
+                    segment = {'file': target_file, 'period': period, 'part': next_part,
+                               'rows': 0, 'first': read_at, 'last': None, 'sheets': {}}
+                    segments.append(segment)
+                    open_sheets = {}
+                
+                # Kaynağın sayfası bu parçada ilk kez kullanılıyorsa oluştur
+                if source not in open_sheets:
+                    base_sheet = sheets.get(source, sheet_name)
+                    target_sheet = rotation.target_for(period, segment['part'], base_sheet)[1]
+                    # Aynı sayfaya yazan başka bir kaynak varsa o sayfayı paylaş
+                    for other in open_sheets.values():
+                        if other[2] == target_sheet:
+                            open_sheets[source] = other
+                            break
+                    else:
+                        sheet = workbook.create_sheet(target_sheet)
+                        sheet.append(ExcelWriter.HEADERS)
+                        segment['sheets'][target_sheet] = {'rows': 0, 'first': read_at,
+                                                           'last': None}
+                        open_sheets[source] = (sheet, segment['sheets'][target_sheet],
+                                               target_sheet)
+                sheet, sheet_info, _ = open_sheets[source]
+                
+                date, _, clock = timestamp.partition(' ')
+                sheet.append([date, clock[:8], number, confidence, note])
+                segment['rows'] += 1
+                segment['last'] = read_at
+                sheet_info['rows'] += 1
+                sheet_info['last'] = read_at
+            
+            if workbook is None and not rotation.enabled:
+                # Boş veritabanı: yalnızca başlık satırı
+                check_foreign_sheets(filename, base_sheets)
+                workbook = Workbook(write_only=True)
+                workbook.create_sheet(sheet_name).append(ExcelWriter.HEADERS)
+                current_file = filename
+            if workbook is not None:
+                finish_file()
+    except Exception as e:
+        metrics.increment('errors', stage='excel')
+        logging.error(f"Excel aktarma hatası: {e}")
+        raise
+    finally:
+        connection.close()
+    
+    rows = sum(segment['rows'] for segment in segments)
+    logging.info(f"{rows} satır Excel'e aktarıldı: "
+                 f"{', '.join(sorted({segment['file'] for segment in segments})) or filename}")
+    return segments
+
+
+class ExcelExporter:
+    """Excel dosyasını veritabanından arka planda periyodik olarak yeniden üreten sınıf
+    
+    Son aktarımdan bu yana yeni okuma yoksa dosya yeniden yazılmaz. Dosya
+    döndürme açıksa yalnızca güncel dosya yeniden üretilir; tamamlanmış
+    dönemlerin dosyalarına bir daha dokunulmaz. Tek çekim modunda (cron)
+    çıkıştaki aktarım, son aktarımın üzerinden interval geçmediyse atlanır;
+    okumalar veritabanında kalır ve sonraki aktarıma girer.
+    """
+    
+    def __init__(self, db_path, filename, sheet_name="Sayılar", interval=60, start=None,
+                 rotation=None, sheets=None):
+        self.db_path = db_path
+        self.filename = filename
+        self.sheet_name = sheet_name
+        self.sheets = sheets
+        self.interval = interval
+        self.start = start
+        self.part = 1
+        self.rotation = rotation or WorkbookRotation.from_config(filename, sheet_name)
+        self.index = WorkbookIndex(config.EXCEL_INDEX_FILE) if self.rotation.enabled else None
+        self.last_id = None
+        self._stop_event = threading.Event()
+        self._thread = None
+    
+    def last_export_age(self):
+        """Son aktarımdan bu yana geçen süre (saniye); hiç aktarılmadıysa None
+        
+        Dosya döndürmede her aktarımda güncellenen dizin dosyasına bakılır.
+        """
+        path = self.index.path if self.index is not None else self.filename
+        try:
+            return time.time() - os.path.getmtime(path)
+        except OSError:
+            return None
+    
+    def export_if_changed(self):
+        """Yeni okuma varsa Excel dosyasını yeniden üret"""
+        connection = connect_store(self.db_path)
+        try:
+            last_id = connection.execute("SELECT MAX(id) FROM readings").fetchone()[0]
+        finally:
+            connection.close()
+        if last_id == self.last_id and (self.rotation.enabled or
+                                        os.path.exists(self.filename)):
+            return
+        try:
+            segments = export_excel(self.db_path, self.filename, self.sheet_name, self.start,
+                                    self.rotation, self.index, self.part, self.sheets)
+            self.last_id = last_id
+            if segments and self.rotation.enabled and self.rotation.target == 'file':
+                # Sonraki aktarım güncel dosyanın ilk okumasından başlar
+                self.start = segments[-1]['first']
+                self.part = segments[-1]['part']
+        except Exception as e:
+            print(f"✗ Excel dosyası güncellenemedi: {e}")
+    
+    def start_exporter(self):
+        """Periyodik aktarımı başlat (interval 0 ise yalnızca durdurulurken aktarılır)"""
+        def export_loop():
+            while not self._stop_event.wait(self.interval):
+                self.export_if_changed()
+        
+        if self.interval > 0:
+            self._thread = threading.Thread(target=export_loop, name="excel-export",
+                                            daemon=True)
+            self._thread.start()
+            logging.info(f"Excel dosyası {self.interval} saniyede bir güncellenecek: "
+                         f"{self.filename}")
+    
+    def stop_exporter(self, force=True):
+        """Periyodik aktarımı durdur ve son durumu aktar
+        
+        force False ise (tek çekim) son aktarım interval saniyeden yeniyse
+        tüm geçmiş her çalıştırmada yeniden yazılmaz.
+        """
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if not force:
+            age = self.last_export_age()
+            if age is not None and age < self.interval:
+                logging.info(f"Excel aktarımı atlandı (son aktarım {age:.0f} saniye önce): "
+                             f"{self.filename}")
+                return
+        self.export_if_changed()
@@ -0,0 +1,1271 @@
+#!/usr/bin/env python3
+"""
+Mantık testleri - Capture Numbers uygulaması için
+Kamera ve Tesseract olmadan yapay girdilerle çalışır:
+
+    python3 -m pytest test_logic.py
+    python3 test_logic.py
+"""
+
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+from types import ModuleType, SimpleNamespace
+from unittest import mock
+
+import cv2
+import numpy as np
+from openpyxl import load_workbook
+
+import capture_numbers
+from capture_numbers import (CameraCapture, CapturePipeline, CaptureScheduler, CaptureSource,
+                             ChangeDetector, ExcelWriter, FairFrameQueue, FrameArchive,
+                             FrameArchiveReader, FrameGrabber, FrameReader, ImageArchiver,
+                             ImageProcessor, Metrics, PreprocessPipeline, ReadingService,
+                             ReadingStore, ReplayFeed, ReplayFinished, RoiLocator,
+                             SevenSegmentEngine, TesserocrEngine, WorkbookRotation, apply_config,
+                             archive_source_name, check_foreign_sheets, export_excel,
+                             image_sources, iter_image_dir, load_batch_state, majority_vote,
+                             retry_call, run_batch, unique_image_path)
+
+
+def reading(text, confidence=90):
+    """extract_numbers biçiminde yapay OCR sonucu"""
+    return {'text': text, 'confidence': confidence, 'words': [], 'processed_image': None}
+
+
+def brightness_ocr(image, preprocess=None):
+    """Tesseract yerine görüntünün ortalama parlaklığını okuyan sahte OCR"""
+    return reading(str(int(round(image.mean()))))
+
+
+def draw_seven_segment(text, height=60, width=30, thickness=6, gap=14):
+    """Koyu rakamlı, açık zeminli yapay yedi parçalı gösterge görüntüsü çiz"""
+    patterns = dict(reversed(SevenSegmentEngine.PATTERNS))
+    half = height // 2
+    image = np.full((height + 40, 20 + len(text) * (width + gap)), 255, dtype=np.uint8)
+    x, y = 20, 20
+    for char in text:
+        if char == '.':
+            # Ondalık nokta: satırın altında küçük kare
+            image[y + height - thickness:y + height, x:x + thickness] = 0
+            x += thickness + gap
+            continue
+        segments = {
+            'a': (x, y, x + width, y + thickness),
+            'b': (x + width - thickness, y, x + width, y + half),
+            'c': (x + width - thickness, y + half, x + width, y + height),
+            'd': (x, y + height - thickness, x + width, y + height),
+            'e': (x, y + half, x + thickness, y + height),
+            'f': (x, y, x + thickness, y + half),
+            'g': (x, y + half - thickness // 2, x + width, y + half + thickness // 2),
+        }
+        for name, bit in zip('abcdefg', patterns[char]):
+            if bit == '1':
+                left, top, right, bottom = segments[name]
+                image[top:bottom, left:right] = 0
+        x += width + gap
+    return image
+
+
+def test_seven_segment_recognize():
+    """Yedi parçalı tanıyıcı çizilen tüm rakamları okumalı"""
+    engine = SevenSegmentEngine()
+    for text in ("0123456789", "2580", "17"):
+        recognized, chars = engine.recognize(draw_seven_segment(text))
+        assert recognized == text, (text, recognized)
+        assert len(chars) == len(text)
+    
+    # Boş görüntüde metin yok
+    assert engine.recognize(np.full((50, 100), 255, dtype=np.uint8))[0] == ''
+
+
+def test_seven_segment_dot_and_inverted():
+    """Ondalık nokta okunmalı; açık rakam/koyu zemin (LED) de tanınmalı"""
+    engine = SevenSegmentEngine()
+    assert engine.recognize(draw_seven_segment("12.5"))[0] == "12.5"
+    assert engine.recognize(255 - draw_seven_segment("908"))[0] == "908"
+
+
+def test_seven_segment_slant():
+    """Eğik (italik) rakamlar slant ayarıyla düzeltilip okunmalı"""
+    image = cv2.copyMakeBorder(draw_seven_segment("2468"), 0, 0, 0, 30,
+                               cv2.BORDER_CONSTANT, value=255)
+    height, width = image.shape
+    shear = np.tan(np.radians(12))
+    # Üst satırlar sağa kayar, alt satırlar yerinde kalır
+    slanted = cv2.warpAffine(image, np.float32([[1, -shear, shear * height], [0, 1, 0]]),
+                             (width, height), borderValue=255)
+    assert SevenSegmentEngine(slant=12).recognize(slanted)[0] == "2468"
+
+
+def write_images(directory, values, prefix="original", start=datetime(2026, 10, 18, 12, 0, 0)):
+    """Her değer için o parlaklıkta, adında çekim zamanı olan bir görüntü kaydet"""
+    for i, value in enumerate(values):
+        timestamp = start + timedelta(seconds=i)
+        name = f"{prefix}_{timestamp:%Y%m%d_%H%M%S}_000000.png"
+        cv2.imwrite(os.path.join(directory, name), np.full((20, 20, 3), value, np.uint8))
+
+
+def sheet_values(filename, sheet_name="Sayılar"):
+    """Çalışma kitabındaki okunan sayılar (başlık satırı hariç)"""
+    sheet = load_workbook(filename)[sheet_name]
+    return [row[2] for row in sheet.iter_rows(min_row=2, values_only=True)]
+
+
+def test_batch_resume():
+    """Yarıda kalan toplu işlem, satırları tekrarlamadan kaldığı yerden sürmeli"""
+    values = [10 * (i + 1) for i in range(7)]
+    
+    def interrupted(items, after):
+        for count, item in enumerate(items):
+            if count == after:
+                raise KeyboardInterrupt
+            yield item
+    
+    # İşçi süreçler fork ile açıldığından yamalar onlara da geçer
+    with tempfile.TemporaryDirectory() as directory, \
+            mock.patch.object(ImageProcessor, 'extract_numbers', staticmethod(brightness_ocr)), \
+            mock.patch.multiple(capture_numbers.config, ROI=None, ROI_AUTO_DETECT=False,
+                                EXCEL_FLUSH_ROWS=2):
+        images = os.path.join(directory, "images")
+        os.mkdir(images)
+        write_images(images, values)
+        output = os.path.join(directory, "batch.xlsx")
+        state_file = f"{output}.batch.json"
+        
+        writer = ExcelWriter(output, "Sayılar")
+        try:
+            run_batch(interrupted(iter_image_dir(images), 5), writer, state_file, images,
+                      workers=2)
+            assert False, "KeyboardInterrupt bekleniyordu"
+        except KeyboardInterrupt:
+            pass
+        finally:
+            writer.close()
+        
+        skip = load_batch_state(state_file, images)
+        assert 0 < skip <= 5
+        assert sheet_values(output) == [str(value) for value in values[:skip]]
+        # Başka bir kaynağın ilerlemesi kullanılmaz
+        assert load_batch_state(state_file, directory) == 0
+        
+        writer = ExcelWriter(output, "Sayılar")
+        try:
+            run_batch(iter_image_dir(images, skip), writer, state_file, images, workers=2)
+        finally:
+            writer.close()
+        
+        assert not os.path.exists(state_file)
+        assert sheet_values(output) == [str(value) for value in values]
+
+
+def test_iter_image_dir_order():
+    """Toplu işlem görüntüleri çekim zamanı sırasıyla almalı, işlenmişleri atlamalı"""
+    with tempfile.TemporaryDirectory() as directory:
+        write_images(directory, [30, 10, 20], start=datetime(2026, 10, 18, 12, 0, 5))
+        write_images(directory, [40], start=datetime(2026, 10, 18, 12, 0, 0))
+        write_images(directory, [99], prefix="processed")
+        items = list(iter_image_dir(directory))
+        assert [index for index, _, _ in items] == [0, 1, 2, 3]
+        assert [int(cv2.imread(path).mean()) for _, _, path in items] == [40, 30, 10, 20]
+        assert items[0][1] == datetime(2026, 10, 18, 12, 0, 0)
+        # skip ile baştaki öğeler atlanır, sıra numaraları korunur
+        assert [index for index, _, _ in iter_image_dir(directory, 2)] == [2, 3]
+
+
+def test_workbook_rotation_target():
+    """Döndürme hedefi dönem ve parçaya göre adlandırılmalı"""
+    day = datetime(2026, 10, 18, 15, 30)
+    rotation = WorkbookRotation("readings.xlsx", "Sayılar", period='day')
+    assert rotation.period_start(day) == datetime(2026, 10, 18)
+    assert rotation.target_for(day) == ("readings_2026-10-18.xlsx", "Sayılar")
+    assert rotation.target_for(day, 2) == ("readings_2026-10-18_2.xlsx", "Sayılar")
+    assert rotation.target_for(day, sheet_name="Giriş") == ("readings_2026-10-18.xlsx", "Giriş")
+    
+    week = WorkbookRotation("readings.xlsx", "Sayılar", period='week')
+    # Hafta pazartesi başlar
+    assert week.period_start(day) == datetime(2026, 10, 12)
+    assert week.target_for(week.period_start(day)) == ("readings_2026-W42.xlsx", "Sayılar")
+    
+    sheets = WorkbookRotation("readings.xlsx", "Sayılar", period='day', target='sheet')
+    assert sheets.target_for(day, 3) == ("readings.xlsx", "Sayılar_2026-10-18_3")
+    
+    rows = WorkbookRotation("ocr_%Y.xlsx", "Sayılar", max_rows=100)
+    assert rows.period_start(day) is None
+    assert rows.target_for(None, 2) == ("ocr_%Y_2.xlsx", "Sayılar")
+    assert not rows.is_full(99) and rows.is_full(100)
+    
+    disabled = WorkbookRotation("readings.xlsx", "Sayılar")
+    assert not disabled.enabled
+    assert disabled.target_for(day, 5) == ("readings.xlsx", "Sayılar")
+
+
+def test_excel_writer_rotation():
+    """ExcelWriter dolan parçada ve yeni günde sonraki dosyaya geçip dizini güncellemeli"""
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "readings.xlsx")
+        index_file = os.path.join(directory, "index.json")
+        with mock.patch.multiple(capture_numbers.config, EXCEL_ROTATE='day', EXCEL_ROTATE_ROWS=2,
+                                 EXCEL_ROTATE_TARGET='file', EXCEL_INDEX_FILE=index_file,
+                                 EXCEL_FLUSH_ROWS=100):
+            writer = ExcelWriter(filename, "Sayılar")
+            start = datetime(2026, 10, 18, 23, 59, 0)
+            for i, value in enumerate(["1", "2", "3", "4"]):
+                writer.write_data(value, 90, start + timedelta(seconds=20 * i))
+            writer.close()
+        
+        base = os.path.join(directory, "readings")
+        assert sheet_values(f"{base}_2026-10-18.xlsx") == ["1", "2"]
+        assert sheet_values(f"{base}_2026-10-18_2.xlsx") == ["3"]
+        assert sheet_values(f"{base}_2026-10-19.xlsx") == ["4"]
+        
+        with open(index_file, encoding='utf-8') as f:
+            entries = json.load(f)['files']
+        assert [(os.path.basename(entry['file']), entry['rows']) for entry in entries] == [
+            ("readings_2026-10-18.xlsx", 2), ("readings_2026-10-18_2.xlsx", 1),
+            ("readings_2026-10-19.xlsx", 1)]
+        assert entries[0]['first'] == "2026-10-18 23:59:00"
+
+
+def test_fair_frame_queue():
+    """Kaynaklar sırayla alınmalı, dolan kuyrukta en eski kare atılmalı"""
+    frames = FairFrameQueue(2)
+    assert frames.put('a', 'a1') is None
+    assert frames.put('a', 'a2') is None
+    assert frames.put('a', 'a3') == 'a1'
+    assert frames.put('b', 'b1') is None
+    
+    assert [frames.get() for _ in range(3)] == ['a2', 'b1', 'a3']
+    
+    frames.close()
+    assert frames.get() is None
+
+
+def test_fair_frame_queue_block():
+    """block=True ile dolu kuyruk kare atmadan yer açılmasını beklemeli"""
+    frames = FairFrameQueue(1)
+    frames.put('a', 'a1')
+    results = []
+    producer = threading.Thread(target=lambda: results.append(frames.put('a', 'a2', block=True)))
+    producer.start()
+    producer.join(0.1)
+    assert producer.is_alive()
+    
+    assert frames.get() == 'a1'
+    producer.join(1)
+    assert results == [None]
+    assert frames.get() == 'a2'
+
+
+def test_archive_source_name():
+    """Orijinal görüntü adlarından kamera adı çıkarılmalı"""
+    assert archive_source_name("original_20261018_120000_000000") is None
+    assert archive_source_name("original_20261018_120000_000000_2") is None
+    assert archive_source_name("original_giris_20261018_120000_000000") == "giris"
+    assert archive_source_name("original_hat_1_20261018_120000_000000_3") == "hat_1"
+    assert archive_source_name("processed_20261018_120000_000000") is False
+    assert archive_source_name("foto") is False
+
+
+def test_batch_per_camera():
+    """Çoklu kamera klasöründe her kameranın görüntüleri ayrı işlenmeli"""
+    with tempfile.TemporaryDirectory() as directory:
+        write_images(directory, [10, 20], prefix="original_giris")
+        write_images(directory, [30], prefix="original_hat_1")
+        write_images(directory, [40])
+        assert image_sources(directory) == [None, "giris", "hat_1"]
+        
+        def values(name):
+            return [int(cv2.imread(path).mean()) for _, _, path in iter_image_dir(directory, 0, name)]
+        assert values("giris") == [10, 20]
+        assert values("hat_1") == [30]
+        assert values(None) == [40]
+
+
+def test_scheduler_grid():
+    """Hizalı çekim anları yerel saatte aralığın katlarına düşmeli"""
+    scheduler = CaptureScheduler(60, align=True)
+    moment = time.time()
+    following = scheduler._grid_after(moment)
+    offset = time.localtime(following).tm_gmtoff
+    assert moment < following <= moment + 60
+    assert round(following + offset) % 60 == 0
+    # Izgaradaki an inclusive ile kendisi, değilse bir sonraki
+    assert scheduler._grid_after(following, inclusive=True) == following
+    assert scheduler._grid_after(following) == following + 60
+    
+    # Hizalama kapalıysa an değişmez
+    assert CaptureScheduler(60, align=False)._grid_after(moment) == moment
+
+
+def test_scheduler_missed_deadline():
+    """Yarım aralıktan fazla geçilen çekim anları atlanıp sayılmalı, plan kaymamalı"""
+    scheduler = CaptureScheduler(0.2, align=False)
+    scheduler.deadline = time.time() - 0.5
+    planned = scheduler.wait()
+    # 0.5 sn gecikme: geçmiş anlar (-0.5, -0.3, -0.1) atlanır, çekim hemen yapılır
+    assert scheduler.missed == 3
+    assert abs(planned.timestamp() - time.time()) < 0.1
+    # Sonraki an işlem süresinden bağımsız, bir aralık sonrası
+    assert abs(scheduler.deadline - planned.timestamp() - 0.2) < 1e-6
+    
+    stop = threading.Event()
+    stop.set()
+    assert scheduler.wait(stop) is None
+
+
+def test_scheduler_observe():
+    """Değişmeyen okumalarda aralık ikiye katlanmalı, değişince sıfırlanmalı"""
+    scheduler = CaptureScheduler(10, align=False, max_interval=40, stable_reads=2)
+    intervals = []
+    for text in ("5", "5", "5", "5", "5", "5", "5", "6"):
+        scheduler.observe(reading(text))
+        intervals.append(scheduler.interval)
+    assert intervals == [10, 10, 20, 20, 40, 40, 40, 10]
+    
+    # Boş okuma aralığı değiştirmez
+    scheduler.observe(reading(""))
+    scheduler.observe(None)
+    assert scheduler.interval == 10
+
+
+def test_scheduler_without_interval():
+    """Aralık yoksa çekimler beklemeden yapılmalı ve planlanan an bildirilmemeli"""
+    scheduler = CaptureScheduler(0)
+    assert scheduler.next_time() is None
+    started = time.monotonic()
+    assert all(scheduler.wait() for _ in range(3))
+    assert time.monotonic() - started < 0.1
+    assert CaptureScheduler(5, align=False).next_time() is not None
+
+
+def test_majority_vote():
+    """Çoğunluk oyu karakter bazında ve çoğunluğun uzunluğunda yapılmalı"""
+    result = majority_vote([reading("1234", 80), reading("1284", 70),
+                            reading("1234", 60), reading("12345", 95)])
+    assert result['text'] == "1234"
+    # Ortalama güven (70) x ortalama oy payı ((1 + 1 + 2/3 + 1) / 4)
+    assert abs(result['confidence'] - 70 * (11 / 12)) < 1e-6
+    
+    # Eşitlikte güveni yüksek okumalar kazanır
+    assert majority_vote([reading("12", 90), reading("17", 40)])['text'] == "12"
+    
+    # Hiç metin yoksa en güvenli sonuç döndürülür
+    assert majority_vote([reading("", 10), reading(" ", 30)])['confidence'] == 30
+
+
+def test_burst_early_exit():
+    """Seri çekim iki okuma uyuşunca durmalı, kalan kareleri hiç yakalamamalı"""
+    texts = {10: "1234", 20: "1284", 30: "1234", 40: "1234"}
+    
+    def burst_ocr(image, preprocess=None):
+        value = int(round(image.mean()))
+        return reading(texts.get(value, str(value)), 40 if value >= 100 else 90)
+    
+    def frames(values, pulled):
+        for value in values:
+            pulled.append(value)
+            yield np.full((10, 10, 3), value, np.uint8)
+    
+    with mock.patch.object(ImageProcessor, 'extract_numbers', staticmethod(burst_ocr)), \
+            mock.patch.multiple(capture_numbers.config, ROI=None, ROI_AUTO_DETECT=False,
+                                SKIP_UNCHANGED=False, RESIZE_FACTOR=1.0, BURST_FRAMES=5,
+                                BURST_WORKERS=1, MIN_CONFIDENCE=60):
+        reader = FrameReader()
+        first = np.full((10, 10, 3), 10, np.uint8)
+        
+        # 10 ve 20 uyuşmaz, 30 ilkiyle uyuşur: 40 hiç yakalanmaz
+        pulled = []
+        result = reader.read(first, frames([20, 30, 40], pulled))
+        assert result['text'] == "1234" and result['burst_reads'] == 3
+        assert pulled == [20, 30]
+        
+        # Güveni düşük okumalar uyuşma sayılmaz; tüm kareler okunup oylanır
+        pulled = []
+        result = reader.read(np.full((10, 10, 3), 101, np.uint8), frames([101, 111], pulled))
+        assert pulled == [101, 111] and result['burst_reads'] == 3
+        assert result['text'] == "101"
+
+
+class CountingCamera:
+    """Her yakalamada artan sayıyı kare olarak veren sahte kamera"""
+    
+    def __init__(self):
+        self.captures = 0
+    
+    def capture_frame(self, new_frame=False):
+        self.captures += 1
+        return self.captures, datetime.now()
+
+
+def test_pipeline_burst_is_lazy():
+    """İşlem hattında seri çekim kareleri istendikçe alınmalı, eskiyince durmalı"""
+    camera = CountingCamera()
+    source = SimpleNamespace(camera=camera, captured=0)
+    with mock.patch.object(capture_numbers.config, 'BURST_FRAMES', 4):
+        pipeline = CapturePipeline([source])
+        burst = pipeline._burst_frames(source, 0)
+        assert camera.captures == 0
+        assert next(burst) == 1
+        
+        # Kaynaktan yeni kare yakalandı: eski seri çekim biter
+        source.captured = 1
+        assert list(burst) == []
+        assert camera.captures == 1
+        
+        assert list(pipeline._burst_frames(source, 1)) == [2, 3, 4]
+        # Yeniden yüklemeyle kamera değiştiyse eski kameradan kare alınmaz
+        burst = pipeline._burst_frames(source, 1)
+        source.camera = CountingCamera()
+        assert list(burst) == []
+    
+    with mock.patch.object(capture_numbers.config, 'BURST_FRAMES', 1):
+        assert pipeline._burst_frames(source, 1) is None
+
+
+class ExclusiveDevices:
+    """Aynı aygıtın ikinci kez açılmasını reddeden sahte kamera sürücüsü (V4L2 gibi)"""
+    
+    def __init__(self, available):
+        self.available = set(available)
+        self.opened = set()
+    
+    def open(self, index):
+        if index not in self.available:
+            raise Exception(f"Aygıt yok: {index}")
+        if index in self.opened:
+            raise Exception(f"Aygıt meşgul: {index}")
+        self.opened.add(index)
+    
+    def create_camera(self, settings):
+        return FakeCamera(self, settings.get('camera_index', capture_numbers.config.CAMERA_INDEX),
+                          capture_numbers.config.CAMERA_RESOLUTION)
+
+
+class FakeCamera:
+    """ExclusiveDevices üzerinde açılan sahte CameraCapture"""
+    
+    def __init__(self, devices, index, resolution):
+        self.devices = devices
+        self.index = index
+        self.resolution = resolution
+        self.open = False
+        self.reconnect()
+    
+    def reconnect(self):
+        self.devices.open(self.index)
+        self.open = True
+    
+    def release(self):
+        if self.open:
+            self.devices.opened.discard(self.index)
+            self.open = False
+
+
+def config_copy(**settings):
+    """Geçerli yapılandırmanın değiştirilmiş bir kopyası (yeniden yüklenmiş dosya gibi)"""
+    copy = ModuleType('config')
+    for name in dir(capture_numbers.config):
+        if name.isupper():
+            setattr(copy, name, getattr(capture_numbers.config, name))
+    for name, value in settings.items():
+        setattr(copy, name, value)
+    return copy
+
+
+@contextmanager
+def use_config(module):
+    """Test süresince etkin yapılandırmayı değiştir"""
+    previous = capture_numbers.config.module
+    capture_numbers.config.use(module)
+    try:
+        yield module
+    finally:
+        capture_numbers.config.use(previous)
+
+
+def test_apply_config_reopens_camera():
+    """Kamera ayarı değişince eski kamera bırakılıp aygıt yeni ayarlarla açılmalı"""
+    devices = ExclusiveDevices([0, 1])
+    with use_config(config_copy(SOURCES=[], CAMERA_INDEX=0)), \
+            mock.patch('sources.create_camera', devices.create_camera):
+        old_camera = devices.create_camera({})
+        source = CaptureSource(old_camera, SimpleNamespace(), 60)
+        source.settings = {}
+        
+        changed = apply_config(config_copy(CAMERA_RESOLUTION=(640, 480), MIN_CONFIDENCE=75),
+                               [source])
+        assert changed == ['CAMERA_RESOLUTION', 'MIN_CONFIDENCE']
+        assert capture_numbers.config.MIN_CONFIDENCE == 75
+        assert source.camera is not old_camera and not old_camera.open
+        assert source.camera.open and source.camera.resolution == (640, 480)
+        assert devices.opened == {0}
+
+
+def test_apply_config_rollback():
+    """Yeni kamera açılamazsa eski ayarlar kalmalı ve eski kamera yeniden açılmalı"""
+    devices = ExclusiveDevices([0])
+    old_config = config_copy(SOURCES=[], CAMERA_INDEX=0, MIN_CONFIDENCE=60)
+    with use_config(old_config), mock.patch('sources.create_camera', devices.create_camera):
+        camera = devices.create_camera({})
+        source = CaptureSource(camera, SimpleNamespace(), 60)
+        source.settings = {}
+        
+        try:
+            apply_config(config_copy(CAMERA_INDEX=3, MIN_CONFIDENCE=75), [source])
+            assert False, "Hata bekleniyordu"
+        except Exception as e:
+            assert "Aygıt yok" in str(e)
+        
+        assert capture_numbers.config.module is old_config
+        assert capture_numbers.config.MIN_CONFIDENCE == 60
+        assert source.camera is camera and camera.open
+        assert devices.opened == {0}
+
+
+def test_excel_writer_buffering():
+    """Satırlar EXCEL_FLUSH_ROWS dolana kadar bellekte beklemeli, close() kalanları yazmalı"""
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "readings.xlsx")
+        with mock.patch.multiple(capture_numbers.config, EXCEL_ROTATE=None, EXCEL_ROTATE_ROWS=0,
+                                 EXCEL_FLUSH_ROWS=3, EXCEL_FLUSH_INTERVAL=3600,
+                                 APPEND_MODE=True):
+            writer = ExcelWriter(filename, "Sayılar")
+            # Başlık satırı da bekleyen satır sayılır: başlık + 1 okuma
+            writer.write_data("1", 90)
+            assert not os.path.exists(filename)
+            
+            writer.write_data("2", 90)
+            assert sheet_values(filename) == ["1", "2"]
+            
+            writer.write_data("3", 90)
+            assert sheet_values(filename) == ["1", "2"]
+            writer.close()
+        
+        assert sheet_values(filename) == ["1", "2", "3"]
+        assert not os.path.exists(f"{filename}.tmp")
+
+
+def test_excel_writer_corrupt_workbook():
+    """Açılamayan dosya .bozuk_ uzantısıyla yedeklenip yeni dosya oluşturulmalı"""
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "readings.xlsx")
+        with open(filename, 'wb') as f:
+            f.write(b"bozuk icerik")
+        with open(f"{filename}.tmp", 'wb') as f:
+            f.write(b"yarim kalmis")
+        
+        with mock.patch.multiple(capture_numbers.config, EXCEL_ROTATE=None, EXCEL_ROTATE_ROWS=0,
+                                 EXCEL_FLUSH_ROWS=100, APPEND_MODE=True):
+            writer = ExcelWriter(filename, "Sayılar")
+            writer.write_data("7", 90)
+            writer.close()
+        
+        assert sheet_values(filename) == ["7"]
+        assert not os.path.exists(f"{filename}.tmp")
+        backups = [name for name in os.listdir(directory) if ".bozuk_" in name]
+        assert len(backups) == 1
+        with open(os.path.join(directory, backups[0]), 'rb') as f:
+            assert f.read() == b"bozuk icerik"
+
+
+def reference_preprocess(pipeline, image):
+    """Her adımda yeni dizi ayıran karşılaştırma yolu"""
+    processed = image
+    for _, step in pipeline.steps:
+        processed = step(processed)
+    return processed
+
+
+def test_preprocess_pipeline_matches_reference():
+    """Tamponları yeniden kullanan run() adım adım yeni dizi ayıran yolla aynı pikselleri vermeli"""
+    rng = np.random.default_rng(0)
+    images = [rng.integers(0, 256, (48, 64, 3), dtype=np.uint8) for _ in range(3)]
+    variants = [
+        {'DENOISE_METHOD': 'median', 'THRESHOLD_METHOD': 'otsu', 'RESIZE_LAST': False},
+        {'DENOISE_METHOD': 'gaussian', 'THRESHOLD_METHOD': 'adaptive', 'RESIZE_LAST': True},
+        {'DENOISE_METHOD': 'bilateral', 'THRESHOLD_METHOD': 'otsu', 'RESIZE_LAST': True},
+        {'DENOISE_METHOD': 'median', 'THRESHOLD_METHOD': 'adaptive', 'RESIZE_FACTOR': 0.5},
+    ]
+    for variant in variants:
+        overrides = {'GRAYSCALE': True, 'RESIZE_FACTOR': 2.0, 'DENOISE': True,
+                     'DENOISE_KERNEL': 3, 'THRESHOLD': True, **variant}
+        pipeline = PreprocessPipeline(overrides)
+        results = []
+        for image in images:
+            result = pipeline.run(image)
+            assert np.array_equal(result, reference_preprocess(pipeline, image)), variant
+            results.append(result)
+        
+        # Sonuçlar tamponları paylaşmamalı: sonraki kareler öncekileri bozmamalı
+        for image, result in zip(images, results):
+            assert np.array_equal(result, reference_preprocess(pipeline, image)), variant
+
+
+def test_preprocess_pipeline_buffers():
+    """Aynı boyutta tamponlar korunmalı, boyut veya tür değişince yeniden ayrılmalı"""
+    pipeline = PreprocessPipeline({'GRAYSCALE': True, 'RESIZE_FACTOR': 2.0, 'RESIZE_LAST': False,
+                                   'DENOISE': True, 'DENOISE_METHOD': 'gaussian',
+                                   'DENOISE_KERNEL': 3, 'THRESHOLD': False})
+    assert [name for name, _ in pipeline.steps] == ['grayscale', 'resize', 'denoise']
+    
+    small = np.full((20, 30, 3), 100, dtype=np.uint8)
+    pipeline.run(small)
+    buffers = list(pipeline.local.buffers)
+    pipeline.run(small + 1)
+    assert all(new is old for new, old in zip(pipeline.local.buffers, buffers))
+    
+    large = np.full((40, 50, 3), 100, dtype=np.uint8)
+    result = pipeline.run(large)
+    assert np.array_equal(result, reference_preprocess(pipeline, large))
+    assert pipeline.local.buffers[0].shape == (40, 50)
+    assert pipeline.local.buffers[1].shape == (80, 100)
+    assert pipeline.local.buffers[0] is not buffers[0]
+    
+    deep = np.full((40, 50, 3), 1000, dtype=np.uint16)
+    result = pipeline.run(deep)
+    assert result.dtype == np.uint16
+    assert np.array_equal(result, reference_preprocess(pipeline, deep))
+    assert all(buffer.dtype == np.uint16 for buffer in pipeline.local.buffers[:2])
+
+
+def replay_values(feed, count):
+    """Tekrar oynatmadan okunan karelerin parlaklıkları (okunamayan kare None)"""
+    values = []
+    for _ in range(count):
+        ok, frame = feed.read()
+        values.append(int(frame.mean()) if ok else None)
+    return values
+
+
+def test_replay_feed_loop():
+    """Döngüdeki kayıt bitince başa sarmalı, döngüsüz kayıt bitmiş sayılmalı"""
+    with tempfile.TemporaryDirectory() as directory:
+        write_images(directory, [10, 20, 30])
+        
+        feed = ReplayFeed(directory, loop=True)
+        assert replay_values(feed, 7) == [10, 20, 30, 10, 20, 30, 10]
+        assert not feed.finished
+        
+        feed = ReplayFeed(directory, loop=False)
+        with mock.patch.object(time, 'sleep'):
+            assert replay_values(feed, 5) == [10, 20, 30, None, None]
+        assert feed.finished
+
+
+def test_replay_feed_archive_sources():
+    """Çok kameralı arşivde her kaynak kendi görüntülerini oynatmalı"""
+    with tempfile.TemporaryDirectory() as directory:
+        write_images(directory, [10, 20], prefix="original_giris")
+        write_images(directory, [30, 40, 50], prefix="original_hat_1")
+        
+        assert replay_values(ReplayFeed(directory, loop=False, source="giris"), 2) == [10, 20]
+        assert replay_values(ReplayFeed(directory, source="hat_1"), 4) == [30, 40, 50, 30]
+        try:
+            ReplayFeed(directory)
+            assert False, "Kaynak adı olmadan çok kameralı arşiv açılmamalı"
+        except Exception as e:
+            assert "bulunanlar: giris, hat_1" in str(e)
+        
+        # Kamera adı CameraCapture'dan geçer
+        with mock.patch.multiple(capture_numbers.config, REPLAY_FPS=0, REPLAY_LOOP=True,
+                                 REPLAY_JITTER=0, REPLAY_DROP_RATE=0):
+            camera = CameraCapture('replay', replay_path=directory, name="hat_1")
+        assert replay_values(camera.camera, 3) == [30, 40, 50]
+    
+    # Tek kameralı arşiv her kaynak adıyla oynatılır
+    with tempfile.TemporaryDirectory() as directory:
+        write_images(directory, [60, 70])
+        assert replay_values(ReplayFeed(directory, source="giris"), 2) == [60, 70]
+
+
+def test_retry_call_backoff():
+    """Bekleme her denemede ikiye katlanıp RETRY_MAX_DELAY'de kalmalı, son hata iletilmeli"""
+    calls, retries = [], []
+    
+    def failing():
+        calls.append(1)
+        raise IOError("okunamadı")
+    
+    with mock.patch.multiple(capture_numbers.config, MAX_RETRIES=5, RETRY_DELAY=0.5,
+                             RETRY_MAX_DELAY=3), \
+            mock.patch.object(time, 'sleep') as sleep:
+        try:
+            retry_call(failing, "test", retries.append)
+            assert False, "Son denemenin hatası iletilmeli"
+        except IOError:
+            pass
+    assert len(calls) == 6
+    assert [call.args[0] for call in sleep.call_args_list] == [0.5, 1, 2, 3, 3]
+    assert retries == [0, 1, 2, 3, 4]
+    
+    # Başarılı deneme sonucu döndürülür
+    outcomes = iter([IOError("geçici"), None])
+    
+    def flaky():
+        error = next(outcomes)
+        if error:
+            raise error
+        return "kare"
+    
+    with mock.patch.multiple(capture_numbers.config, MAX_RETRIES=3, RETRY_DELAY=1,
+                             RETRY_MAX_DELAY=10), \
+            mock.patch.object(time, 'sleep'):
+        assert retry_call(flaky, "test") == "kare"
+
+
+def test_retry_call_replay_finished():
+    """Biten tekrar oynatma yeniden denenmeden iletilmeli"""
+    calls = []
+    
+    def finished():
+        calls.append(1)
+        raise ReplayFinished("bitti")
+    
+    with mock.patch.multiple(capture_numbers.config, MAX_RETRIES=3, RETRY_DELAY=1), \
+            mock.patch.object(time, 'sleep') as sleep:
+        try:
+            retry_call(finished, "test")
+            assert False, "ReplayFinished iletilmeli"
+        except ReplayFinished:
+            pass
+    assert len(calls) == 1
+    assert not sleep.called
+
+
+class FlakyVideoCapture:
+    """İlk açılışta okuması başarısız olan (kablo çıkmış) sahte USB kamera"""
+    
+    opened = []
+    
+    def __init__(self, index):
+        self.working = bool(FlakyVideoCapture.opened)
+        self.released = False
+        FlakyVideoCapture.opened.append(self)
+    
+    def set(self, prop, value):
+        return True
+    
+    def isOpened(self):
+        return True
+    
+    def read(self):
+        if self.working:
+            return True, np.full((4, 4, 3), len(FlakyVideoCapture.opened), np.uint8)
+        return False, None
+    
+    def release(self):
+        self.released = True
+
+
+def test_capture_reconnects_after_read_failure():
+    """Okuma tekrar tekrar başarısız olursa kamera kapatılıp yeniden açılmalı"""
+    FlakyVideoCapture.opened = []
+    with mock.patch.multiple(capture_numbers.config, MAX_RETRIES=3, RETRY_DELAY=0,
+                             RETRY_MAX_DELAY=0, CAMERA_GRABBER=False), \
+            mock.patch.object(cv2, 'VideoCapture', FlakyVideoCapture), \
+            mock.patch.object(CameraCapture, '_wait_until_stable', return_value=True), \
+            mock.patch.object(time, 'sleep'):
+        camera = CameraCapture('usb')
+        image, _ = camera.capture_frame()
+    
+    # İlk yeniden deneme aynı kamerayla, sonraki kamerayı yeniden açarak
+    first, second = FlakyVideoCapture.opened
+    assert first.released and not second.released
+    assert camera.camera is second
+    assert int(image.mean()) == 2
+    assert camera.down_since is None
+
+
+def test_single_shot_replay_finished():
+    """Tek çekimde biten tekrar oynatma hata değil, program başarıyla bitmeli"""
+    closed = []
+    source = SimpleNamespace(name=None, camera=None, reader=None,
+                             excel_writer=SimpleNamespace(filename="ocr_results.xlsx"),
+                             close=lambda: closed.append(True))
+    with mock.patch.multiple(capture_numbers.config, STORAGE='excel', CONTINUOUS_MODE=False,
+                             METRICS_FILE=None, SAVE_IMAGES=False, SOURCES=[]), \
+            mock.patch.object(capture_numbers, 'setup_logging'), \
+            mock.patch.object(capture_numbers, 'create_source', return_value=source), \
+            mock.patch.object(capture_numbers, 'process_single_capture',
+                              side_effect=ReplayFinished("Tekrar oynatma bitti")), \
+            mock.patch('sys.argv', ['capture_numbers.py']):
+        capture_numbers.main()
+    assert closed == [True]
+
+
+def daemon_source(name):
+    """ReadingService için kamerasız sahte kaynak"""
+    return SimpleNamespace(name=name, label=name, stats=lambda: {'captures': 0},
+                           count=lambda *args: None,
+                           excel_writer=SimpleNamespace(flush_if_due=lambda: None))
+
+
+def test_reading_service_handle():
+    """API yanıtları: bilinmeyen kaynak ve limit 400, yanlış yöntem 405, /health, /latest"""
+    service = ReadingService([daemon_source("giris"), daemon_source("hat_1")], history=10)
+    
+    status, health = service.handle('GET', '/health', {})
+    assert status == 200 and health['status'] == 'ok'
+    assert sorted(health['sources']) == ["giris", "hat_1"]
+    assert health['sources']["giris"]['latest'] is None
+    
+    assert service.handle('GET', '/latest', {}) == (404, {'error': 'Henüz okuma yok'})
+    for i, (name, text) in enumerate([("giris", "1"), ("hat_1", "2"), ("giris", "3")]):
+        reading = {'source': name, 'timestamp': f"2026-10-18T12:00:0{i}.000", 'text': text}
+        service.latest[name] = reading
+        service.history.append(reading)
+    assert service.handle('GET', '/latest', {})[1]['text'] == "3"
+    assert service.handle('GET', '/latest', {'source': "hat_1"})[1]['text'] == "2"
+    assert service.handle('GET', '/health', {})[1]['sources']["giris"]['latest'] == \
+        "2026-10-18T12:00:02.000"
+    
+    status, readings = service.handle('GET', '/history', {'limit': '2'})
+    assert status == 200 and [reading['text'] for reading in readings] == ["2", "3"]
+    status, readings = service.handle('GET', '/history', {'source': "giris"})
+    assert [reading['text'] for reading in readings] == ["1", "3"]
+    assert service.handle('GET', '/history', {'limit': '0'}) == (200, [])
+    
+    assert service.handle('GET', '/history', {'limit': 'beş'})[0] == 400
+    assert service.handle('GET', '/latest', {'source': "yok"}) == \
+        (400, {'error': 'Bilinmeyen kaynak: yok'})
+    assert service.handle('POST', '/capture', {'source': "yok"})[0] == 400
+    assert service.handle('POST', '/health', {})[0] == 405
+    assert service.handle('GET', '/capture', {})[0] == 405
+    assert service.handle('GET', '/yok', {})[0] == 404
+
+
+def test_reading_service_capture_requests():
+    """Aynı anda gelen çekim istekleri tek çekimde birleşmeli, hata 503 dönmeli"""
+    source = daemon_source("giris")
+    service = ReadingService([source])
+    captured = []
+    
+    def capture(requested):
+        captured.append(requested)
+        if len(captured) > 1:
+            raise IOError("kamera yok")
+        return {'source': requested.label, 'text': "42"}
+    
+    # İki istek çekim başlamadan kuyruğa girer
+    first = service.request_capture("giris")
+    assert service.request_capture() is first
+    
+    with mock.patch.object(service, 'capture', side_effect=capture):
+        thread = threading.Thread(target=service.serve)
+        thread.start()
+        try:
+            assert first.result(timeout=5) == {'source': "giris", 'text': "42"}
+            with mock.patch.object(capture_numbers.config, 'DAEMON_CAPTURE_TIMEOUT', 5):
+                status, payload = service.handle('POST', '/capture', {})
+        finally:
+            service.stop()
+            thread.join()
+    assert captured == [source, source]
+    assert status == 503 and "kamera yok" in payload['error']
+
+
+def test_store_export_round_trip():
+    """Veritabanındaki okumalar kaynak sayfalarına aynen aktarılmalı, yabancı sayfa korunmalı"""
+    with tempfile.TemporaryDirectory() as directory:
+        db_file = os.path.join(directory, "readings.db")
+        filename = os.path.join(directory, "readings.xlsx")
+        start = datetime(2026, 10, 18, 12, 0, 0)
+        with mock.patch.multiple(capture_numbers.config, DB_COMMIT_ROWS=100,
+                                 DB_COMMIT_INTERVAL=3600):
+            store = ReadingStore(db_file)
+            store.write_data("100", 91.234, start)
+            store.for_source("hat_1").write_data("7", 80, start + timedelta(seconds=1))
+            store.write_data("100", 92, start + timedelta(seconds=2), repeated=True)
+            store.close()
+        
+        segments = export_excel(db_file, filename, "Sayılar", sheets={"hat_1": "Hat 1"})
+        assert [(segment['rows'], sorted(segment['sheets'])) for segment in segments] == \
+            [(3, ["Hat 1", "Sayılar"])]
+        
+        workbook = load_workbook(filename)
+        assert workbook.sheetnames == ["Sayılar", "Hat 1"]
+        assert list(workbook["Sayılar"].iter_rows(values_only=True)) == [
+            tuple(ExcelWriter.HEADERS),
+            ("2026-10-18", "12:00:00", "100", 91.23, None),
+            ("2026-10-18", "12:00:02", "100", 92, "tekrar")]
+        assert list(workbook["Hat 1"].iter_rows(min_row=2, values_only=True)) == [
+            ("2026-10-18", "12:00:01", "7", 80, None)]
+        
+        # Kullanıcının eklediği sayfa varsa dosya yeniden üretilmez
+        workbook.create_sheet("Notlar")
+        workbook.save(filename)
+        try:
+            check_foreign_sheets(filename, {"Sayılar", "Hat 1"})
+            assert False, "Yabancı sayfa içeren dosya reddedilmeli"
+        except Exception as e:
+            assert "Notlar" in str(e)
+        try:
+            export_excel(db_file, filename, "Sayılar", sheets={"hat_1": "Hat 1"})
+            assert False, "Yabancı sayfa içeren dosyanın üzerine yazılmamalı"
+        except Exception:
+            pass
+        assert "Notlar" in load_workbook(filename).sheetnames
+
+
+def test_store_imports_excel_history():
+    """Eski Excel dosyasındaki satırlar boş veritabanına aktarılıp geri üretilmeli"""
+    with tempfile.TemporaryDirectory() as directory:
+        db_file = os.path.join(directory, "readings.db")
+        filename = os.path.join(directory, "readings.xlsx")
+        with mock.patch.multiple(capture_numbers.config, EXCEL_ROTATE=None, EXCEL_ROTATE_ROWS=0,
+                                 EXCEL_FLUSH_ROWS=100, APPEND_MODE=True, DB_COMMIT_ROWS=100,
+                                 DB_COMMIT_INTERVAL=3600):
+            writer = ExcelWriter(filename, "Sayılar")
+            writer.write_data("5", 90, datetime(2026, 10, 18, 12, 0, 0))
+            writer.write_data("5", 90, datetime(2026, 10, 18, 12, 0, 5), repeated=True)
+            writer.close()
+            
+            store = ReadingStore(db_file)
+            assert store.import_excel(filename) == 2
+            # Dolu veritabanına tekrar aktarılmaz
+            assert store.import_excel(filename) == 0
+            store.close()
+        
+        exported = os.path.join(directory, "exported.xlsx")
+        export_excel(db_file, exported)
+        assert list(load_workbook(exported)["Sayılar"].iter_rows(values_only=True)) == \
+            list(load_workbook(filename)["Sayılar"].iter_rows(values_only=True))
+
+
+def test_frame_archive_round_trip():
+    """Parçalara yazılan kareler aynen okunmalı, yarım kalan kuyruk atlanmalı"""
+    rng = np.random.default_rng(1)
+    frames = [rng.integers(0, 256, (12, 16, 3), dtype=np.uint8) for _ in range(5)]
+    start = datetime(2026, 10, 18, 12, 0, 0)
+    with tempfile.TemporaryDirectory() as directory:
+        with mock.patch.multiple(capture_numbers.config, IMAGE_FORMAT='png', PNG_COMPRESSION=1):
+            archive = FrameArchive(directory, chunk_frames=3)
+            names = [archive.append(frame, "original", start + timedelta(seconds=i))
+                     for i, frame in enumerate(frames)]
+            archive.append(frames[0][:4, :4], "original_giris", start, roi=(1, 2, 4, 4))
+            archive.close()
+        assert names[:4] == ["original_20261018_120000_000000#0",
+                             "original_20261018_120000_000000#1",
+                             "original_20261018_120000_000000#2",
+                             "original_20261018_120003_000000#0"]
+        
+        reader = FrameArchiveReader(directory)
+        assert len(reader.chunks()) == 2 and len(reader) == 5
+        read = list(reader)
+        assert [timestamp for timestamp, _ in read] == \
+            [start + timedelta(seconds=i) for i in range(5)]
+        assert all(np.array_equal(frame, original) for (_, frame), original in zip(read, frames))
+        window = reader.frames(start + timedelta(seconds=1), start + timedelta(seconds=3))
+        assert [timestamp.second for timestamp, _ in window] == [1, 2, 3]
+        assert FrameArchiveReader.sources(directory) == [None, "giris"]
+        assert not reader.roi_cropped()
+        assert FrameArchiveReader(directory, "original_giris").roi_cropped()
+        
+        # Elektrik kesintisi: son karenin verisi yarım, indeksin son satırı yarım kalmış
+        last = reader.chunks()[-1]
+        with open(last, 'r+b') as f:
+            f.truncate(os.path.getsize(last) - 10)
+        with open(last.with_suffix(FrameArchive.INDEX_SUFFIX), 'a', encoding='utf-8') as f:
+            f.write('{"t": "2026-10-18T12:00:0')
+        read = list(FrameArchiveReader(directory))
+        assert len(read) == 4
+        assert all(np.array_equal(frame, original) for (_, frame), original in zip(read, frames))
+
+
+def meter_frame(origin, text="12345", size=(480, 1280)):
+    """Düz zeminde origin (sol alt) noktasına yazılmış sayı karesi"""
+    image = np.full(size + (3,), 120, np.uint8)
+    cv2.putText(image, text, origin, cv2.FONT_HERSHEY_SIMPLEX, 2, (20, 20, 20), 5)
+    return image
+
+
+def roi_contains_text(roi, frame):
+    """roi (x, y, w, h) karedeki koyu rakam piksellerinin hepsini içeriyor mu"""
+    x, y, w, h = roi
+    bx, by, bw, bh = cv2.boundingRect(cv2.findNonZero((frame[:, :, 0] < 60).astype(np.uint8)))
+    return x <= bx and y <= by and bx + bw <= x + w and by + bh <= y + h
+
+
+def test_roi_locator():
+    """Sayı bölgesi bulunup önbelleğe alınmalı, sayı kayınca yeniden aranmalı"""
+    with mock.patch.multiple(capture_numbers.config, ROI_PADDING=0.2, ROI_DRIFT_THRESHOLD=0.5):
+        locator = RoiLocator(auto_detect=True)
+        frame = meter_frame((200, 150))
+        roi = locator.locate(frame)
+        assert roi_contains_text(roi, frame)
+        assert roi[2] * roi[3] < frame.shape[0] * frame.shape[1] / 10
+        
+        # Aynı sahnede tespit tekrarlanmaz
+        with mock.patch.object(locator, 'detect') as detect:
+            assert locator.locate(frame) == roi
+            assert not detect.called
+        
+        # Sayı başka yere kaydıysa bölge yeniden bulunur
+        moved_frame = meter_frame((800, 400))
+        assert roi_contains_text(locator.locate(moved_frame), moved_frame)
+        
+        # Boş karede tüm kare kullanılır
+        assert locator.locate(np.full((480, 1280, 3), 120, np.uint8)) is None
+        assert locator.cached_roi is None
+        
+        # Sabit bölge ve kapalı tespit
+        assert RoiLocator(roi=[10, 20, 30, 40]).locate(frame) == (10, 20, 30, 40)
+        assert RoiLocator().locate(frame) is None
+    
+    assert RoiLocator.crop(frame, (10, 20, 30, 40)).shape == (40, 30, 3)
+    assert RoiLocator.crop(frame, None) is frame
+
+
+def test_change_detector():
+    """Gürültü değişiklik sayılmamalı, rakam değişimi ve kayma algılanmalı"""
+    frame = meter_frame((200, 150))
+    rng = np.random.default_rng(0)
+    noisy = np.clip(frame.astype(int) + rng.integers(-3, 4, frame.shape), 0, 255).astype(np.uint8)
+    digit_changed = meter_frame((200, 150), "12346")
+    moved = meter_frame((600, 300))
+    
+    detector = ChangeDetector('diff', threshold=4)
+    assert not detector.is_unchanged(detector.signature(frame))
+    detector.set_reference(detector.signature(frame))
+    assert detector.is_unchanged(detector.signature(noisy))
+    assert not detector.is_unchanged(detector.signature(digit_changed))
+    assert not detector.is_unchanged(detector.signature(moved))
+    
+    # Ortalama hash yalnızca büyük değişimleri görür
+    detector = ChangeDetector('hash', threshold=4)
+    detector.set_reference(detector.signature(frame))
+    assert detector.signature(frame).shape == (16, 16)
+    assert detector.is_unchanged(detector.signature(noisy))
+    assert not detector.is_unchanged(detector.signature(moved))
+    
+    # max_skips art arda atlamadan sonra OCR'ı zorlar; reset referansı siler
+    detector = ChangeDetector('diff', threshold=4, max_skips=2)
+    detector.set_reference(detector.signature(frame))
+    assert [detector.is_unchanged(detector.signature(frame)) for _ in range(3)] == \
+        [True, True, False]
+    detector.set_reference(detector.signature(frame))
+    assert detector.is_unchanged(detector.signature(frame))
+    detector.reset()
+    assert not detector.is_unchanged(detector.signature(frame))
+
+
+def test_tesserocr_parse_config():
+    """TESSERACT_CONFIG dizesi oem, psm ve -c değişkenlerine ayrılmalı"""
+    assert TesserocrEngine._parse_config(
+        "--oem 3 --psm 7 -c tessedit_char_whitelist=0123456789.") == \
+        (3, 7, {'tessedit_char_whitelist': '0123456789.'})
+    assert TesserocrEngine._parse_config(
+        "--psm 6 -c 'user_defined_dpi=300' -c classify_bln_numeric_mode=1") == \
+        (None, 6, {'user_defined_dpi': '300', 'classify_bln_numeric_mode': '1'})
+    # Boş ve eksik değerli ayarlar yok sayılır
+    assert TesserocrEngine._parse_config("") == (None, None, {})
+    assert TesserocrEngine._parse_config(None) == (None, None, {})
+    assert TesserocrEngine._parse_config("-l eng --psm") == (None, None, {})
+
+
+def test_tesserocr_api_per_thread():
+    """API her iş parçacığında bir kez, ayrıştırılan ayarlarla başlatılmalı"""
+    created = []
+    
+    class FakeApi:
+        def __init__(self, **kwargs):
+            self.kwargs = kwargs
+            self.variables = {}
+            created.append(self)
+        
+        def SetVariable(self, name, value):
+            self.variables[name] = value
+    
+    fake = SimpleNamespace(PyTessBaseAPI=FakeApi)
+    with mock.patch.dict(sys.modules, {'tesserocr': fake}):
+        engine = TesserocrEngine("eng", "--oem 1 --psm 7 -c tessedit_char_whitelist=0123456789")
+    
+    api = engine._get_api()
+    assert engine._get_api() is api
+    assert api.kwargs == {'lang': "eng", 'oem': 1, 'psm': 7}
+    assert api.variables == {'tessedit_char_whitelist': "0123456789"}
+    
+    thread = threading.Thread(target=engine._get_api)
+    thread.start()
+    thread.join()
+    assert len(created) == 2
+
+
+def test_metrics_to_prometheus():
+    """Sayaçlar etiketleriyle, gecikmeler birikimli histogram olarak yazılmalı"""
+    registry = Metrics()
+    registry.increment('frames')
+    registry.increment('frames', 2)
+    registry.increment('errors', stage='ocr')
+    registry.increment('camera_downtime_seconds', 1.5, source='giris')
+    registry.observe('ocr', 0.03)
+    registry.observe('ocr', 0.2)
+    registry.observe('ocr', 20)
+    
+    with mock.patch('runtime.process_memory', return_value=1024):
+        lines = registry.to_prometheus().splitlines()
+    
+    assert lines[:6] == [
+        '# TYPE raspi_ocr_camera_downtime_seconds_total counter',
+        'raspi_ocr_camera_downtime_seconds_total{source="giris"} 1.5',
+        '# TYPE raspi_ocr_errors_total counter',
+        'raspi_ocr_errors_total{stage="ocr"} 1',
+        '# TYPE raspi_ocr_frames_total counter',
+        'raspi_ocr_frames_total 3']
+    assert '# TYPE raspi_ocr_stage_duration_seconds histogram' in lines
+    buckets = [line for line in lines if line.startswith('raspi_ocr_stage_duration_seconds_bucket')]
+    assert len(buckets) == len(Metrics.BUCKETS) + 1
+    assert 'raspi_ocr_stage_duration_seconds_bucket{stage="ocr",le="0.025"} 0' in buckets
+    assert 'raspi_ocr_stage_duration_seconds_bucket{stage="ocr",le="0.05"} 1' in buckets
+    assert 'raspi_ocr_stage_duration_seconds_bucket{stage="ocr",le="0.25"} 2' in buckets
+    assert 'raspi_ocr_stage_duration_seconds_bucket{stage="ocr",le="10.0"} 2' in buckets
+    assert buckets[-1] == 'raspi_ocr_stage_duration_seconds_bucket{stage="ocr",le="+Inf"} 3'
+    assert 'raspi_ocr_stage_duration_seconds_sum{stage="ocr"} 20.230000' in lines
+    assert 'raspi_ocr_stage_duration_seconds_count{stage="ocr"} 3' in lines
+    assert lines[-1] == 'raspi_ocr_resident_memory_bytes 1024'
+    
+    # JSON ve metin dosyaları atomik olarak yazılır
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "metrics.json")
+        registry.export(path, 'json')
+        with open(path, encoding='utf-8') as f:
+            exported = json.load(f)
+        assert exported['counters'] == {'camera_downtime_seconds[source=giris]': 1.5,
+                                        'errors[stage=ocr]': 1, 'frames': 3}
+        assert exported['stages']['ocr']['count'] == 3
+        assert os.listdir(directory) == ["metrics.json"]
+
+
+def test_image_archiver_sampling():
+    """Sayaçlar iş parçacıkları arasında kaybolmamalı, baskı altında örnekleme yapılmalı"""
+    with tempfile.TemporaryDirectory() as directory:
+        with mock.patch.object(capture_numbers.config, 'ARCHIVE_FORMAT', 'images'):
+            archiver = ImageArchiver(directory, queue_size=4, pressure_sample=3)
+        archiver.close()
+        
+        threads = [threading.Thread(target=lambda: [archiver._accept("original")
+                                                    for _ in range(2000)])
+                   for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert archiver.counters == {"original": 16000}
+        
+        # Kuyruk yarıya kadar doluyken her görüntü, sonra üçte biri kabul edilir
+        archiver.counters = {}
+        archiver.queue.put_nowait(None)
+        assert [archiver._accept("original") for _ in range(3)] == [True] * 3
+        archiver.queue.put_nowait(None)
+        assert [archiver._accept("original") for _ in range(6)] == \
+            [True, False, False, True, False, False]
+        assert [archiver._accept("processed") for _ in range(2)] == [True, False]
+
+
+def test_unique_image_path():
+    """Aynı zamanlı görüntüler diskteki veya bekleyen dosyaların üzerine yazılmamalı"""
+    timestamp = datetime(2026, 10, 18, 12, 0, 0, 1234)
+    with tempfile.TemporaryDirectory() as directory:
+        output_dir = Path(directory)
+        first = unique_image_path(output_dir, "original", timestamp, "jpg")
+        assert first.name == "original_20261018_120000_001234.jpg"
+        
+        first.touch()
+        second = unique_image_path(output_dir, "original", timestamp, "jpg")
+        assert second.name == "original_20261018_120000_001234_1.jpg"
+        
+        # Kuyrukta bekleyen (henüz yazılmamış) ad da dolu sayılır
+        third = unique_image_path(output_dir, "original", timestamp, "jpg", {str(second)})
+        assert third.name == "original_20261018_120000_001234_2.jpg"
+        
+        assert unique_image_path(output_dir, "processed", timestamp, "jpg").name == \
+            "processed_20261018_120000_001234.jpg"
+        assert archive_source_name(third.stem) is None
+
+
+def digit_frame(scale, size=(480, 1280), inverted=False, label=False):
+    """Ortasında '12345' yazan kare ve rakamların gerçek piksel yüksekliği"""
+    background, ink = (20, 220) if inverted else (200, 20)
+    image = np.full(size + (3,), background, np.uint8)
+    cv2.putText(image, "12345", (100, size[0] // 2), cv2.FONT_HERSHEY_SIMPLEX, scale,
+                (ink,) * 3, max(2, int(scale * 2)))
+    digits = image[:, :, 0] > 100 if inverted else image[:, :, 0] < 100
+    rows = np.where(digits.any(axis=1))[0]
+    if label:
+        # Sayaçtaki küçük birim etiketi rakam grubunu değiştirmemeli
+        cv2.putText(image, "kWh", (100, size[0] - 40), cv2.FONT_HERSHEY_SIMPLEX, 0.6,
+                    (ink,) * 3, 1)
+    return image, rows.max() - rows.min() + 1
+
+
+def test_estimate_char_height():
+    """Rakam yüksekliği renk, etiket ve kare boyutundan bağımsız olarak bulunmalı"""
+    for options in [{'scale': 1}, {'scale': 2}, {'scale': 4},
+                    {'scale': 2, 'inverted': True}, {'scale': 2, 'label': True},
+                    {'scale': 6, 'size': (1440, 2560)}]:
+        image, height = digit_frame(**options)
+        estimate = ImageProcessor.estimate_char_height(image)
+        assert estimate is not None and abs(estimate - height) <= 0.1 * height, \
+            (options, height, estimate)
+    
+    assert ImageProcessor.estimate_char_height(np.full((100, 100, 3), 120, np.uint8)) is None
+
+
+class CountingGrabCamera:
+    """Her grab'de kare numarasını artıran sahte kamera; retrieve numarayı döndürür"""
+    
+    def __init__(self):
+        self.count = 0
+    
+    def grab(self):
+        self.count += 1
+        time.sleep(0.0005)
+        return True
+    
+    def retrieve(self):
+        return True, self.count
+
+
+def test_frame_grabber_timestamp_matches_frame():
+    """Döndürülen zaman damgası çözümlenen kareye ait olmalı"""
+    camera = CountingGrabCamera()
+    # Zaman damgası yerine o anki kare numarası yazılır
+    clock = SimpleNamespace(now=lambda: camera.count)
+    with mock.patch('cameras.datetime', clock):
+        grabber = FrameGrabber(camera)
+        try:
+            pairs = [grabber.retrieve(max_age=1, timeout=2, new_frame=True) for _ in range(200)]
+        finally:
+            grabber.stop()
+    
+    assert all(frame == grabbed_at for frame, grabbed_at in pairs)
+    # new_frame aynı kareyi iki kez döndürmez
+    frames = [frame for frame, _ in pairs]
+    assert frames == sorted(set(frames))
+
+
+def main():
+    """Tüm testleri çalıştır"""
+    tests = [value for name, value in globals().items() if name.startswith('test_')]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✓ {test.__doc__}")
+        except Exception as e:
+            failed += 1
+            print(f"✗ {test.__doc__}: {e!r}")
+    print(f"\n{len(tests) - failed}/{len(tests)} test başarılı")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(0 if main() else 1)